@@ -0,0 +1,286 @@
+import os
+import sys
+import time
+import random
+import argparse
+import sqlite3
+import tempfile
+import datetime
+import multiprocessing
+from contextlib import contextmanager
+from database.db_manager import DBManager
+from database.migrations import migrate, MIGRATIONS, SCHEMA_VERSION, LEGACY_PROJECT_TABLES
+from database.indexes import find_table_scans
+from database.models import Implementation, Offer, Project, Task
+
+
+# Ostatnia wersja schematu z osobnymi tabelami wdrożeń i ofert, bez indeksów
+LEGACY_SCHEMA_VERSION = 2
+
+
+def _migrate_to(version):
+    """Wykonuje migracje do podanej wersji (stan bazy sprzed kolejnych zmian schematu)"""
+    conn = DBManager().get_connection()
+    cursor = conn.cursor()
+    for migration_version, description, migration in MIGRATIONS:
+        if migration_version <= version:
+            migration(cursor)
+    cursor.execute(f"PRAGMA user_version = {version}")
+    conn.commit()
+
+
+@contextmanager
+def temporary_database(version=SCHEMA_VERSION):
+    """
+    Przełącza DBManager na pustą bazę w katalogu tymczasowym
+    
+    Plik config.json nie jest zmieniany, a po wyjściu z bloku przywracana
+    jest poprzednia ścieżka bazy danych.
+    
+    Args:
+        version (int): Wersja schematu, do której baza jest migrowana
+    
+    Yields:
+        str: Ścieżka do tymczasowej bazy danych
+    """
+    db_manager = DBManager()
+    previous_path = db_manager.db_path
+    
+    with tempfile.TemporaryDirectory() as directory:
+        db_manager.close_connection()
+        db_manager.db_path = os.path.join(directory, "benchmark.db")
+        try:
+            if version == SCHEMA_VERSION:
+                migrate()
+            else:
+                _migrate_to(version)
+            yield db_manager.db_path
+        finally:
+            db_manager.close_connection()
+            db_manager.db_path = previous_path
+
+
+def seed_legacy_projects(projects, users=20, seed=1):
+    """
+    Wypełnia bazę w wersji LEGACY_SCHEMA_VERSION projektami obu typów z kompletem operacji
+    
+    Args:
+        projects (int): Liczba projektów (po połowie wdrożeń i ofert)
+        users (int): Liczba użytkowników przypisywanych do operacji
+        seed (int): Ziarno generatora liczb losowych
+    """
+    rng = random.Random(seed)
+    conn = DBManager().get_connection()
+    
+    conn.executemany(
+        "INSERT INTO users (username, first_name, last_name, password_hash) VALUES (?, ?, ?, ?)",
+        [(f"benchmark{i}", "Test", f"Użytkownik {i}", "-") for i in range(users)]
+    )
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM users")]
+    
+    for project_type, table, operations_table, fk_column in LEGACY_PROJECT_TABLES:
+        conn.executemany(
+            f"INSERT INTO {table} (name, description) VALUES (?, '')",
+            [(f"Projekt {i}",) for i in range(projects // 2)]
+        )
+        operations = []
+        for (project_id,) in conn.execute(f"SELECT id FROM {table}").fetchall():
+            for operation_name in Project.OPERATIONS:
+                day = rng.randint(1, 28)
+                operations.append((
+                    project_id, operation_name, rng.choice(user_ids),
+                    f"2026-03-{day:02d}", f"2026-04-{day:02d}", rng.randint(1, 5)
+                ))
+        conn.executemany(f'''
+        INSERT INTO {operations_table} ({fk_column}, operation_name, user_id, start_date, end_date, min_days)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', operations)
+    conn.commit()
+
+
+def naive_workload(user_id):
+    """
+    Odczyt wdrożeń, ofert i projektów użytkownika tak jak przed grupowaniem
+    zapytań: osobne zapytanie o operacje każdego projektu
+    """
+    cursor = DBManager().get_connection().cursor()
+    for project_type, table, operations_table, fk_column in LEGACY_PROJECT_TABLES:
+        cursor.execute(f"SELECT * FROM {table}")
+        for project_data in cursor.fetchall():
+            cursor.execute(f"SELECT * FROM {operations_table} WHERE {fk_column} = ?", (project_data['id'],))
+            cursor.fetchall()
+    
+    project_type, table, operations_table, fk_column = LEGACY_PROJECT_TABLES[0]
+    cursor.execute(f"SELECT DISTINCT {fk_column} FROM {operations_table} WHERE user_id = ?", (user_id,))
+    for (project_id,) in cursor.fetchall():
+        cursor.execute(f"SELECT * FROM {table} WHERE id = ?", (project_id,))
+        cursor.fetchone()
+        cursor.execute(f"SELECT * FROM {operations_table} WHERE {fk_column} = ?", (project_id,))
+        cursor.fetchall()
+
+
+def batched_workload(user_id):
+    """Ten sam odczyt przez modele (operacje pobierane jednym zapytaniem na listę)"""
+    Implementation.get_all()
+    Offer.get_all()
+    Implementation.get_by_user_id(user_id)
+
+
+def measure(workload, user_id):
+    """
+    Mierzy liczbę zapytań i czas wykonania odczytu
+    
+    Returns:
+        tuple: (liczba zapytań, czas [s])
+    """
+    conn = DBManager().get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        start = time.perf_counter()
+        workload(user_id)
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.set_trace_callback(None)
+    return len(statements), elapsed
+
+
+def run_operations(sizes, seed=1):
+    """
+    Porównuje odczyt projektów z operacjami przed i po grupowaniu zapytań
+    
+    Pomiar "przed" jest wykonywany na schemacie LEGACY_SCHEMA_VERSION, a "po"
+    na tych samych danych po migracji do bieżącej wersji.
+    
+    Returns:
+        list: Lista krotek (projekty, zapytania przed, zapytania po, czas przed [s], czas po [s])
+    """
+    results = []
+    for projects in sizes:
+        with temporary_database(LEGACY_SCHEMA_VERSION):
+            seed_legacy_projects(projects, seed=seed)
+            user_id = DBManager().get_connection().execute("SELECT MIN(id) FROM users").fetchone()[0]
+            naive_queries, naive_elapsed = measure(naive_workload, user_id)
+            migrate()
+            batched_queries, batched_elapsed = measure(batched_workload, user_id)
+        results.append((projects, naive_queries, batched_queries, naive_elapsed, batched_elapsed))
+    return results
+
+
+def run_plans(projects, seed=1):
+    """
+    Sprawdza plany zapytań z HOT_QUERIES na bazie z danymi zmigrowanej do bieżącej wersji
+    
+    Returns:
+        list: Lista krotek (nazwa zapytania, szczegóły planu) z find_table_scans()
+    """
+    with temporary_database(LEGACY_SCHEMA_VERSION):
+        seed_legacy_projects(projects, seed=seed)
+        migrate()
+        return find_table_scans()
+
+
+def _use_profile(profile):
+    """Ustawia w DBManager parametry połączenia z podanego profilu"""
+    db_manager = DBManager()
+    db_manager.close_connection()
+    db_manager.pragmas = db_manager._get_pragmas({'db_profile': profile})
+
+
+def _writer(db_path, profile, user_id, tasks):
+    """
+    Proces piszący: zapisuje zadania na przemian z odczytem ostatnich zadań
+    
+    Returns:
+        int: Liczba błędów "database is locked"
+    """
+    _use_profile(profile)
+    DBManager().db_path = db_path
+    
+    errors = 0
+    start = datetime.datetime(2026, 1, 1, 8)
+    for i in range(tasks):
+        start_time = start + datetime.timedelta(minutes=15 * i)
+        task = Task(user_id, Task.CATEGORIES[0], Task.TYPES[4], f"Zadanie {i}",
+                    start_time.isoformat(" "), (start_time + datetime.timedelta(minutes=15)).isoformat(" "), 900)
+        try:
+            task.save()
+            Task.get_page(user_id, limit=50)
+        except sqlite3.OperationalError:
+            errors += 1
+    DBManager().close_connection()
+    return errors
+
+
+def run_writers(profiles, writers=20, tasks=50):
+    """
+    Symuluje równoczesne zapisy zadań przez wielu użytkowników (osobne procesy)
+    
+    Returns:
+        list: Lista krotek (profil, czas [s], zapisane zadania, błędy)
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for profile in profiles:
+        _use_profile(profile)
+        with temporary_database() as db_path:
+            conn = DBManager().get_connection()
+            conn.executemany(
+                "INSERT INTO users (username, first_name, last_name, password_hash) VALUES (?, ?, ?, ?)",
+                [(f"writer{i}", "Test", f"Użytkownik {i}", "-") for i in range(writers)]
+            )
+            conn.commit()
+            user_ids = [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id DESC LIMIT ?", (writers,))]
+            DBManager().close_connection()
+            
+            with context.Pool(writers) as pool:
+                start = time.perf_counter()
+                errors = pool.starmap(_writer, [(db_path, profile, user_id, tasks) for user_id in user_ids])
+                elapsed = time.perf_counter() - start
+            
+            saved = DBManager().get_connection().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        results.append((profile, elapsed, saved, sum(errors)))
+    return results
+
+
+def main(argv=None):
+    """Pomiary wydajności bazy danych na tymczasowej bazie"""
+    parser = argparse.ArgumentParser(description="Pomiary wydajności bazy danych")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    operations = commands.add_parser("operations", help="Odczyt projektów z operacjami (liczba zapytań i czas)")
+    operations.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    operations.add_argument("--seed", type=int, default=1)
+    
+    writers = commands.add_parser("writers", help="Równoczesne zapisy zadań (profile połączenia)")
+    writers.add_argument("--writers", type=int, default=20)
+    writers.add_argument("--tasks", type=int, default=50, help="Liczba zadań zapisywanych przez każdy proces")
+    writers.add_argument("profiles", nargs="*", default=sorted(DBManager.PROFILES))
+    plans = commands.add_parser("plans", help="Plany zapytań z HOT_QUERIES (kod wyjścia 1 przy problemach)")
+    plans.add_argument("--projects", type=int, default=1000)
+    plans.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    
+    if args.command == "operations":
+        print(f"{'projekty':>10}{'zapytania przed':>17}{'po':>6}{'czas przed [ms]':>17}{'po':>8}")
+        for projects, naive_queries, batched_queries, naive_elapsed, batched_elapsed in run_operations(
+            args.sizes, args.seed
+        ):
+            print(f"{projects:>10}{naive_queries:>17}{batched_queries:>6}"
+                  f"{naive_elapsed * 1000:>17.0f}{batched_elapsed * 1000:>8.0f}")
+    elif args.command == "writers":
+        print(f"{'profil':<10}{'czas [s]':>10}{'zadania':>10}{'błędy':>8}")
+        for profile, elapsed, saved, errors in run_writers(args.profiles, args.writers, args.tasks):
+            print(f"{profile:<10}{elapsed:>10.2f}{saved:>10}{errors:>8}")
+    elif args.command == "plans":
+        problems = run_plans(args.projects, args.seed)
+        for name, detail in problems:
+            print(f"{name}: {detail}")
+        if problems:
+            return 1
+        print("Wszystkie zapytania z HOT_QUERIES korzystają z indeksów")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,43 @@
 import os
 import sqlite3
 import json
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 class DBManager:
     """Klasa zarządzająca połączeniem z bazą danych"""
     
+    # Profile ustawień połączenia wybierane kluczem "db_profile" w config.json.
+    # Wartości można nadpisać słownikiem "db_pragmas".
+    PROFILES = {
+        # Zachowanie jak dotychczas, z dłuższym oczekiwaniem na blokadę
+        "default": {
+            "busy_timeout": 5000,
+        },
+        # Baza na dysku lokalnym lub serwerze z wieloma użytkownikami: czytelnicy
+        # nie są blokowani przez zapisy. WAL wymaga pamięci współdzielonej,
+        # więc nie działa z plikiem na udziale sieciowym (SMB/NFS).
+        "wal": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 10000,
+            "cache_size": -16000,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+            "foreign_keys": "ON",
+        },
+        # Baza w folderze sieciowym: klasyczny dziennik, długie oczekiwanie na blokadę
+        "network": {
+            "journal_mode": "DELETE",
+            "synchronous": "FULL",
+            "busy_timeout": 30000,
+            "cache_size": -16000,
+            "temp_store": "MEMORY",
+            "foreign_keys": "ON",
+        },
+    }
+    
     _instance = None
     
     def __new__(cls):
@@ -27,33 +59,318 @@ class DBManager:
         # Sprawdź czy istnieje plik konfiguracyjny
         if os.path.exists(self.config_path):
             with open(self.config_path, 'r') as f:
-                config = json.load(f)
-                self.db_path = config.get('db_path', default_db_path)
+                self.config = json.load(f)
+                self.db_path = self.config.get('db_path', default_db_path)
         else:
             # Jeśli nie ma pliku konfiguracyjnego, stwórz go
             os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
             self.db_path = default_db_path
+            self.config = {'db_path': self.db_path}
             with open(self.config_path, 'w') as f:
-                json.dump({'db_path': self.db_path}, f)
+                json.dump(self.config, f)
+        
+        # Ustawienia połączenia
+        self.pragmas = self._get_pragmas(self.config)
         
         # Upewnij się, że katalog bazy danych istnieje
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
         self.conn = None
+        
+        # Pula połączeń dla pracy w wątkach roboczych
+        self.pool_size = self.config.get('db_pool_size', 4)
+        self._pool_lock = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(self.pool_size)
+        self._idle_connections = {False: [], True: []}  # tylko_do_odczytu -> wolne połączenia
+        self._pool_generation = 0
+        self._local = threading.local()
+        
         self._initialized = True
     
+    def _get_pragmas(self, config):
+        """
+        Zwraca ustawienia PRAGMA dla profilu wybranego w konfiguracji
+        
+        Args:
+            config (dict): Zawartość config.json
+            
+        Returns:
+            dict: Nazwa PRAGMA -> wartość
+        """
+        profile_name = config.get('db_profile', 'default')
+        if profile_name not in self.PROFILES:
+            print(f"Nieznany profil bazy danych '{profile_name}', używam 'default'")
+            profile_name = 'default'
+        
+        pragmas = dict(self.PROFILES[profile_name])
+        pragmas.update(config.get('db_pragmas', {}))
+        return pragmas
+    
+    def _configure_connection(self, conn):
+        """Ustawia parametry PRAGMA dla nowego połączenia"""
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+    
+    def _open_connection(self, readonly=False, check_same_thread=True):
+        """Otwiera nowe skonfigurowane połączenie z bazą danych"""
+        # Limit czasu oczekiwania na blokadę w sekundach (busy_timeout jest w ms)
+        timeout = self.pragmas.get('busy_timeout', 5000) / 1000
+        conn = sqlite3.connect(self.db_path, timeout=timeout, check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        self._configure_connection(conn)
+        
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+        
+        return conn
+    
     def get_connection(self):
-        """Zwraca połączenie z bazą danych"""
+        """
+        Zwraca połączenie z bazą danych
+        
+        W wątku, który pobrał połączenie z puli przez connection(), zwraca to
+        połączenie, dzięki czemu modele działają również poza wątkiem GUI.
+        """
+        checked_out = getattr(self._local, 'conn', None)
+        if checked_out is not None:
+            return checked_out
+        
+        if threading.current_thread() is not threading.main_thread():
+            raise RuntimeError(
+                "Dostęp do bazy danych z wątku roboczego wymaga bloku 'with DBManager().connection():'"
+            )
+        
         if self.conn is None:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
+            self.conn = self._open_connection()
         return self.conn
     
+    @contextmanager
+    def connection(self, readonly=False, timeout=30):
+        """
+        Pobiera połączenie z puli na czas bloku with
+        
+        Transakcja połączenia do zapisu jest zatwierdzana po wyjściu z bloku
+        i wycofywana w przypadku wyjątku. Wywołania zagnieżdżone w tym samym
+        wątku używają tego samego połączenia, więc połączenie do zapisu nie
+        może być pobrane wewnątrz bloku tylko do odczytu.
+        
+        Args:
+            readonly (bool): Czy połączenie ma być tylko do odczytu
+            timeout (float): Maksymalny czas oczekiwania na wolne połączenie w sekundach
+            
+        Yields:
+            sqlite3.Connection: Połączenie z bazą danych
+        """
+        existing = getattr(self._local, 'conn', None)
+        if existing is not None:
+            if self._local.readonly and not readonly:
+                raise RuntimeError(
+                    "Nie można pobrać połączenia do zapisu wewnątrz bloku 'connection(readonly=True)'"
+                )
+            yield existing
+            return
+        
+        if not self._pool_slots.acquire(timeout=timeout):
+            raise RuntimeError("Brak wolnego połączenia z bazą danych w puli")
+        
+        try:
+            with self._pool_lock:
+                generation = self._pool_generation
+                idle = self._idle_connections[readonly]
+                conn = idle.pop() if idle else None
+            
+            if conn is None:
+                conn = self._open_connection(readonly=readonly, check_same_thread=False)
+            
+            self._local.conn = conn
+            self._local.readonly = readonly
+            try:
+                yield conn
+                if conn.in_transaction:
+                    conn.commit()
+            except Exception:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                self._local.conn = None
+                with self._pool_lock:
+                    # Połączenia sprzed close_connection() nie wracają do puli
+                    if generation == self._pool_generation:
+                        self._idle_connections[readonly].append(conn)
+                        conn = None
+                if conn is not None:
+                    conn.close()
+        finally:
+            self._pool_slots.release()
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Jednostka pracy: zapisy modeli w bloku with są zatwierdzane jednym commitem
+        
+        Instrukcje przekazane do defer() są grupowane i wykonywane przez
+        executemany tuż przed zatwierdzeniem albo przed najbliższym execute().
+        Kolejność zapisów:
+        - zapisy przez execute() i executemany() zachowują kolejność względem
+          wszystkich wcześniejszych i późniejszych zapisów,
+        - odroczone instrukcje są wykonywane grupami w kolejności pierwszego
+          wystąpienia, więc między dwoma execute() nie mogą zależeć od swojej
+          kolejności (każda dotyczy innego wiersza lub daje ten sam wynik).
+        Odczyty wewnątrz bloku nie widzą jeszcze odroczonych zmian. W przypadku wyjątku wszystkie zmiany są
+        wycofywane, a funkcje z after_commit() nie są wywoływane. Zagnieżdżone
+        bloki należą do transakcji zewnętrznej.
+        
+        Yields:
+            sqlite3.Connection: Połączenie z bazą danych
+        """
+        conn = self.get_connection()
+        
+        if getattr(self._local, 'pending', None) is not None:
+            yield conn
+            return
+        
+        self._local.pending = {}  # instrukcja SQL -> lista parametrów
+        self._local.after_commit = []
+        try:
+            yield conn
+            self._flush(conn)
+            conn.commit()
+            callbacks = self._local.after_commit
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.pending = None
+            self._local.after_commit = None
+        
+        for callback in callbacks:
+            callback()
+    
+    def execute(self, sql, params=()):
+        """
+        Wykonuje instrukcję od razu, zachowując kolejność względem defer()
+        
+        Wewnątrz transaction() najpierw wykonywane są odroczone instrukcje,
+        więc np. DELETE nie wyprzedzi wcześniejszego zapisu tego samego wiersza.
+        Używaj dla zapisów, które potrzebują lastrowid lub rowcount.
+        
+        Args:
+            sql (str): Instrukcja SQL
+            params (tuple): Parametry instrukcji
+            
+        Returns:
+            sqlite3.Cursor: Kursor po wykonaniu instrukcji
+        """
+        conn = self.get_connection()
+        if self.in_transaction():
+            self._flush(conn)
+        return conn.execute(sql, params)
+    
+    def executemany(self, sql, params_list):
+        """
+        Wykonuje instrukcję dla wielu zestawów parametrów od razu (jak execute())
+        
+        Args:
+            sql (str): Instrukcja SQL
+            params_list (list): Lista krotek parametrów
+            
+        Returns:
+            sqlite3.Cursor: Kursor po wykonaniu instrukcji
+        """
+        conn = self.get_connection()
+        if self.in_transaction():
+            self._flush(conn)
+        return conn.executemany(sql, params_list)
+    
+    def data_version(self):
+        """
+        Zwraca znacznik stanu bazy do unieważniania pamięci podręcznych
+        
+        Znacznik zmienia się, gdy inne połączenie (inny klient bazy współdzielonej
+        lub wątek roboczy) zatwierdzi zmiany, oraz po ponownym otwarciu połączenia.
+        Zmiany zatwierdzone przez połączenie bieżącego wątku go nie zmieniają -
+        o nich informuje ModelEvents.
+        
+        Returns:
+            tuple: (pokolenie połączeń, PRAGMA data_version)
+        """
+        conn = self.get_connection()
+        return self._pool_generation, conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def in_transaction(self):
+        """Zwraca True, jeśli bieżący wątek jest wewnątrz transaction()"""
+        return getattr(self._local, 'pending', None) is not None
+    
+    def defer(self, sql, params):
+        """
+        Wykonuje instrukcję od razu lub odkłada ją do końca transaction()
+        
+        Args:
+            sql (str): Instrukcja SQL (UPDATE/DELETE/INSERT bez potrzeby lastrowid)
+            params (tuple): Parametry instrukcji
+        """
+        pending = getattr(self._local, 'pending', None)
+        if pending is None:
+            self.get_connection().execute(sql, params)
+        else:
+            pending.setdefault(sql, []).append(params)
+    
+    def defer_many(self, sql, params_list):
+        """
+        Wykonuje instrukcję dla wielu zestawów parametrów (executemany)
+        lub odkłada je do końca transaction()
+        
+        Args:
+            sql (str): Instrukcja SQL
+            params_list (list): Lista krotek parametrów
+        """
+        pending = getattr(self._local, 'pending', None)
+        if pending is None:
+            self.get_connection().executemany(sql, params_list)
+        else:
+            pending.setdefault(sql, []).extend(params_list)
+    
+    def after_commit(self, callback):
+        """
+        Wywołuje funkcję po zatwierdzeniu zmian - od razu lub na końcu transaction()
+        
+        Args:
+            callback (callable): Funkcja bez argumentów
+        """
+        pending = getattr(self._local, 'after_commit', None)
+        if pending is None:
+            callback()
+        else:
+            pending.append(callback)
+    
+    def commit(self):
+        """Zatwierdza zmiany, chyba że trwa transaction() - wtedy zrobi to jej koniec"""
+        if not self.in_transaction():
+            self.get_connection().commit()
+    
+    def _flush(self, conn):
+        """Wykonuje odroczone instrukcje w kolejności ich pierwszego wystąpienia"""
+        pending = self._local.pending
+        cursor = conn.cursor()
+        for sql, params_list in pending.items():
+            cursor.executemany(sql, params_list)
+        pending.clear()
+    
     def close_connection(self):
-        """Zamyka połączenie z bazą danych"""
+        """Zamyka połączenie z bazą danych oraz wolne połączenia z puli"""
         if self.conn:
             self.conn.close()
             self.conn = None
+        
+        with self._pool_lock:
+            self._pool_generation += 1
+            idle = self._idle_connections[False] + self._idle_connections[True]
+            self._idle_connections = {False: [], True: []}
+        
+        # Połączenia używane w tej chwili zostaną zamknięte przy zwrocie do puli
+        for conn in idle:
+            conn.close()
     
     def update_db_path(self, new_path):
         """Aktualizuje ścieżkę do bazy danych"""
@@ -63,9 +380,10 @@ class DBManager:
         # Aktualizuj ścieżkę
         self.db_path = new_path
         
-        # Zaktualizuj plik konfiguracyjny
+        # Zaktualizuj plik konfiguracyjny (zachowując pozostałe ustawienia)
+        self.config['db_path'] = self.db_path
         with open(self.config_path, 'w') as f:
-            json.dump({'db_path': self.db_path}, f)
+            json.dump(self.config, f)
         
         # Upewnij się, że katalog istnieje
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
@@ -0,0 +1,228 @@
+import datetime
+from database.db_manager import DBManager
+from database.models import Task, Project, Implementation, Offer, User, Role
+from utils.gantt_data import get_gantt_data
+
+# Indeksy dla najczęściej wykonywanych zapytań modeli. Zmiana listy wymaga
+# nowej migracji w database/migrations.py.
+INDEXES = [
+    # Zadania użytkownika sortowane po czasie rozpoczęcia oraz podsumowanie dnia
+    # (task_type i duration w indeksie, aby agregaty nie sięgały do tabeli)
+    ('idx_tasks_user_start',
+     'CREATE INDEX IF NOT EXISTS idx_tasks_user_start ON tasks (user_id, start_time, task_type, duration)'),
+    # Lista wszystkich zadań sortowana po czasie rozpoczęcia
+    ('idx_tasks_start',
+     'CREATE INDEX IF NOT EXISTS idx_tasks_start ON tasks (start_time)'),
+    # Projekty przypisane do użytkownika
+    ('idx_implementation_operations_user',
+     'CREATE INDEX IF NOT EXISTS idx_implementation_operations_user '
+     'ON implementation_operations (user_id, implementation_id)'),
+    ('idx_offer_operations_user',
+     'CREATE INDEX IF NOT EXISTS idx_offer_operations_user '
+     'ON offer_operations (user_id, offer_id)'),
+    # Złączenia ról (user_roles(user_id, role_id) i role_permissions(role_id, ...)
+    # są już pokryte przez ograniczenia UNIQUE)
+    ('idx_user_roles_role',
+     'CREATE INDEX IF NOT EXISTS idx_user_roles_role ON user_roles (role_id, user_id)'),
+    ('idx_role_permissions_name',
+     'CREATE INDEX IF NOT EXISTS idx_role_permissions_name '
+     'ON role_permissions (permission_name, role_id, permission_value)'),
+]
+
+# Unikalne indeksy operacji projektu - jedna operacja o danej nazwie na projekt.
+# Dotyczą dawnych tabel operacji (migracja 4, zastąpione przez PROJECT_INDEXES).
+UNIQUE_INDEXES = [
+    ('idx_implementation_operations_project',
+     'CREATE UNIQUE INDEX IF NOT EXISTS idx_implementation_operations_project '
+     'ON implementation_operations (implementation_id, operation_name)'),
+    ('idx_offer_operations_project',
+     'CREATE UNIQUE INDEX IF NOT EXISTS idx_offer_operations_project '
+     'ON offer_operations (offer_id, operation_name)'),
+]
+
+# Filtry i sortowanie projektów w dawnych tabelach implementations i offers
+# (migracja 6, zastąpione przez PROJECT_INDEXES)
+PROJECT_FILTER_INDEXES = [
+    ('idx_implementations_status_name',
+     'CREATE INDEX IF NOT EXISTS idx_implementations_status_name ON implementations (status, name)'),
+    ('idx_implementations_name',
+     'CREATE INDEX IF NOT EXISTS idx_implementations_name ON implementations (name)'),
+    ('idx_implementation_operations_deadline',
+     'CREATE INDEX IF NOT EXISTS idx_implementation_operations_deadline '
+     'ON implementation_operations (operation_name, end_date, implementation_id)'),
+    ('idx_offers_status_name',
+     'CREATE INDEX IF NOT EXISTS idx_offers_status_name ON offers (status, name)'),
+    ('idx_offers_name',
+     'CREATE INDEX IF NOT EXISTS idx_offers_name ON offers (name)'),
+    ('idx_offer_operations_deadline',
+     'CREATE INDEX IF NOT EXISTS idx_offer_operations_deadline '
+     'ON offer_operations (operation_name, end_date, offer_id)'),
+]
+
+# Wspólne tabele projektów (migracja 7). Unikalny indeks operacji jest też celem
+# INSERT ... ON CONFLICT, pozostałe obsługują filtry i sortowanie Project.query():
+# typ, status i początek nazwy, przypisanego użytkownika oraz termin, czyli datę
+# zakończenia operacji głównej (indeks terminu zastępuje migracja 9)
+PROJECT_INDEXES = [
+    ('idx_project_operations_project',
+     'CREATE UNIQUE INDEX IF NOT EXISTS idx_project_operations_project '
+     'ON project_operations (project_id, operation_name)'),
+    ('idx_project_operations_user',
+     'CREATE INDEX IF NOT EXISTS idx_project_operations_user ON project_operations (user_id, project_id)'),
+    ('idx_project_operations_deadline',
+     'CREATE INDEX IF NOT EXISTS idx_project_operations_deadline '
+     'ON project_operations (operation_name, end_date, project_id)'),
+    ('idx_projects_type',
+     'CREATE INDEX IF NOT EXISTS idx_projects_type ON projects (project_type)'),
+    ('idx_projects_status_name',
+     'CREATE INDEX IF NOT EXISTS idx_projects_status_name ON projects (status, name)'),
+    ('idx_projects_name',
+     'CREATE INDEX IF NOT EXISTS idx_projects_name ON projects (name)'),
+]
+
+# Termin projektu w kolumnie projects.deadline (migracja 9). Indeksy obsługują
+# filtr zakresu terminów i sortowanie Project.query() po terminie lub nazwie razem
+# z filtrem typu albo statusu. Każdy indeks kończy się niejawnie kolumną id, więc
+# obsługuje też kolejność przy równych kluczach (p.id w tym samym kierunku).
+PROJECT_DEADLINE_INDEXES = [
+    ('idx_projects_deadline',
+     'CREATE INDEX IF NOT EXISTS idx_projects_deadline ON projects (deadline)'),
+    ('idx_projects_type_deadline',
+     'CREATE INDEX IF NOT EXISTS idx_projects_type_deadline ON projects (project_type, deadline)'),
+    ('idx_projects_status_deadline',
+     'CREATE INDEX IF NOT EXISTS idx_projects_status_deadline ON projects (status, deadline)'),
+    ('idx_projects_type_name',
+     'CREATE INDEX IF NOT EXISTS idx_projects_type_name ON projects (project_type, name)'),
+]
+
+# Indeksy z PROJECT_INDEXES zbędne od migracji 9 (termin jest w projects)
+OBSOLETE_PROJECT_INDEXES = ['idx_project_operations_deadline']
+
+# Operacje nachodzące na zakres dat wykresu Gantta (utils.gantt_data, migracja 8)
+SCHEDULE_INDEXES = [
+    ('idx_project_operations_dates',
+     'CREATE INDEX IF NOT EXISTS idx_project_operations_dates '
+     'ON project_operations (end_date, start_date, user_id)'),
+]
+
+# Stronicowanie zadań użytkownika po (start_time, id) (Task.get_page, migracja 10).
+# W idx_tasks_user_start po start_time są task_type i duration, więc kolejność
+# id przy równym czasie rozpoczęcia wymagała dodatkowego sortowania.
+TASK_PAGE_INDEXES = [
+    ('idx_tasks_user_page',
+     'CREATE INDEX IF NOT EXISTS idx_tasks_user_page ON tasks (user_id, start_time)'),
+]
+
+# Wywołania, których zapytania muszą korzystać z indeksów (nazwa, funkcja bez
+# argumentów). Sprawdzane są zapytania wykonane przez modele, a nie ich kopie.
+HOT_QUERIES = [
+    ('Task.get_by_user_id', lambda: Task.get_by_user_id(1)),
+    ('Task.get_all_tasks', Task.get_all_tasks),
+    ('Task.get_page', lambda: Task.get_page(1, ('9999-12-31 00:00:00', 1))),
+    ('Task.get_page (wszyscy)', lambda: Task.get_page(None, ('9999-12-31 00:00:00', 1))),
+    ('Task.get_page (nowsze)', lambda: Task.get_page(1, before=('2000-01-01 00:00:00', 1))),
+    ('Task.get_totals', lambda: Task.get_totals(1)),
+    ('Task.get_type_totals', lambda: Task.get_type_totals(1, '2024-01-01', '2024-01-02')),
+    ('Project.get_by_id', lambda: Project.get_by_id(1)),
+    ('Implementation.get_all', Implementation.get_all),
+    ('Project.get_by_user_id', lambda: Project.get_by_user_id(1)),
+    ('Project.query (nazwa)', lambda: Project.query(order_by="name")),
+    ('Project.query (nazwa malejąco)', lambda: Project.query(order_by="name", descending=True)),
+    ('Project.query (status, nazwa)', lambda: Project.query(status="W trakcie", order_by="name")),
+    ('Implementation.query (nazwa malejąco)', lambda: Implementation.query(order_by="name", descending=True)),
+    ('Project.query (termin)', lambda: Project.query(order_by="deadline")),
+    ('Project.query (termin malejąco)', lambda: Project.query(order_by="deadline", descending=True)),
+    ('Project.query (status, termin malejąco)',
+     lambda: Project.query(status="W trakcie", order_by="deadline", descending=True)),
+    ('Offer.query (termin)', lambda: Offer.query(order_by="deadline")),
+    ('Project.query (zakres terminów)',
+     lambda: Project.query(deadline_from="2024-01-01", deadline_to="2024-12-31", order_by="deadline")),
+    ('get_gantt_data', lambda: get_gantt_data(
+        [User.get_by_id(1)], datetime.date(2024, 1, 1), datetime.date(2024, 3, 31))),
+    ('Role.get_user_roles', lambda: Role.get_user_roles(1)),
+    ('Role.check_user_permission', lambda: Role.check_user_permission(1, 'admin_panel')),
+    ('User.get_by_username', lambda: User.get_by_username('admin')),
+]
+
+# Zapytania, których mały wynik wybrany indeksem jest sortowany w pamięci:
+# operacje widocznego okresu wykresu Gantta (w kolejności projektów) i role
+# jednego użytkownika (według nazwy)
+SORTED_IN_MEMORY = {'get_gantt_data', 'Role.get_user_roles'}
+
+
+def create_indexes(cursor, indexes=INDEXES):
+    """
+    Tworzy indeksy z podanej listy
+
+    Args:
+        cursor (sqlite3.Cursor): Kursor bazy danych
+        indexes (list): Lista krotek (nazwa indeksu, instrukcja CREATE INDEX)
+    """
+    for _, sql in indexes:
+        cursor.execute(sql)
+
+
+def find_table_scans(conn=None, queries=None):
+    """
+    Sprawdza plany zapytań wykonywanych przez wywołania z listy HOT_QUERIES
+
+    Zapytania są przechwytywane przez set_trace_callback (z wartościami
+    parametrów), a następnie sprawdzane przez EXPLAIN QUERY PLAN. Zgłaszane są:
+    pełne przeszukanie tabeli bez użycia indeksu (SCAN bez USING INDEX, poza
+    tabelami wirtualnymi, np. json_each z listą ID) oraz sortowanie wyniku
+    w tymczasowym B-drzewie (USE TEMP B-TREE FOR ORDER BY), poza zapytaniami
+    z SORTED_IN_MEMORY. Grupowanie w B-drzewie (GROUP BY) jest dozwolone -
+    dotyczy tylko wierszy wybranych indeksem.
+
+    Statystyki ANALYZE są na czas sprawdzenia ukrywane (w punkcie zapisu
+    wycofywanym na końcu), aby wynik zależał od dostępnych indeksów, a nie od
+    rozmiaru danych - dla małych tabel planista słusznie wybiera przeszukanie.
+
+    Args:
+        conn (sqlite3.Connection, optional): Połączenie z bazą danych
+            (to samo, z którego korzystają modele)
+        queries (list, optional): Lista krotek (nazwa, funkcja); domyślnie HOT_QUERIES
+
+    Returns:
+        list: Lista krotek (nazwa zapytania, szczegóły planu)
+    """
+    if conn is None:
+        conn = DBManager().get_connection()
+    if queries is None:
+        queries = HOT_QUERIES
+    cursor = conn.cursor()
+
+    cursor.execute("SAVEPOINT find_table_scans")
+    try:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'sqlite_stat%'")
+        for (stat_table,) in cursor.fetchall():
+            cursor.execute(f"DELETE FROM {stat_table}")
+        cursor.execute("ANALYZE sqlite_master")
+
+        problems = []
+        for name, call in queries:
+            statements = []
+            conn.set_trace_callback(statements.append)
+            try:
+                call()
+            finally:
+                conn.set_trace_callback(None)
+
+            for sql in statements:
+                if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                for row in cursor.fetchall():
+                    detail = row[3]
+                    if detail.startswith('SCAN') and 'USING' not in detail and 'VIRTUAL TABLE' not in detail:
+                        problems.append((name, detail))
+                    elif (detail.startswith('USE TEMP B-TREE') and 'ORDER BY' in detail
+                          and name not in SORTED_IN_MEMORY):
+                        problems.append((name, detail))
+    finally:
+        # Przywróć statystyki i wczytaj je ponownie
+        cursor.execute("ROLLBACK TO find_table_scans")
+        cursor.execute("RELEASE find_table_scans")
+        cursor.execute("ANALYZE sqlite_master")
+
+    return problems
@@ -0,0 +1,667 @@
+import time
+from database.db_manager import DBManager
+from database.indexes import (
+    create_indexes, UNIQUE_INDEXES, PROJECT_FILTER_INDEXES, PROJECT_INDEXES,
+    SCHEDULE_INDEXES, PROJECT_DEADLINE_INDEXES, OBSOLETE_PROJECT_INDEXES, TASK_PAGE_INDEXES
+)
+
+# Domyślne role tworzone w nowej bazie: (nazwa, opis, uprawnienia)
+DEFAULT_ROLES = [
+    ("Administrator", "Pełne uprawnienia administracyjne", {
+        "admin_panel": True,
+        "manage_users": True,
+        "manage_roles": True,
+        "manage_implementations": True,
+        "manage_offers": True,
+        "view_all_tasks": True,
+        "export_data": True
+    }),
+    ("Kierownik", "Zarządzanie projektami i podgląd danych", {
+        "admin_panel": False,
+        "manage_users": False,
+        "manage_roles": False,
+        "manage_implementations": True,
+        "manage_offers": True,
+        "view_all_tasks": True,
+        "export_data": True
+    }),
+    ("Użytkownik", "Podstawowe uprawnienia użytkownika", {
+        "admin_panel": False,
+        "manage_users": False,
+        "manage_roles": False,
+        "manage_implementations": False,
+        "manage_offers": False,
+        "view_all_tasks": False,
+        "export_data": True
+    }),
+    ("Wdrożenia", "Specjalista od wdrożeń", {"task_implementation": True}),
+    ("Oferty", "Specjalista od ofert", {"task_offer": True}),
+    ("Spawanie", "Specjalista od spawania", {"task_welding": True}),
+    ("Klejenie", "Specjalista od klejenia", {"task_gluing": True}),
+    ("Malowanie", "Specjalista od malowania", {"task_painting": True}),
+]
+
+# Ścieżki baz danych sprawdzonych już w tym procesie
+_migrated_paths = set()
+
+
+def _add_missing_columns(cursor, table, columns):
+    """
+    Dodaje kolumny brakujące w starszych wersjach bazy
+
+    Args:
+        cursor (sqlite3.Cursor): Kursor bazy danych
+        table (str): Nazwa tabeli
+        columns (list): Lista krotek (nazwa kolumny, definicja)
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {column[1] for column in cursor.fetchall()}
+
+    for column_name, definition in columns:
+        if column_name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column_name} {definition}")
+
+
+def _create_base_schema(cursor):
+    """Tworzy tabele aplikacji i uzupełnia kolumny starszych baz"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        password_hash TEXT NOT NULL,
+        is_admin BOOLEAN NOT NULL DEFAULT 0,
+        password_reset_required BOOLEAN NOT NULL DEFAULT 0,
+        reset_requested BOOLEAN NOT NULL DEFAULT 0
+    )
+    ''')
+    _add_missing_columns(cursor, "users", [
+        ("password_reset_required", "BOOLEAN NOT NULL DEFAULT 0"),
+        ("reset_requested", "BOOLEAN NOT NULL DEFAULT 0"),
+    ])
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        task_type TEXT NOT NULL,
+        description TEXT,
+        start_time TEXT NOT NULL,
+        end_time TEXT,
+        duration INTEGER,
+        implementation_id INTEGER,
+        offer_id INTEGER,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+        FOREIGN KEY (implementation_id) REFERENCES implementations (id) ON DELETE SET NULL,
+        FOREIGN KEY (offer_id) REFERENCES offers (id) ON DELETE SET NULL
+    )
+    ''')
+
+    # Wdrożenia i oferty mają identyczną strukturę
+    for table, operations_table, fk_column in (
+        ("implementations", "implementation_operations", "implementation_id"),
+        ("offers", "offer_operations", "offer_id"),
+    ):
+        cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            status TEXT NOT NULL DEFAULT "W trakcie"
+        )
+        ''')
+
+        cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {operations_table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {fk_column} INTEGER NOT NULL,
+            operation_name TEXT NOT NULL,
+            user_id INTEGER,
+            start_date TEXT,
+            end_date TEXT,
+            required BOOLEAN NOT NULL DEFAULT 1,
+            min_days INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY ({fk_column}) REFERENCES {table} (id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE SET NULL
+        )
+        ''')
+        _add_missing_columns(cursor, operations_table, [
+            ("required", "BOOLEAN NOT NULL DEFAULT 1"),
+            ("min_days", "INTEGER NOT NULL DEFAULT 1"),
+        ])
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS roles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        description TEXT
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS role_permissions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        role_id INTEGER NOT NULL,
+        permission_name TEXT NOT NULL,
+        permission_value BOOLEAN NOT NULL DEFAULT 0,
+        FOREIGN KEY (role_id) REFERENCES roles (id) ON DELETE CASCADE,
+        UNIQUE(role_id, permission_name)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS user_roles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        role_id INTEGER NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+        FOREIGN KEY (role_id) REFERENCES roles (id) ON DELETE CASCADE,
+        UNIQUE(user_id, role_id)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS workload_limits (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        max_implementations INTEGER NOT NULL DEFAULT 1,
+        max_offers INTEGER NOT NULL DEFAULT 2,
+        max_total_projects INTEGER NOT NULL DEFAULT 2
+    )
+    ''')
+
+
+def _insert_default_data(cursor):
+    """Dodaje domyślne limity obciążenia i role, jeśli baza ich nie ma"""
+    cursor.execute("SELECT COUNT(*) as count FROM workload_limits")
+    if cursor.fetchone()['count'] == 0:
+        cursor.execute('''
+        INSERT INTO workload_limits (max_implementations, max_offers, max_total_projects)
+        VALUES (1, 2, 2)
+        ''')
+
+    cursor.execute("SELECT COUNT(*) as count FROM roles")
+    if cursor.fetchone()['count'] > 0:
+        return
+
+    role_ids = {}
+    for name, description, permissions in DEFAULT_ROLES:
+        cursor.execute("INSERT INTO roles (name, description) VALUES (?, ?)", (name, description))
+        role_ids[name] = cursor.lastrowid
+        cursor.executemany('''
+        INSERT INTO role_permissions (role_id, permission_name, permission_value)
+        VALUES (?, ?, ?)
+        ''', [(role_ids[name], perm, value) for perm, value in permissions.items()])
+
+    # Administratorzy dostają rolę administratora, pozostali rolę użytkownika
+    cursor.execute('''
+    INSERT INTO user_roles (user_id, role_id)
+    SELECT id, CASE WHEN is_admin = 1 THEN ? ELSE ? END FROM users
+    ''', (role_ids["Administrator"], role_ids["Użytkownik"]))
+
+
+def _create_indexes(cursor):
+    """Tworzy indeksy dla najczęstszych zapytań"""
+    create_indexes(cursor)
+    cursor.execute("ANALYZE")
+
+
+def _unique_project_operations(cursor):
+    """Usuwa zduplikowane operacje projektów i zakłada unikalne indeksy"""
+    for operations_table, fk_column in (
+        ("implementation_operations", "implementation_id"),
+        ("offer_operations", "offer_id"),
+    ):
+        # Zostaw najnowszy wpis każdej operacji (tak odczytywały go modele)
+        cursor.execute(f'''
+        DELETE FROM {operations_table}
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM {operations_table}
+            GROUP BY {fk_column}, operation_name
+        )
+        ''')
+
+    # Zwykłe indeksy o tych nazwach zastępujemy unikalnymi
+    for name, _ in UNIQUE_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+    create_indexes(cursor, UNIQUE_INDEXES)
+
+
+# Tabele, w których nowe rekordy dostają najniższe wolne ID
+FREE_ID_TABLES = ["users", "roles"]
+
+
+def _create_free_id_lists(cursor):
+    """
+    Tworzy listę wolnych ID (luk po usuniętych rekordach) utrzymywaną przez wyzwalacze
+
+    Dzięki niej wyszukanie najniższego wolnego ID nie wymaga przeglądania całej tabeli.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS free_ids (
+        table_name TEXT NOT NULL,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (table_name, id)
+    ) WITHOUT ROWID
+    ''')
+
+    for table in FREE_ID_TABLES:
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_free_id_insert AFTER INSERT ON {table}
+        BEGIN
+            DELETE FROM free_ids WHERE table_name = '{table}' AND id = NEW.id;
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_free_id_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT OR IGNORE INTO free_ids (table_name, id) VALUES ('{table}', OLD.id);
+        END
+        ''')
+        
+        # Luki istniejące przed migracją
+        cursor.execute(f'''
+        WITH RECURSIVE seq(id) AS (
+            SELECT 1
+            UNION ALL
+            SELECT id + 1 FROM seq WHERE id < (SELECT MAX(id) FROM {table})
+        )
+        INSERT OR IGNORE INTO free_ids (table_name, id)
+        SELECT '{table}', seq.id FROM seq
+        WHERE seq.id NOT IN (SELECT id FROM {table})
+        ''')
+
+
+def _create_project_filter_indexes(cursor):
+    """Tworzy indeksy filtrów i sortowania projektów"""
+    create_indexes(cursor, PROJECT_FILTER_INDEXES)
+    cursor.execute("ANALYZE")
+
+
+# Dawne tabele wdrożeń i ofert: (typ projektu, tabela, tabela operacji, kolumna klucza
+# w tabeli operacji i w tasks)
+LEGACY_PROJECT_TABLES = [
+    ("implementation", "implementations", "implementation_operations", "implementation_id"),
+    ("offer", "offers", "offer_operations", "offer_id"),
+]
+
+
+def _last_id(cursor, table):
+    """Zwraca najwyższe ID nadane w tabeli (także usuniętym rekordom)"""
+    cursor.execute(f'''
+    SELECT MAX(
+        COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),
+        COALESCE((SELECT MAX(id) FROM {table}), 0)
+    ) as last_id
+    ''', (table,))
+    return cursor.fetchone()['last_id']
+
+
+def _set_sequence(cursor, table, seq):
+    """Ustawia licznik AUTOINCREMENT tabeli"""
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+    cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, seq))
+
+
+def _merge_project_tables(cursor):
+    """
+    Przenosi wdrożenia i oferty do wspólnych tabel projects i project_operations
+    
+    Wdrożenia zachowują swoje ID, a ID ofert są przesuwane za najwyższe ID
+    nadane wdrożeniu (również w tasks.offer_id); ID sprzed migracji zostaje
+    w kolumnie legacy_id. Tabela tasks jest przebudowywana, aby jej klucze obce
+    wskazywały na projects. Dawne tabele zastępują widoki o tych samych nazwach
+    i kolumnach (zapis przez nie umożliwia migracja 11).
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS projects (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_type TEXT NOT NULL CHECK (project_type IN ('implementation', 'offer')),
+        name TEXT NOT NULL,
+        description TEXT,
+        status TEXT NOT NULL DEFAULT "W trakcie",
+        legacy_id INTEGER
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS project_operations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INTEGER NOT NULL,
+        operation_name TEXT NOT NULL,
+        user_id INTEGER,
+        start_date TEXT,
+        end_date TEXT,
+        required BOOLEAN NOT NULL DEFAULT 1,
+        min_days INTEGER NOT NULL DEFAULT 1,
+        FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE SET NULL
+    )
+    ''')
+    
+    # Przesunięcie ID projektów każdego typu
+    offsets = {}
+    next_offset = 0
+    for project_type, table, operations_table, fk_column in LEGACY_PROJECT_TABLES:
+        offsets[fk_column] = next_offset
+        cursor.execute(f'''
+        INSERT INTO projects (id, project_type, name, description, status, legacy_id)
+        SELECT id + ?, ?, name, description, status, id FROM {table}
+        ''', (next_offset, project_type))
+        
+        # Operacje usuniętych projektów są pomijane, a nieistniejący użytkownicy
+        # zerowani (bazy pracujące bez PRAGMA foreign_keys)
+        cursor.execute(f'''
+        INSERT INTO project_operations
+        (project_id, operation_name, user_id, start_date, end_date, required, min_days)
+        SELECT o.{fk_column} + ?, o.operation_name, (SELECT u.id FROM users u WHERE u.id = o.user_id),
+               o.start_date, o.end_date, o.required, o.min_days
+        FROM {operations_table} o
+        WHERE o.{fk_column} IN (SELECT id FROM {table})
+        ORDER BY o.id
+        ''', (next_offset,))
+        
+        next_offset += _last_id(cursor, table)
+    _set_sequence(cursor, "projects", next_offset)
+    
+    # Przebudowa tasks z kluczami obcymi do projects (indeksy odtwarzane bez zmian)
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tasks' AND sql IS NOT NULL")
+    task_indexes = [row['sql'] for row in cursor.fetchall()]
+    tasks_seq = _last_id(cursor, "tasks")
+    
+    cursor.execute('''
+    CREATE TABLE tasks_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        task_type TEXT NOT NULL,
+        description TEXT,
+        start_time TEXT NOT NULL,
+        end_time TEXT,
+        duration INTEGER,
+        implementation_id INTEGER,
+        offer_id INTEGER,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+        FOREIGN KEY (implementation_id) REFERENCES projects (id) ON DELETE SET NULL,
+        FOREIGN KEY (offer_id) REFERENCES projects (id) ON DELETE SET NULL
+    )
+    ''')
+    # Zadania usuniętych użytkowników są pomijane (jak operacje usuniętych projektów)
+    cursor.execute('''
+    INSERT INTO tasks_new
+    (id, user_id, category, task_type, description, start_time, end_time, duration, implementation_id, offer_id)
+    SELECT t.id, t.user_id, t.category, t.task_type, t.description, t.start_time, t.end_time, t.duration,
+           (SELECT p.id FROM projects p WHERE p.id = t.implementation_id + ?),
+           (SELECT p.id FROM projects p WHERE p.id = t.offer_id + ?)
+    FROM tasks t
+    WHERE t.user_id IN (SELECT id FROM users)
+    ''', (offsets["implementation_id"], offsets["offer_id"]))
+    cursor.execute("DROP TABLE tasks")
+    cursor.execute("ALTER TABLE tasks_new RENAME TO tasks")
+    _set_sequence(cursor, "tasks", tasks_seq)
+    for sql in task_indexes:
+        cursor.execute(sql)
+    
+    # Widoki zgodności w miejsce dawnych tabel
+    for project_type, table, operations_table, fk_column in LEGACY_PROJECT_TABLES:
+        cursor.execute(f"DROP TABLE {operations_table}")
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f'''
+        CREATE VIEW {table} AS
+        SELECT id, name, description, status FROM projects
+        WHERE project_type = '{project_type}'
+        ''')
+        cursor.execute(f'''
+        CREATE VIEW {operations_table} AS
+        SELECT o.id, o.project_id AS {fk_column}, o.operation_name, o.user_id,
+               o.start_date, o.end_date, o.required, o.min_days
+        FROM project_operations o
+        JOIN projects p ON p.id = o.project_id
+        WHERE p.project_type = '{project_type}'
+        ''')
+    
+    create_indexes(cursor, PROJECT_INDEXES)
+    cursor.execute("ANALYZE")
+
+
+def _create_schedule_indexes(cursor):
+    """Tworzy indeks zakresu dat operacji projektów (wykres Gantta)"""
+    create_indexes(cursor, SCHEDULE_INDEXES)
+    cursor.execute("ANALYZE")
+
+
+# Termin projektu: data zakończenia operacji "Wdrożenie" (bez daty - na końcu listy)
+PROJECT_DEADLINE_SQL = '''
+COALESCE((
+    SELECT NULLIF(o.end_date, '') FROM project_operations o
+    WHERE o.project_id = projects.id AND o.operation_name = 'Wdrożenie'
+), '9999-99-99')
+'''
+
+
+def _add_project_deadlines(cursor):
+    """
+    Dodaje do projects kolumnę deadline z terminem projektu utrzymywaną przez wyzwalacze
+
+    Termin liczony wcześniej w Project.query() przez złączenie z project_operations
+    nie mógł korzystać z indeksu, więc sortowanie po nim wymagało sortowania
+    wszystkich projektów.
+    """
+    _add_missing_columns(cursor, "projects", [("deadline", "TEXT NOT NULL DEFAULT '9999-99-99'")])
+    cursor.execute(f"UPDATE projects SET deadline = {PROJECT_DEADLINE_SQL}")
+
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS project_operations_deadline_insert
+    AFTER INSERT ON project_operations
+    WHEN NEW.operation_name = 'Wdrożenie'
+    BEGIN
+        UPDATE projects SET deadline = {PROJECT_DEADLINE_SQL} WHERE id = NEW.project_id;
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS project_operations_deadline_update
+    AFTER UPDATE OF project_id, operation_name, end_date ON project_operations
+    WHEN OLD.operation_name = 'Wdrożenie' OR NEW.operation_name = 'Wdrożenie'
+    BEGIN
+        UPDATE projects SET deadline = {PROJECT_DEADLINE_SQL} WHERE id IN (OLD.project_id, NEW.project_id);
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS project_operations_deadline_delete
+    AFTER DELETE ON project_operations
+    WHEN OLD.operation_name = 'Wdrożenie'
+    BEGIN
+        UPDATE projects SET deadline = {PROJECT_DEADLINE_SQL} WHERE id = OLD.project_id;
+    END
+    ''')
+
+    for name in OBSOLETE_PROJECT_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+    create_indexes(cursor, PROJECT_DEADLINE_INDEXES)
+    cursor.execute("ANALYZE")
+
+
+def _create_task_page_indexes(cursor):
+    """Tworzy indeks stronicowania zadań użytkownika"""
+    create_indexes(cursor, TASK_PAGE_INDEXES)
+    cursor.execute("ANALYZE")
+
+
+def _writable_legacy_views(cursor):
+    """
+    Odtwarza widoki dawnych tabel wdrożeń i ofert z kolumną legacy_id i wyzwalaczami
+    INSTEAD OF, które przenoszą zapisy starszych wersji aplikacji do projects
+    i project_operations
+
+    Zmiany i usuwanie projektów oraz wszystkie zapisy operacji są przenoszone.
+    Dodanie projektu przez widok jest odrzucane: po wyzwalaczu INSTEAD OF
+    cursor.lastrowid nie wskazuje nowego wiersza, więc starsza wersja zapisałaby
+    operacje przy innym projekcie. Nowe projekty wymagają aktualnej wersji aplikacji.
+    Zmian wykonanych przez wyzwalacze nie obejmuje cursor.rowcount (dla widoku
+    zawsze 0), więc starsza wersja zgłasza usunięcie projektu jako nieudane,
+    choć projekt został usunięty.
+
+    legacy_id to ID wdrożenia lub oferty sprzed migracji 7 (ID ofert zostały
+    wtedy przesunięte). Bazy zmigrowane przed dodaniem tej kolumny nie mają
+    zapisanych dawnych ID - dla nich, tak jak dla nowych projektów, jest NULL.
+    """
+    _add_missing_columns(cursor, "projects", [("legacy_id", "INTEGER")])
+
+    for project_type, table, operations_table, fk_column in LEGACY_PROJECT_TABLES:
+        cursor.execute(f"DROP VIEW IF EXISTS {table}")
+        cursor.execute(f'''
+        CREATE VIEW {table} AS
+        SELECT id, name, description, status, legacy_id FROM projects
+        WHERE project_type = '{project_type}'
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER {table}_insert INSTEAD OF INSERT ON {table}
+        BEGIN
+            SELECT RAISE(ABORT, 'Dodawanie projektów wymaga aktualnej wersji aplikacji');
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER {table}_update INSTEAD OF UPDATE ON {table}
+        BEGIN
+            UPDATE projects SET name = NEW.name, description = NEW.description, status = NEW.status
+            WHERE id = OLD.id;
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER {table}_delete INSTEAD OF DELETE ON {table}
+        BEGIN
+            DELETE FROM projects WHERE id = OLD.id;
+        END
+        ''')
+
+        # Widok operacji z migracji 7 pozostaje bez zmian, dochodzą wyzwalacze
+        cursor.execute(f'''
+        CREATE TRIGGER {operations_table}_insert INSTEAD OF INSERT ON {operations_table}
+        BEGIN
+            SELECT RAISE(ABORT, 'Projekt nie istnieje lub jest innego typu')
+            WHERE NOT EXISTS (
+                SELECT 1 FROM projects WHERE id = NEW.{fk_column} AND project_type = '{project_type}'
+            );
+            INSERT INTO project_operations
+            (id, project_id, operation_name, user_id, start_date, end_date, required, min_days)
+            VALUES (NEW.id, NEW.{fk_column}, NEW.operation_name, NEW.user_id, NEW.start_date, NEW.end_date,
+                    COALESCE(NEW.required, 1), COALESCE(NEW.min_days, 1));
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER {operations_table}_update INSTEAD OF UPDATE ON {operations_table}
+        BEGIN
+            SELECT RAISE(ABORT, 'Projekt nie istnieje lub jest innego typu')
+            WHERE NOT EXISTS (
+                SELECT 1 FROM projects WHERE id = NEW.{fk_column} AND project_type = '{project_type}'
+            );
+            UPDATE project_operations
+            SET project_id = NEW.{fk_column}, operation_name = NEW.operation_name, user_id = NEW.user_id,
+                start_date = NEW.start_date, end_date = NEW.end_date,
+                required = NEW.required, min_days = NEW.min_days
+            WHERE id = OLD.id;
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER {operations_table}_delete INSTEAD OF DELETE ON {operations_table}
+        BEGIN
+            DELETE FROM project_operations WHERE id = OLD.id;
+        END
+        ''')
+
+
+def _remove_orphaned_rows(cursor):
+    """
+    Usuwa lub odłącza rekordy wskazujące na usunięte wiersze
+
+    Bazy pracujące bez PRAGMA foreign_keys (profil "default") mogły zachować
+    przypisania ról, uprawnienia, zadania i operacje usuniętych użytkowników,
+    ról i projektów. Porządki odpowiadają klauzulom ON DELETE kluczy obcych.
+    """
+    cursor.execute("DELETE FROM user_roles WHERE user_id NOT IN (SELECT id FROM users)")
+    cursor.execute("DELETE FROM user_roles WHERE role_id NOT IN (SELECT id FROM roles)")
+    cursor.execute("DELETE FROM role_permissions WHERE role_id NOT IN (SELECT id FROM roles)")
+    cursor.execute("DELETE FROM tasks WHERE user_id NOT IN (SELECT id FROM users)")
+    cursor.execute("UPDATE tasks SET implementation_id = NULL WHERE implementation_id NOT IN (SELECT id FROM projects)")
+    cursor.execute("UPDATE tasks SET offer_id = NULL WHERE offer_id NOT IN (SELECT id FROM projects)")
+    cursor.execute("DELETE FROM project_operations WHERE project_id NOT IN (SELECT id FROM projects)")
+    cursor.execute("UPDATE project_operations SET user_id = NULL WHERE user_id NOT IN (SELECT id FROM users)")
+
+
+# Lista migracji: (wersja, opis, funkcja). Nowe migracje dopisuj na końcu.
+MIGRATIONS = [
+    (1, "Schemat podstawowy", _create_base_schema),
+    (2, "Dane domyślne", _insert_default_data),
+    (3, "Indeksy zapytań", _create_indexes),
+    (4, "Unikalne operacje projektów", _unique_project_operations),
+    (5, "Lista wolnych ID", _create_free_id_lists),
+    (6, "Indeksy filtrów projektów", _create_project_filter_indexes),
+    (7, "Wspólne tabele projektów", _merge_project_tables),
+    (8, "Indeks zakresu dat operacji", _create_schedule_indexes),
+    (9, "Termin projektu w tabeli projects", _add_project_deadlines),
+    (10, "Indeks stronicowania zadań", _create_task_page_indexes),
+    (11, "Zapis przez widoki dawnych tabel projektów", _writable_legacy_views),
+    (12, "Usunięcie osieroconych rekordów", _remove_orphaned_rows),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """Zwraca wersję schematu zapisaną w bazie (PRAGMA user_version)"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate():
+    """
+    Aktualizuje schemat bazy danych do najnowszej wersji
+
+    Wszystkie brakujące migracje są wykonywane w jednej transakcji.
+    Jeśli baza jest aktualna, kończy się po odczycie wersji. Plany zapytań
+    po zmianie indeksów sprawdza "python -m database.benchmark plans".
+
+    Returns:
+        tuple: (wersja początkowa, wersja końcowa, czas w sekundach)
+    """
+    db_manager = DBManager()
+    conn = db_manager.get_connection()
+
+    if db_manager.db_path in _migrated_paths:
+        return SCHEMA_VERSION, SCHEMA_VERSION, 0.0
+
+    start = time.perf_counter()
+    from_version = get_schema_version(conn)
+
+    if from_version < SCHEMA_VERSION:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # Wersja mogła się zmienić, zanim uzyskaliśmy blokadę (baza współdzielona)
+            from_version = get_schema_version(conn)
+
+            for version, description, migration in MIGRATIONS:
+                if version > from_version:
+                    migration(cursor)
+
+            # Migracje nie mogą zostawić naruszonych kluczy obcych, także gdy
+            # połączenie ich nie wymusza (profil "default")
+            cursor.execute("PRAGMA foreign_key_check")
+            violations = sorted({row[0] for row in cursor.fetchall()})
+            if violations:
+                raise RuntimeError(f"Naruszone klucze obce po migracji w tabelach: {', '.join(violations)}")
+
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    elapsed = time.perf_counter() - start
+    _migrated_paths.add(db_manager.db_path)
+
+    if from_version < SCHEMA_VERSION:
+        print(f"Migracja bazy danych z wersji {from_version} do {SCHEMA_VERSION} "
+              f"zakończona w {elapsed * 1000:.0f} ms")
+
+    return from_version, SCHEMA_VERSION, elapsed
@@ -1,6 +1,37 @@
 from database.db_manager import DBManager
 import time
 import datetime
+import json
+
+def _next_free_ids(cursor, table, count=1):
+    """
+    Zwraca najniższe wolne ID w tabeli
+    
+    Luki po usuniętych rekordach są zapisywane w tabeli free_ids (migracja 5),
+    więc wystarczą odczyty z indeksu zamiast przeglądania wszystkich ID.
+    
+    Args:
+        cursor (sqlite3.Cursor): Kursor bazy danych
+        table (str): Tabela z listy FREE_ID_TABLES
+        count (int): Liczba potrzebnych ID
+        
+    Returns:
+        list: Rosnąca lista wolnych ID
+    """
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) as max_id FROM {table}")
+    max_id = cursor.fetchone()['max_id']
+    
+    # Najpierw luki poniżej największego ID, potem kolejne wartości
+    cursor.execute('''
+    SELECT id FROM free_ids
+    WHERE table_name = ? AND id < ?
+    ORDER BY id
+    LIMIT ?
+    ''', (table, max_id, count))
+    ids = [row['id'] for row in cursor.fetchall()]
+    ids.extend(range(max_id + 1, max_id + 1 + count - len(ids)))
+    return ids
+
 
 class User:
     """Model użytkownika"""
@@ -14,40 +45,7 @@ class User:
         self.is_admin = is_admin
         self.password_reset_required = password_reset_required  # Czy użytkownik musi zmienić hasło przy logowaniu
         self.reset_requested = reset_requested  # Czy użytkownik poprosił o reset hasła
-    
-    @staticmethod
-    def create_tables():
-        """Tworzy tabelę użytkowników w bazie danych i aktualizuje schemat jeśli potrzeba"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        # Najpierw tworzymy tabelę użytkowników, jeśli nie istnieje
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            password_hash TEXT NOT NULL,
-            is_admin BOOLEAN NOT NULL DEFAULT 0
-        )
-        ''')
-        
-        # Sprawdź, czy istnieją nowe kolumny i dodaj je, jeśli nie
-        # SQLite nie ma bezpośredniej metody na sprawdzenie istnienia kolumny,
-        # więc musimy użyć PRAGMA table_info
-        cursor.execute("PRAGMA table_info(users)")
-        columns = cursor.fetchall()
-        column_names = [column[1] for column in columns]
-        
-        # Dodaj kolumny reset, jeśli ich nie ma
-        if 'password_reset_required' not in column_names:
-            cursor.execute('ALTER TABLE users ADD COLUMN password_reset_required BOOLEAN NOT NULL DEFAULT 0')
-        
-        if 'reset_requested' not in column_names:
-            cursor.execute('ALTER TABLE users ADD COLUMN reset_requested BOOLEAN NOT NULL DEFAULT 0')
-        
-        conn.commit()
+        self.permissions = None  # Uprawnienia sesji (frozenset) - ustawiane przez AuthManager
     
     @staticmethod
     def get_by_id(user_id):
@@ -127,7 +125,7 @@ class User:
         conn = DBManager().get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT * FROM users ORDER BY last_name, first_name")
+        cursor.execute("SELECT * FROM users ORDER BY last_name, first_name, id")
         users_data = cursor.fetchall()
         
         users = []
@@ -164,26 +162,14 @@ class User:
         conn = DBManager().get_connection()
         cursor = conn.cursor()
         
+        action = ModelEvents.INSERT if self.id is None else ModelEvents.UPDATE
+        
         if self.id is None:
-            # Nowy użytkownik - znajdź pierwsze wolne ID
-            cursor.execute("SELECT MIN(id) as min_id FROM users")
-            min_id = cursor.fetchone()['min_id']
-            
-            # Jeśli tabela jest pusta, zacznij od 1
-            if min_id is None:
-                next_id = 1
-            else:
-                # Znajdź pierwszą wolną wartość ID
-                cursor.execute("SELECT id FROM users ORDER BY id")
-                existing_ids = [row['id'] for row in cursor.fetchall()]
-                
-                # Zacznij od 1 i szukaj pierwszego wolnego ID
-                next_id = 1
-                while next_id in existing_ids:
-                    next_id += 1
+            # Nowy użytkownik - użyj najniższego wolnego ID
+            next_id = _next_free_ids(cursor, "users")[0]
             
             # Nowy użytkownik z określonym ID
-            cursor.execute('''
+            cursor = DBManager().execute('''
             INSERT INTO users (id, username, first_name, last_name, password_hash, is_admin, 
                             password_reset_required, reset_requested)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -193,7 +179,7 @@ class User:
             self.id = next_id
         else:
             # Aktualizacja istniejącego użytkownika
-            cursor.execute('''
+            DBManager().defer('''
             UPDATE users
             SET username = ?, first_name = ?, last_name = ?, password_hash = ?, 
                 is_admin = ?, password_reset_required = ?, reset_requested = ?
@@ -201,21 +187,71 @@ class User:
             ''', (self.username, self.first_name, self.last_name, self.password_hash, 
                 self.is_admin, self.password_reset_required, self.reset_requested, self.id))
         
-        conn.commit()
+        DBManager().commit()
+        # Zapis może czekać na koniec transaction() - unieważnij dopiero po nim
+        user_id = self.id
+        DBManager().after_commit(lambda: UserDirectory().invalidate(user_id))
+        ModelEvents().publish(User, action, self)
         return self.id
     
-    def delete(self):
-        """Usuwa użytkownika z bazy danych"""
-        if self.id is None:
-            return False
-            
+    @staticmethod
+    def save_many(users):
+        """
+        Zapisuje wielu nowych użytkowników jednym executemany
+        
+        Użytkownicy dostają najniższe wolne ID, tak jak w save().
+        
+        Args:
+            users (list): Lista nowych obiektów User (bez ID)
+        
+        Returns:
+            list: ID zapisanych użytkowników
+        """
         conn = DBManager().get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("DELETE FROM users WHERE id = ?", (self.id,))
-        conn.commit()
+        ids = _next_free_ids(cursor, "users", len(users))
+        for user, user_id in zip(users, ids):
+            user.id = user_id
+        
+        cursor = DBManager().executemany('''
+        INSERT INTO users (id, username, first_name, last_name, password_hash, is_admin,
+                        password_reset_required, reset_requested)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(user.id, user.username, user.first_name, user.last_name, user.password_hash,
+               user.is_admin, user.password_reset_required, user.reset_requested) for user in users])
+        
+        DBManager().commit()
+        DBManager().after_commit(UserDirectory().invalidate)
+        for user in users:
+            ModelEvents().publish(User, ModelEvents.INSERT, user)
+        return ids
+    
+    def delete(self):
+        """
+        Usuwa użytkownika z bazy danych razem z jego zadaniami i przypisaniami ról
         
-        return cursor.rowcount > 0
+        Zależne rekordy są usuwane jawnie, więc wynik nie zależy od PRAGMA
+        foreign_keys w profilu połączenia. Operacje projektów przypisane
+        do użytkownika stają się nieprzypisane.
+        """
+        if self.id is None:
+            return False
+            
+        DBManager().execute("DELETE FROM tasks WHERE user_id = ?", (self.id,))
+        DBManager().execute("DELETE FROM user_roles WHERE user_id = ?", (self.id,))
+        DBManager().execute("UPDATE project_operations SET user_id = NULL WHERE user_id = ?", (self.id,))
+        cursor = DBManager().execute("DELETE FROM users WHERE id = ?", (self.id,))
+        DBManager().commit()
+        user_id = self.id
+        DBManager().after_commit(lambda: UserDirectory().invalidate(user_id))
+        # ID może zostać użyte ponownie - nie zostawiaj uprawnień usuniętego użytkownika
+        PermissionMatrix().invalidate()
+        
+        if cursor.rowcount > 0:
+            ModelEvents().publish(User, ModelEvents.DELETE, self)
+            return True
+        return False
     
     @staticmethod
     def count():
@@ -272,6 +308,145 @@ class User:
             return []
 
 
+class UserDirectory:
+    """
+    Mapa tożsamości użytkowników w ramach sesji
+    
+    Przy pierwszym odczycie ładuje wszystkich użytkowników jednym zapytaniem,
+    dzięki czemu panele i eksporty nie odpytują bazy dla każdego wiersza.
+    Wpisy są unieważniane przez User.save() i User.delete() po zatwierdzeniu zmian.
+    """
+    
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(UserDirectory, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+    
+    def __init__(self):
+        if self._initialized:
+            return
+        self._users = {}
+        self._primed = False
+        self._initialized = True
+    
+    def prime(self):
+        """Ładuje wszystkich użytkowników do pamięci"""
+        self._users = {user.id: user for user in User.get_all_users()}
+        self._primed = True
+    
+    def get(self, user_id):
+        """
+        Zwraca użytkownika o podanym ID
+        
+        Args:
+            user_id (int): ID użytkownika
+            
+        Returns:
+            User: Użytkownik lub None jeśli nie istnieje
+        """
+        if not user_id:
+            return None
+        
+        # Wewnątrz transaction() baza może zawierać zmiany, które zostaną wycofane -
+        # nie zapamiętuj ich (unieważnienia po zapisie następują w after_commit)
+        if DBManager().in_transaction() and user_id not in self._users:
+            return User.get_by_id(user_id)
+        
+        if not self._primed:
+            self.prime()
+        
+        if user_id not in self._users:
+            # Użytkownik spoza mapy (np. dodany w innej sesji) - pobierz go osobno
+            self._users[user_id] = User.get_by_id(user_id)
+        
+        return self._users[user_id]
+    
+    def get_full_name(self, user_id, default="-"):
+        """Zwraca imię i nazwisko użytkownika lub wartość domyślną"""
+        user = self.get(user_id)
+        return f"{user.first_name} {user.last_name}" if user else default
+    
+    def invalidate(self, user_id=None):
+        """
+        Unieważnia wpis użytkownika lub całą mapę
+        
+        Args:
+            user_id (int, optional): ID użytkownika. Jeśli None, czyści całą mapę.
+        """
+        if user_id is None:
+            self._users = {}
+            self._primed = False
+        else:
+            self._users.pop(user_id, None)
+
+
+class ModelEvents:
+    """
+    Powiadomienia o zapisie i usunięciu rekordów modeli (singleton)
+    
+    Modele ogłaszają każdą zmianę razem z obiektem, którego dotyczy, dzięki
+    czemu panele aktualizują jeden wiersz tabeli zamiast wczytywać ją od nowa.
+    Zmiany wewnątrz DBManager().transaction() są ogłaszane po zatwierdzeniu,
+    a wycofane - wcale. Funkcje są wywoływane w wątku, który zapisał zmianę.
+    """
+    
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+    
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ModelEvents, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+    
+    def __init__(self):
+        if self._initialized:
+            return
+        self._subscribers = {}  # klasa modelu -> lista funkcji
+        self._initialized = True
+    
+    def subscribe(self, model, callback):
+        """
+        Rejestruje funkcję wywoływaną po zmianie rekordu modelu
+        
+        Args:
+            model (type): Klasa modelu (np. Task)
+            callback (callable): Funkcja callback(action, obj), gdzie action to
+                INSERT, UPDATE lub DELETE, a obj to zapisany lub usunięty obiekt
+        """
+        self._subscribers.setdefault(model, []).append(callback)
+    
+    def unsubscribe(self, model, callback):
+        """Wyrejestrowuje funkcję dodaną przez subscribe()"""
+        callbacks = self._subscribers.get(model, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+    
+    def publish(self, model, action, obj):
+        """
+        Ogłasza zmianę rekordu po jej zatwierdzeniu
+        
+        Args:
+            model (type): Klasa modelu
+            action (str): INSERT, UPDATE lub DELETE
+            obj (object): Obiekt modelu
+        """
+        if not self._subscribers.get(model):
+            return
+        DBManager().after_commit(lambda: self._notify(model, action, obj))
+    
+    def _notify(self, model, action, obj):
+        """Wywołuje funkcje zarejestrowane dla modelu"""
+        for callback in list(self._subscribers.get(model, [])):
+            callback(action, obj)
+
+
 class Task:
     """Model zadania"""
     
@@ -291,33 +466,6 @@ class Task:
         self.offer_id = offer_id
     
 
-    @staticmethod
-    def create_tables():
-        """Tworzy tabelę zadań w bazie danych"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            category TEXT NOT NULL,
-            task_type TEXT NOT NULL,
-            description TEXT,
-            start_time TEXT NOT NULL,
-            end_time TEXT,
-            duration INTEGER,
-            implementation_id INTEGER,
-            offer_id INTEGER,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
-            FOREIGN KEY (implementation_id) REFERENCES implementations (id) ON DELETE SET NULL,
-            FOREIGN KEY (offer_id) REFERENCES offers (id) ON DELETE SET NULL
-        )
-        ''')
-     
-            
-        conn.commit()
-    
     @staticmethod
     def get_by_id(task_id):
         """Pobiera zadanie na podstawie ID"""
@@ -370,10 +518,11 @@ class Task:
         conn = DBManager().get_connection()
         cursor = conn.cursor()
         
+        # CROSS JOIN wymusza przeglądanie zadań indeksem idx_tasks_start (bez sortowania)
         cursor.execute('''
         SELECT t.*, u.username as username, u.first_name, u.last_name 
         FROM tasks t 
-        JOIN users u ON t.user_id = u.id 
+        CROSS JOIN users u ON t.user_id = u.id 
         ORDER BY t.start_time DESC
         ''')
         tasks_data = cursor.fetchall()
@@ -399,14 +548,118 @@ class Task:
             
         return result
     
-    def save(self):
-        """Zapisuje zadanie do bazy danych"""
+    @staticmethod
+    def _from_row(task_data):
+        """Buduje zadanie na podstawie wiersza tabeli tasks"""
+        return Task(
+            id=task_data['id'],
+            user_id=task_data['user_id'],
+            category=task_data['category'],
+            task_type=task_data['task_type'],
+            description=task_data['description'],
+            start_time=task_data['start_time'],
+            end_time=task_data['end_time'],
+            duration=task_data['duration'],
+            implementation_id=task_data['implementation_id'],
+            offer_id=task_data['offer_id']
+        )
+    
+    @staticmethod
+    def get_page(user_id=None, after=None, limit=200, before=None):
+        """
+        Pobiera stronę zadań od najnowszych (paginacja po kluczu start_time, id)
+        
+        Kolejna strona zaczyna się za ostatnim zadaniem poprzedniej, więc koszt
+        zapytania nie rośnie wraz z liczbą już wczytanych zadań (w przeciwieństwie do OFFSET).
+        Z before pobierana jest strona nowszych zadań bezpośrednio przed podanym kluczem.
+        
+        Args:
+            user_id (int, optional): ID użytkownika (None - zadania wszystkich użytkowników)
+            after (tuple, optional): Klucz (start_time, id) ostatniego zadania poprzedniej strony
+            limit (int): Maksymalna liczba zadań na stronie
+            before (tuple, optional): Klucz (start_time, id) pierwszego zadania następnej strony
+        
+        Returns:
+            list: Lista zadań posortowana malejąco po (start_time, id)
+        """
+        conditions = []
+        params = []
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if after is not None:
+            conditions.append("(start_time, id) < (?, ?)")
+            params.extend(after)
+        if before is not None:
+            conditions.append("(start_time, id) > (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        # Strona nowszych zadań to najbliższe kluczowi before - czytane rosnąco i odwracane
+        order = "ASC" if before is not None else "DESC"
+        
         conn = DBManager().get_connection()
         cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT * FROM tasks {where} ORDER BY start_time {order}, id {order} LIMIT ?",
+            (*params, limit)
+        )
+        tasks = [Task._from_row(task_data) for task_data in cursor.fetchall()]
+        if before is not None:
+            tasks.reverse()
+        return tasks
+    
+    @staticmethod
+    def get_totals(user_id=None):
+        """
+        Zlicza zadania i ich łączny czas trwania
+        
+        Args:
+            user_id (int, optional): ID użytkownika (None - zadania wszystkich użytkowników)
+        
+        Returns:
+            tuple: (liczba zadań, łączny czas w sekundach)
+        """
+        conn = DBManager().get_connection()
+        cursor = conn.cursor()
+        
+        if user_id is None:
+            cursor.execute("SELECT COUNT(*), SUM(duration) FROM tasks")
+        else:
+            cursor.execute("SELECT COUNT(*), SUM(duration) FROM tasks WHERE user_id = ?", (user_id,))
+        count, total_duration = cursor.fetchone()
+        return count, total_duration or 0
+    
+    @staticmethod
+    def get_type_totals(user_id, start_time, end_time):
+        """
+        Sumuje czas trwania zadań użytkownika rozpoczętych w okresie według typu zadania
+        
+        Args:
+            user_id (int): ID użytkownika
+            start_time (str): Początek okresu (włącznie)
+            end_time (str): Koniec okresu (wyłącznie)
+        
+        Returns:
+            list: Lista krotek (typ zadania, łączny czas w sekundach)
+        """
+        conn = DBManager().get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+        SELECT task_type, SUM(duration) as total_duration
+        FROM tasks
+        WHERE user_id = ? AND start_time >= ? AND start_time < ?
+        GROUP BY task_type
+        ''', (user_id, start_time, end_time))
+        return [(row['task_type'], row['total_duration'] or 0) for row in cursor.fetchall()]
+    
+    def save(self):
+        """Zapisuje zadanie do bazy danych"""
+        action = ModelEvents.INSERT if self.id is None else ModelEvents.UPDATE
         
         if self.id is None:
             # Nowe zadanie
-            cursor.execute('''
+            cursor = DBManager().execute('''
             INSERT INTO tasks (user_id, category, task_type, description, start_time, end_time, duration, implementation_id, offer_id)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (self.user_id, self.category, self.task_type, self.description, self.start_time, 
@@ -414,14 +667,15 @@ class Task:
             self.id = cursor.lastrowid
         else:
             # Aktualizacja istniejącego zadania
-            cursor.execute('''
+            DBManager().defer('''
             UPDATE tasks
             SET user_id = ?, category = ?, task_type = ?, description = ?, start_time = ?, end_time = ?, duration = ?, implementation_id = ?, offer_id = ?
             WHERE id = ?
             ''', (self.user_id, self.category, self.task_type, self.description, self.start_time, 
                   self.end_time, self.duration, self.implementation_id, self.offer_id, self.id))
         
-        conn.commit()
+        DBManager().commit()
+        ModelEvents().publish(Task, action, self)
         return self.id
     
     def delete(self):
@@ -429,318 +683,126 @@ class Task:
         if self.id is None:
             return False
             
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM tasks WHERE id = ?", (self.id,))
-        conn.commit()
+        cursor = DBManager().execute("DELETE FROM tasks WHERE id = ?", (self.id,))
+        DBManager().commit()
         
-        return cursor.rowcount > 0
+        if cursor.rowcount > 0:
+            ModelEvents().publish(Task, ModelEvents.DELETE, self)
+            return True
+        return False
 
 
-class Implementation:
-    """Model wdrożenia"""
-    
-    OPERATIONS = ["Wdrożenie", "Spawanie", "Malowanie", "Klejenie"]
-    STATUSES = ["W trakcie", "Zakończone"]
+def _operation_from_row(op_data):
+    """Buduje słownik operacji na podstawie wiersza tabeli project_operations"""
+    return {
+        'user_id': op_data['user_id'],
+        'start_date': op_data['start_date'],
+        'end_date': op_data['end_date'],
+        'required': bool(op_data['required']),
+        'min_days': op_data['min_days']
+    }
+
+
+def _load_operations_map(cursor, where="", params=()):
+    """
+    Pobiera operacje wielu projektów jednym zapytaniem
     
-    def __init__(self, name, description, status="W trakcie", id=None):
-        self.id = id
-        self.name = name
-        self.description = description
-        self.status = status
-        self.operations = {}  # Słownik operacji: nazwa_operacji -> {user_id, start_date, end_date}
+    Args:
+        cursor (sqlite3.Cursor): Kursor bazy danych
+        where (str): Opcjonalny warunek SQL zawężający zbiór operacji
+        params (tuple): Parametry warunku
+        
+    Returns:
+        dict: ID projektu -> słownik operacji (nazwa_operacji -> dane)
+    """
+    cursor.execute(f"SELECT * FROM project_operations {where}", params)
     
-    @staticmethod
-    def create_tables():
-        """Tworzy tabele wdrożeń i operacji w bazie danych"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS implementations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            description TEXT,
-            status TEXT NOT NULL DEFAULT "W trakcie"
-        )
-        ''')
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS implementation_operations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            implementation_id INTEGER NOT NULL,
-            operation_name TEXT NOT NULL,
-            user_id INTEGER,
-            start_date TEXT,
-            end_date TEXT,
-            FOREIGN KEY (implementation_id) REFERENCES implementations (id) ON DELETE CASCADE,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE SET NULL
-        )
-        ''')
-        
-        conn.commit()
+    operations_map = {}
+    for op_data in cursor.fetchall():
+        project_ops = operations_map.setdefault(op_data['project_id'], {})
+        project_ops[op_data['operation_name']] = _operation_from_row(op_data)
     
-    def update_implementation_operations_schema():
-        """Ensures the implementation_operations table has all required columns"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        # Check if 'required' column exists in implementation_operations
-        cursor.execute("PRAGMA table_info(implementation_operations)")
-        columns = cursor.fetchall()
-        column_names = [column[1] for column in columns]
-        
-        # Add 'required' column if it doesn't exist
-        if 'required' not in column_names:
-            cursor.execute('ALTER TABLE implementation_operations ADD COLUMN required BOOLEAN NOT NULL DEFAULT 1')
-        
-        # Add 'min_days' column if it doesn't exist
-        if 'min_days' not in column_names:
-            cursor.execute('ALTER TABLE implementation_operations ADD COLUMN min_days INTEGER NOT NULL DEFAULT 1')
-        
-        conn.commit()
+    return operations_map
+
+
+def _operation_values(op_data):
+    """Zwraca wartości kolumn operacji w kolejności zapisu do bazy"""
+    return (
+        op_data.get('user_id'),
+        op_data.get('start_date'),
+        op_data.get('end_date'),
+        1 if op_data.get('required', True) else 0,  # SQLite przechowuje wartości logiczne jako 0/1
+        op_data.get('min_days', 1)
+    )
+
+
+def _snapshot_operations(operations):
+    """Zapamiętuje stan operacji zapisany w bazie (do wykrywania zmian)"""
+    return {name: _operation_values(op_data) for name, op_data in operations.items()}
 
-    update_implementation_operations_schema()
+
+def _save_operations(project):
+    """
+    Zapisuje operacje projektu, które zmieniły się od ostatniego odczytu lub zapisu
     
-    @staticmethod
-    def get_by_id(implementation_id):
-        """Pobiera wdrożenie na podstawie ID"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM implementations WHERE id = ?", (implementation_id,))
-        impl_data = cursor.fetchone()
-        
-        if not impl_data:
-            return None
-        
-        implementation = Implementation(
-            id=impl_data['id'],
-            name=impl_data['name'],
-            description=impl_data['description'],
-            status=impl_data['status']
-        )
-        
-        # Pobierz operacje wdrożenia
-        cursor.execute('''
-        SELECT * FROM implementation_operations 
-        WHERE implementation_id = ?
-        ''', (implementation_id,))
-        
-        operations_data = cursor.fetchall()
-        
-        for op_data in operations_data:
-            implementation.operations[op_data['operation_name']] = {
-                'user_id': op_data['user_id'],
-                'start_date': op_data['start_date'],
-                'end_date': op_data['end_date'],
-                'required': bool(op_data['required']),
-                'min_days': op_data['min_days']
-            }
-        
-        return implementation
+    Wszystkie zmienione operacje są zapisywane jedną paczką INSERT ... ON CONFLICT
+    (wymaga unikalnego indeksu na (project_id, operation_name)). Zapamiętany stan
+    operacji jest aktualizowany dopiero po zatwierdzeniu zmian, więc po wycofaniu
+    transakcji kolejny zapis powtórzy wszystkie zmiany.
     
-    @staticmethod
-    def get_all():
-        """Pobiera wszystkie wdrożenia z operacjami"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT * FROM implementations 
-        ORDER BY id DESC
-        ''')
-        
-        implementations_data = cursor.fetchall()
-        implementations = []
-        
-        for impl_data in implementations_data:
-            implementation = Implementation(
-                id=impl_data['id'],
-                name=impl_data['name'],
-                description=impl_data['description'],
-                status=impl_data['status']
-            )
-            
-            # Pobierz operacje wdrożenia
-            cursor.execute('''
-            SELECT * FROM implementation_operations 
-            WHERE implementation_id = ?
-            ''', (implementation.id,))
-            
-            operations_data = cursor.fetchall()
-            
-            for op_data in operations_data:
-                implementation.operations[op_data['operation_name']] = {
-                    'user_id': op_data['user_id'],
-                    'start_date': op_data['start_date'],
-                    'end_date': op_data['end_date']
-                }
-            
-            implementations.append(implementation)
-        
-        return implementations
+    Args:
+        project (Project): Zapisywany projekt
+    """
+    changed = []
+    for operation_name, op_data in project.operations.items():
+        values = _operation_values(op_data)
+        if project._saved_operations.get(operation_name) != values:
+            changed.append((project.id, operation_name) + values)
     
-    @staticmethod
-    def get_by_user_id(user_id):
-        """Pobiera wdrożenia przypisane do konkretnego użytkownika"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT DISTINCT i.* 
-        FROM implementations i
-        JOIN implementation_operations io ON i.id = io.implementation_id
-        WHERE io.user_id = ?
-        ORDER BY i.id DESC
-        ''', (user_id,))
-        
-        implementations_data = cursor.fetchall()
-        implementations = []
-        
-        for impl_data in implementations_data:
-            implementation = Implementation(
-                id=impl_data['id'],
-                name=impl_data['name'],
-                description=impl_data['description'],
-                status=impl_data['status']
-            )
-            
-            # Pobierz operacje wdrożenia
-            cursor.execute('''
-            SELECT * FROM implementation_operations 
-            WHERE implementation_id = ?
-            ''', (implementation.id,))
-            
-            operations_data = cursor.fetchall()
-            
-            for op_data in operations_data:
-                implementation.operations[op_data['operation_name']] = {
-                    'user_id': op_data['user_id'],
-                    'start_date': op_data['start_date'],
-                    'end_date': op_data['end_date']
-                }
-            
-            implementations.append(implementation)
-        
-        return implementations
-    
-    def save(self):
-        """Zapisuje wdrożenie do bazy danych"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        if self.id is None:
-            # Nowe wdrożenie
-            cursor.execute('''
-            INSERT INTO implementations (name, description, status)
-            VALUES (?, ?, ?)
-            ''', (self.name, self.description, self.status))
-            self.id = cursor.lastrowid
-            
-            # Dodaj domyślne operacje
-            for operation in self.OPERATIONS:
-                cursor.execute('''
-                INSERT INTO implementation_operations 
-                (implementation_id, operation_name, user_id, start_date, end_date, required, min_days)
-                VALUES (?, ?, NULL, NULL, NULL, 1, 1)
-                ''', (self.id, operation))
-        else:
-            # Aktualizacja istniejącego wdrożenia
-            cursor.execute('''
-            UPDATE implementations
-            SET name = ?, description = ?, status = ?
-            WHERE id = ?
-            ''', (self.name, self.description, self.status, self.id))
-            
-            # Aktualizuj operacje
-            for operation_name, operation_data in self.operations.items():
-                # Add debug output
-                print(f"Saving operation {operation_name} for implementation {self.id}:")
-                print(f"  Data: {operation_data}")
-                
-                # Get values with defaults if missing
-                user_id = operation_data.get('user_id')
-                start_date = operation_data.get('start_date')
-                end_date = operation_data.get('end_date')
-                required = operation_data.get('required', True)  # Default to True if missing
-                min_days = operation_data.get('min_days', 1)     # Default to 1 if missing
-                
-                # Add more debug output
-                print(f"  Processed values:")
-                print(f"    user_id: {user_id}")
-                print(f"    start_date: {start_date}")
-                print(f"    end_date: {end_date}")
-                print(f"    required: {required}")
-                print(f"    min_days: {min_days}")
-                
-                # Check if the operation exists for this implementation
-                cursor.execute('''
-                SELECT id FROM implementation_operations
-                WHERE implementation_id = ? AND operation_name = ?
-                ''', (self.id, operation_name))
-                
-                operation_record = cursor.fetchone()
-                
-                if operation_record:
-                    # Update existing operation
-                    cursor.execute('''
-                    UPDATE implementation_operations
-                    SET user_id = ?, start_date = ?, end_date = ?, required = ?, min_days = ?
-                    WHERE implementation_id = ? AND operation_name = ?
-                    ''', (
-                        user_id, 
-                        start_date, 
-                        end_date,
-                        1 if required else 0,  # Convert boolean to 0/1 for SQLite
-                        min_days,
-                        self.id, 
-                        operation_name
-                    ))
-                    print(f"  Updated existing operation record {operation_record['id']}")
-                else:
-                    # Insert new operation
-                    cursor.execute('''
-                    INSERT INTO implementation_operations
-                    (implementation_id, operation_name, user_id, start_date, end_date, required, min_days)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        self.id,
-                        operation_name,
-                        user_id,
-                        start_date,
-                        end_date,
-                        1 if required else 0,  # Convert boolean to 0/1 for SQLite
-                        min_days
-                    ))
-                    print(f"  Inserted new operation record")
-        
-        conn.commit()
-        return self.id
-    
-    def delete(self):
-        """Usuwa wdrożenie z bazy danych"""
-        if self.id is None:
-            return False
-            
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        # Usuń najpierw operacje (choć kaskadowe usuwanie powinno działać)
-        cursor.execute("DELETE FROM implementation_operations WHERE implementation_id = ?", (self.id,))
-        
-        # Usuń wdrożenie
-        cursor.execute("DELETE FROM implementations WHERE id = ?", (self.id,))
-        conn.commit()
-        
-        return cursor.rowcount > 0
+    if changed:
+        DBManager().defer_many('''
+        INSERT INTO project_operations
+        (project_id, operation_name, user_id, start_date, end_date, required, min_days)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (project_id, operation_name) DO UPDATE SET
+            user_id = excluded.user_id,
+            start_date = excluded.start_date,
+            end_date = excluded.end_date,
+            required = excluded.required,
+            min_days = excluded.min_days
+        ''', changed)
     
+    snapshot = _snapshot_operations(project.operations)
+    DBManager().after_commit(lambda: setattr(project, '_saved_operations', snapshot))
 
 
-class Offer:
-    """Model oferty"""
+def _default_operation():
+    """Zwraca dane nowej, nieprzypisanej operacji"""
+    return {'user_id': None, 'start_date': None, 'end_date': None, 'required': True, 'min_days': 1}
+
+
+# Termin projektów bez daty zakończenia operacji "Wdrożenie" (sortowane na końcu,
+# jak w ProjectsPanel). Kolumnę projects.deadline utrzymują wyzwalacze z migracji 9.
+NO_DEADLINE = "9999-99-99"
+
+# Kolumny sortowania w Project.query() (nazwa -> wyrażenie SQL)
+PROJECT_ORDER_COLUMNS = {
+    "deadline": "p.deadline",
+    "name": "p.name",
+}
+
+
+class Project:
+    """
+    Model projektu - wspólna część wdrożeń i ofert
     
+    Wdrożenia i oferty są przechowywane w tabelach projects i project_operations
+    i różnią się tylko kolumną project_type. Metody klasy wywołane na Implementation
+    lub Offer dotyczą projektów danego typu, a na Project - projektów obu typów
+    (każdy jest zwracany jako obiekt klasy swojego typu).
+    """
+    
+    PROJECT_TYPE = None  # Wartość kolumny project_type ("implementation" lub "offer")
     OPERATIONS = ["Wdrożenie", "Spawanie", "Malowanie", "Klejenie"]
     STATUSES = ["W trakcie", "Zakończone"]
     
@@ -749,337 +811,206 @@ class Offer:
         self.name = name
         self.description = description
         self.status = status
-        self.operations = {}  # Słownik operacji: nazwa_operacji -> {user_id, start_date, end_date}
+        self.operations = {}  # Słownik operacji: nazwa_operacji -> {user_id, start_date, end_date, required, min_days}
+        self._saved_operations = {}  # Stan operacji w bazie, do wykrywania zmian przy zapisie
     
     @staticmethod
-    def create_tables():
-        """Tworzy tabele ofert i operacji w bazie danych"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS offers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            description TEXT,
-            status TEXT NOT NULL DEFAULT "W trakcie"
-        )
-        ''')
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS offer_operations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            offer_id INTEGER NOT NULL,
-            operation_name TEXT NOT NULL,
-            user_id INTEGER,
-            start_date TEXT,
-            end_date TEXT,
-            required BOOLEAN NOT NULL DEFAULT 1,
-            min_days INTEGER NOT NULL DEFAULT 1,
-            FOREIGN KEY (offer_id) REFERENCES offers (id) ON DELETE CASCADE,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE SET NULL
+    def _from_rows(cursor, projects_data):
+        """
+        Buduje projekty z wierszy tabeli projects, pobierając ich operacje jednym zapytaniem
+        
+        Args:
+            cursor (sqlite3.Cursor): Kursor bazy danych
+            projects_data (list): Wiersze tabeli projects
+        
+        Returns:
+            list: Lista wdrożeń i ofert z operacjami
+        """
+        operations_map = _load_operations_map(
+            cursor, "WHERE project_id IN (SELECT value FROM json_each(?))",
+            (json.dumps([project_data['id'] for project_data in projects_data]),)
         )
-        ''')
-        
-        # Check for existing records and make sure required and min_days exist
-        cursor.execute("PRAGMA table_info(offer_operations)")
-        columns = cursor.fetchall()
-        column_names = [column[1] for column in columns]
-        
-        # If one of the columns doesn't exist, we need to recreate the table with the full schema
-        needs_migration = 'required' not in column_names or 'min_days' not in column_names
         
-        if needs_migration:
-            print("Migrating offer_operations table to add required and min_days columns...")
-            
-            # Create a backup of the current data
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS offer_operations_backup AS 
-            SELECT * FROM offer_operations
-            ''')
-            
-            # Drop the old table
-            cursor.execute("DROP TABLE offer_operations")
-            
-            # Create the new table with the updated schema
-            cursor.execute('''
-            CREATE TABLE offer_operations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                offer_id INTEGER NOT NULL,
-                operation_name TEXT NOT NULL,
-                user_id INTEGER,
-                start_date TEXT,
-                end_date TEXT,
-                required BOOLEAN NOT NULL DEFAULT 1,
-                min_days INTEGER NOT NULL DEFAULT 1,
-                FOREIGN KEY (offer_id) REFERENCES offers (id) ON DELETE CASCADE,
-                FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE SET NULL
+        projects = []
+        for project_data in projects_data:
+            project = PROJECT_CLASSES[project_data['project_type']](
+                id=project_data['id'],
+                name=project_data['name'],
+                description=project_data['description'],
+                status=project_data['status']
             )
-            ''')
-            
-            # Copy data from backup, setting defaults for new columns
-            cursor.execute('''
-            INSERT INTO offer_operations (
-                id, offer_id, operation_name, user_id, start_date, end_date, required, min_days
-            )
-            SELECT 
-                id, offer_id, operation_name, user_id, start_date, end_date, 1, 1
-            FROM offer_operations_backup
-            ''')
-            
-            # Drop the backup table
-            cursor.execute("DROP TABLE offer_operations_backup")
-            
-            print("Migration completed.")
-        
-        conn.commit()
-        
-    def update_offer_operations_schema():
-        """Ensures the offer_operations table has all required columns"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        # Check if 'required' column exists in offer_operations
-        cursor.execute("PRAGMA table_info(offer_operations)")
-        columns = cursor.fetchall()
-        column_names = [column[1] for column in columns]
-        
-        # Add 'required' column if it doesn't exist
-        if 'required' not in column_names:
-            cursor.execute('ALTER TABLE offer_operations ADD COLUMN required BOOLEAN NOT NULL DEFAULT 1')
-        
-        # Add 'min_days' column if it doesn't exist
-        if 'min_days' not in column_names:
-            cursor.execute('ALTER TABLE offer_operations ADD COLUMN min_days INTEGER NOT NULL DEFAULT 1')
-        
-        conn.commit()
+            project.operations = operations_map.get(project.id, {})
+            project._saved_operations = _snapshot_operations(project.operations)
+            project.deadline = project_data['deadline']
+            projects.append(project)
         
-    # Call this function to update schema
-    update_offer_operations_schema()    
+        return projects
     
-    @staticmethod
-    def get_by_id(offer_id):
-        """Pobiera ofertę na podstawie ID"""
+    @classmethod
+    def get_by_id(cls, project_id):
+        """Pobiera projekt na podstawie ID (None, jeśli nie istnieje lub jest innego typu)"""
         conn = DBManager().get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT * FROM offers WHERE id = ?", (offer_id,))
-        offer_data = cursor.fetchone()
+        if cls.PROJECT_TYPE is None:
+            cursor.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
+        else:
+            cursor.execute("SELECT * FROM projects WHERE id = ? AND project_type = ?", (project_id, cls.PROJECT_TYPE))
+        project_data = cursor.fetchone()
         
-        if not offer_data:
+        if not project_data:
             return None
         
-        offer = Offer(
-            id=offer_data['id'],
-            name=offer_data['name'],
-            description=offer_data['description'],
-            status=offer_data['status']
-        )
-        
-        # Pobierz operacje oferty
-        cursor.execute('''
-        SELECT * FROM offer_operations 
-        WHERE offer_id = ?
-        ''', (offer_id,))
-        
-        operations_data = cursor.fetchall()
-        
-        for op_data in operations_data:
-            offer.operations[op_data['operation_name']] = {
-                'user_id': op_data['user_id'],
-                'start_date': op_data['start_date'],
-                'end_date': op_data['end_date'],
-                'required': bool(op_data['required']),
-                'min_days': op_data['min_days']
-            }
-        
-        return offer
+        return Project._from_rows(cursor, [project_data])[0]
     
-    @staticmethod
-    def get_all():
-        """Pobiera wszystkie oferty z operacjami"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT * FROM offers 
-        ORDER BY id DESC
-        ''')
-        
-        offers_data = cursor.fetchall()
-        offers = []
-        
-        for offer_data in offers_data:
-            offer = Offer(
-                id=offer_data['id'],
-                name=offer_data['name'],
-                description=offer_data['description'],
-                status=offer_data['status']
-            )
-            
-            # Pobierz operacje oferty
-            cursor.execute('''
-            SELECT * FROM offer_operations 
-            WHERE offer_id = ?
-            ''', (offer.id,))
-            
-            operations_data = cursor.fetchall()
-            
-            for op_data in operations_data:
-                offer.operations[op_data['operation_name']] = {
-                    'user_id': op_data['user_id'],
-                    'start_date': op_data['start_date'],
-                    'end_date': op_data['end_date']
-                }
-            
-            offers.append(offer)
-        
-        return offers
+    @classmethod
+    def get_all(cls):
+        """Pobiera wszystkie projekty z operacjami (od najnowszych)"""
+        return cls.query()
     
-    @staticmethod
-    def get_by_user_id(user_id):
-        """Pobiera oferty przypisane do konkretnego użytkownika"""
+    @classmethod
+    def get_by_user_id(cls, user_id):
+        """Pobiera projekty przypisane do konkretnego użytkownika (od najnowszych)"""
+        return cls.query(user_id=user_id)
+    
+    @classmethod
+    def query(cls, status=None, deadline_from=None, deadline_to=None, user_id=None, name_prefix=None,
+              order_by=None, descending=False, limit=None, offset=0):
+        """
+        Pobiera projekty spełniające filtry, posortowane i stronicowane w SQL
+        
+        Filtry i sortowanie korzystają z indeksów z PROJECT_INDEXES
+        i PROJECT_DEADLINE_INDEXES (termin jest kolumną projects.deadline
+        utrzymywaną przez wyzwalacze), a operacje są pobierane tylko dla
+        zwróconych projektów.
+        
+        Args:
+            status (str, optional): Status projektu
+            deadline_from (str, optional): Najwcześniejszy termin (YYYY-MM-DD)
+            deadline_to (str, optional): Najpóźniejszy termin (YYYY-MM-DD)
+            user_id (int, optional): ID użytkownika przypisanego do którejś operacji
+            name_prefix (str, optional): Początek nazwy (wielkość liter ma znaczenie)
+            order_by (str, optional): Klucz z PROJECT_ORDER_COLUMNS (domyślnie od najnowszych)
+            descending (bool): Czy sortować malejąco
+            limit (int, optional): Maksymalna liczba projektów
+            offset (int): Liczba pominiętych projektów
+        
+        Returns:
+            list: Lista projektów z operacjami; każdy ma atrybut deadline
+        """
+        conditions = []
+        params = []
+        if cls.PROJECT_TYPE is not None:
+            conditions.append("p.project_type = ?")
+            params.append(cls.PROJECT_TYPE)
+        if status is not None:
+            conditions.append("p.status = ?")
+            params.append(status)
+        if deadline_from is not None:
+            conditions.append("p.deadline >= ?")
+            params.append(deadline_from)
+        if deadline_to is not None:
+            conditions.append("p.deadline <= ?")
+            params.append(deadline_to)
+        if deadline_from is not None or deadline_to is not None:
+            # Projekty bez terminu nie spełniają filtru terminu
+            conditions.append("p.deadline < ?")
+            params.append(NO_DEADLINE)
+        if name_prefix:
+            # Zakres zamiast LIKE, aby móc użyć indeksu na nazwie
+            conditions.append("p.name >= ? AND p.name < ?")
+            params.extend([name_prefix, name_prefix + "\U0010ffff"])
+        if user_id is not None:
+            conditions.append("p.id IN (SELECT project_id FROM project_operations WHERE user_id = ?)")
+            params.append(user_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        # Przy równych kluczach według ID w tym samym kierunku, aby indeks
+        # (zawierający id) obsłużył całe sortowanie
+        if order_by is None:
+            order = "p.id DESC"
+        else:
+            direction = "DESC" if descending else "ASC"
+            order = f"{PROJECT_ORDER_COLUMNS[order_by]} {direction}, p.id {direction}"
+        
         conn = DBManager().get_connection()
         cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT DISTINCT o.* 
-        FROM offers o
-        JOIN offer_operations oo ON o.id = oo.offer_id
-        WHERE oo.user_id = ?
-        ORDER BY o.id DESC
-        ''', (user_id,))
-        
-        offers_data = cursor.fetchall()
-        offers = []
-        
-        for offer_data in offers_data:
-            offer = Offer(
-                id=offer_data['id'],
-                name=offer_data['name'],
-                description=offer_data['description'],
-                status=offer_data['status']
-            )
-            
-            # Pobierz operacje oferty
-            cursor.execute('''
-            SELECT * FROM offer_operations 
-            WHERE offer_id = ?
-            ''', (offer.id,))
-            
-            operations_data = cursor.fetchall()
-            
-            for op_data in operations_data:
-                offer.operations[op_data['operation_name']] = {
-                    'user_id': op_data['user_id'],
-                    'start_date': op_data['start_date'],
-                    'end_date': op_data['end_date']
-                }
-            
-            offers.append(offer)
-        
-        return offers
+        cursor.execute(f'''
+        SELECT p.* FROM projects p
+        {where}
+        ORDER BY {order}
+        LIMIT ? OFFSET ?
+        ''', (*params, -1 if limit is None else limit, offset))
+        
+        return Project._from_rows(cursor, cursor.fetchall())
     
     def save(self):
-        """Zapisuje ofertę do bazy danych"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
+        """Zapisuje projekt do bazy danych"""
+        action = ModelEvents.INSERT if self.id is None else ModelEvents.UPDATE
         
         if self.id is None:
-            # Nowa oferta
-            cursor.execute('''
-            INSERT INTO offers (name, description, status)
-            VALUES (?, ?, ?)
-            ''', (self.name, self.description, self.status))
+            # Nowy projekt
+            cursor = DBManager().execute('''
+            INSERT INTO projects (project_type, name, description, status)
+            VALUES (?, ?, ?, ?)
+            ''', (self.PROJECT_TYPE, self.name, self.description, self.status))
             self.id = cursor.lastrowid
             
-            # Dodaj domyślne operacje
+            # Dodaj domyślne operacje (zachowując te ustawione przed pierwszym zapisem)
             for operation in self.OPERATIONS:
-                cursor.execute('''
-                INSERT INTO offer_operations 
-                (offer_id, operation_name, user_id, start_date, end_date, required, min_days)
-                VALUES (?, ?, NULL, NULL, NULL, 1, 1)
-                ''', (self.id, operation))
+                self.operations.setdefault(operation, _default_operation())
         else:
-            # Aktualizacja istniejącej oferty
-            cursor.execute('''
-            UPDATE offers
+            # Aktualizacja istniejącego projektu
+            DBManager().defer('''
+            UPDATE projects
             SET name = ?, description = ?, status = ?
             WHERE id = ?
             ''', (self.name, self.description, self.status, self.id))
             
-            # Aktualizuj operacje
-            for operation_name, operation_data in self.operations.items():
-                # Add debug output
-                print(f"Saving operation {operation_name} for offer {self.id}:")
-                print(f"  Data: {operation_data}")
-                
-                # Get values with defaults if missing
-                user_id = operation_data.get('user_id')
-                start_date = operation_data.get('start_date')
-                end_date = operation_data.get('end_date')
-                required = operation_data.get('required', True)  # Default to True if missing
-                min_days = operation_data.get('min_days', 1)     # Default to 1 if missing
-                
-                # Add more debug output
-                print(f"  Processed values:")
-                print(f"    user_id: {user_id}")
-                print(f"    start_date: {start_date}")
-                print(f"    end_date: {end_date}")
-                print(f"    required: {required}")
-                print(f"    min_days: {min_days}")
-                
-                # Check if the operation exists for this offer
-                cursor.execute('''
-                SELECT id FROM offer_operations
-                WHERE offer_id = ? AND operation_name = ?
-                ''', (self.id, operation_name))
-                
-                operation_record = cursor.fetchone()
-                
-                if operation_record:
-                    # Update existing operation
-                    cursor.execute('''
-                    UPDATE offer_operations
-                    SET user_id = ?, start_date = ?, end_date = ?, required = ?, min_days = ?
-                    WHERE offer_id = ? AND operation_name = ?
-                    ''', (
-                        user_id, 
-                        start_date, 
-                        end_date,
-                        1 if required else 0,  # Convert boolean to 0/1 for SQLite
-                        min_days,
-                        self.id, 
-                        operation_name
-                    ))
-                    print(f"  Updated existing operation record {operation_record['id']}")
-                else:
-                    # Insert new operation
-                    cursor.execute('''
-                    INSERT INTO offer_operations
-                    (offer_id, operation_name, user_id, start_date, end_date, required, min_days)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        self.id,
-                        operation_name,
-                        user_id,
-                        start_date,
-                        end_date,
-                        1 if required else 0,  # Convert boolean to 0/1 for SQLite
-                        min_days
-                    ))
-                    print(f"  Inserted new operation record")
-        
-        conn.commit()
+        # Zapisz zmienione operacje
+        _save_operations(self)
+        
+        DBManager().commit()
+        ModelEvents().publish(type(self), action, self)
         return self.id
     
     def delete(self):
-        """Usuwa ofertę z bazy danych"""
+        """Usuwa projekt z bazy danych"""
         if self.id is None:
             return False
             
-        conn = DBManager().get_connection() 
-        cursor = conn.cursor()
+        # Usuń najpierw operacje i odłącz zadania (jawnie - profil "default"
+        # nie włącza PRAGMA foreign_keys)
+        cursor = DBManager().execute("DELETE FROM project_operations WHERE project_id = ?", (self.id,))
+        DBManager().execute("UPDATE tasks SET implementation_id = NULL WHERE implementation_id = ?", (self.id,))
+        DBManager().execute("UPDATE tasks SET offer_id = NULL WHERE offer_id = ?", (self.id,))
+        
+        # Usuń projekt
+        cursor = DBManager().execute("DELETE FROM projects WHERE id = ?", (self.id,))
+        DBManager().commit()
+        
+        if cursor.rowcount > 0:
+            ModelEvents().publish(type(self), ModelEvents.DELETE, self)
+            return True
+        return False
+    
+
+class Implementation(Project):
+    """Model wdrożenia"""
+    
+    PROJECT_TYPE = "implementation"
+
+
+class Offer(Project):
+    """Model oferty"""
+    
+    PROJECT_TYPE = "offer"
+
+
+# Wartość kolumny project_type -> klasa modelu
+PROJECT_CLASSES = {project_class.PROJECT_TYPE: project_class for project_class in (Implementation, Offer)}
+
+
 class Role:
     """Model roli użytkownika"""
     
@@ -1089,164 +1020,6 @@ class Role:
         self.description = description
         self.permissions = permissions or {}  # Słownik uprawnień: nazwa_uprawnienia -> True/False
     
-    # Modyfikacja w database/models.py, klasa Role, metoda create_tables
-
-    @staticmethod
-    def create_tables():
-        """Tworzy tabele ról w bazie danych"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        # Tabela ról
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS roles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            description TEXT
-        )
-        ''')
-        
-        # Tabela uprawnień dla ról
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS role_permissions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            role_id INTEGER NOT NULL,
-            permission_name TEXT NOT NULL,
-            permission_value BOOLEAN NOT NULL DEFAULT 0,
-            FOREIGN KEY (role_id) REFERENCES roles (id) ON DELETE CASCADE,
-            UNIQUE(role_id, permission_name)
-        )
-        ''')
-        
-        # Tabela przypisań ról do użytkowników
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_roles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            role_id INTEGER NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
-            FOREIGN KEY (role_id) REFERENCES roles (id) ON DELETE CASCADE,
-            UNIQUE(user_id, role_id)
-        )
-        ''')
-        
-        # Tabela konfiguracji ograniczeń równoległych zadań
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS workload_limits (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            max_implementations INTEGER NOT NULL DEFAULT 1,
-            max_offers INTEGER NOT NULL DEFAULT 2,
-            max_total_projects INTEGER NOT NULL DEFAULT 2
-        )
-        ''')
-        
-        # Dodaj domyślne ograniczenia jeśli tabela jest pusta
-        cursor.execute("SELECT COUNT(*) as count FROM workload_limits")
-        count = cursor.fetchone()['count']
-        
-        if count == 0:
-            cursor.execute('''
-            INSERT INTO workload_limits (max_implementations, max_offers, max_total_projects)
-            VALUES (1, 2, 2)
-            ''')
-        
-        conn.commit()
-        
-        # Sprawdź, czy istnieją już jakieś role, jeśli nie, dodaj domyślne
-        cursor.execute("SELECT COUNT(*) as count FROM roles")
-        count = cursor.fetchone()['count']
-        
-        if count == 0:
-            # Dodaj domyślne role
-            admin_role = Role(name="Administrator", description="Pełne uprawnienia administracyjne")
-            admin_role.permissions = {
-                "admin_panel": True,
-                "manage_users": True,
-                "manage_roles": True,
-                "manage_implementations": True,
-                "manage_offers": True,
-                "view_all_tasks": True,
-                "export_data": True
-            }
-            admin_role.save()
-            
-            manager_role = Role(name="Kierownik", description="Zarządzanie projektami i podgląd danych")
-            manager_role.permissions = {
-                "admin_panel": False,
-                "manage_users": False,
-                "manage_roles": False,
-                "manage_implementations": True,
-                "manage_offers": True,
-                "view_all_tasks": True,
-                "export_data": True
-            }
-            manager_role.save()
-            
-            user_role = Role(name="Użytkownik", description="Podstawowe uprawnienia użytkownika")
-            user_role.permissions = {
-                "admin_panel": False,
-                "manage_users": False,
-                "manage_roles": False,
-                "manage_implementations": False,
-                "manage_offers": False,
-                "view_all_tasks": False,
-                "export_data": True
-            }
-            user_role.save()
-            
-            # Dodaj nowe role zadaniowe
-            implementation_role = Role(name="Wdrożenia", description="Specjalista od wdrożeń")
-            implementation_role.permissions = {
-                "task_implementation": True
-            }
-            implementation_role.save()
-            
-            offer_role = Role(name="Oferty", description="Specjalista od ofert")
-            offer_role.permissions = {
-                "task_offer": True
-            }
-            offer_role.save()
-            
-            welding_role = Role(name="Spawanie", description="Specjalista od spawania")
-            welding_role.permissions = {
-                "task_welding": True
-            }
-            welding_role.save()
-            
-            gluing_role = Role(name="Klejenie", description="Specjalista od klejenia")
-            gluing_role.permissions = {
-                "task_gluing": True
-            }
-            gluing_role.save()
-            
-            painting_role = Role(name="Malowanie", description="Specjalista od malowania")
-            painting_role.permissions = {
-                "task_painting": True
-            }
-            painting_role.save()
-            
-            # Przypisz rolę administratora do wszystkich istniejących administratorów
-            cursor.execute("SELECT id FROM users WHERE is_admin = 1")
-            admin_users = cursor.fetchall()
-            
-            for user in admin_users:
-                cursor.execute('''
-                INSERT INTO user_roles (user_id, role_id)
-                VALUES (?, ?)
-                ''', (user['id'], admin_role.id))
-            
-            # Przypisz rolę użytkownika do wszystkich pozostałych
-            cursor.execute("SELECT id FROM users WHERE is_admin = 0")
-            regular_users = cursor.fetchall()
-            
-            for user in regular_users:
-                cursor.execute('''
-                INSERT INTO user_roles (user_id, role_id)
-                VALUES (?, ?)
-                ''', (user['id'], user_role.id))
-            
-            conn.commit()
-    
     @staticmethod
     def get_by_id(role_id):
         """Pobiera rolę na podstawie ID"""
@@ -1333,22 +1106,36 @@ class Role:
     @staticmethod
     def set_user_roles(user_id, role_ids):
         """Ustawia role dla użytkownika"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
         # Usuń obecne role użytkownika
-        cursor.execute("DELETE FROM user_roles WHERE user_id = ?", (user_id,))
+        cursor = DBManager().execute("DELETE FROM user_roles WHERE user_id = ?", (user_id,))
         
         # Dodaj nowe role
         for role_id in role_ids:
-            cursor.execute('''
+            cursor = DBManager().execute('''
             INSERT INTO user_roles (user_id, role_id)
             VALUES (?, ?)
             ''', (user_id, role_id))
         
-        conn.commit()
+        DBManager().commit()
+        PermissionMatrix().invalidate()
         return True
     
+    @staticmethod
+    def add_user_roles(assignments):
+        """
+        Dodaje wiele przypisań ról jednym executemany
+        
+        Args:
+            assignments (list): Lista krotek (user_id, role_id)
+        """
+        DBManager().defer_many('''
+        INSERT OR IGNORE INTO user_roles (user_id, role_id)
+        VALUES (?, ?)
+        ''', assignments)
+        
+        DBManager().commit()
+        PermissionMatrix().invalidate()
+    
     @staticmethod
     def check_user_permission(user_id, permission_name):
         """Sprawdza czy użytkownik ma dane uprawnienie"""
@@ -1379,26 +1166,14 @@ class Role:
         conn = DBManager().get_connection()
         cursor = conn.cursor()
         
+        action = ModelEvents.INSERT if self.id is None else ModelEvents.UPDATE
+        
         if self.id is None:
-            # Nowa rola - znajdź pierwsze wolne ID
-            cursor.execute("SELECT MIN(id) as min_id FROM roles")
-            min_id = cursor.fetchone()['min_id']
-            
-            # Jeśli tabela jest pusta, zacznij od 1
-            if min_id is None:
-                next_id = 1
-            else:
-                # Znajdź pierwszą wolną wartość ID
-                cursor.execute("SELECT id FROM roles ORDER BY id")
-                existing_ids = [row['id'] for row in cursor.fetchall()]
-                
-                # Zacznij od 1 i szukaj pierwszego wolnego ID
-                next_id = 1
-                while next_id in existing_ids:
-                    next_id += 1
+            # Nowa rola - użyj najniższego wolnego ID
+            next_id = _next_free_ids(cursor, "roles")[0]
             
             # Nowa rola z określonym ID
-            cursor.execute('''
+            cursor = DBManager().execute('''
             INSERT INTO roles (id, name, description)
             VALUES (?, ?, ?)
             ''', (next_id, self.name, self.description))
@@ -1406,23 +1181,25 @@ class Role:
             self.id = next_id
         else:
             # Aktualizacja istniejącej roli
-            cursor.execute('''
+            DBManager().defer('''
             UPDATE roles
             SET name = ?, description = ?
             WHERE id = ?
             ''', (self.name, self.description, self.id))
             
             # Usuń stare uprawnienia
-            cursor.execute("DELETE FROM role_permissions WHERE role_id = ?", (self.id,))
+            cursor = DBManager().execute("DELETE FROM role_permissions WHERE role_id = ?", (self.id,))
         
         # Dodaj uprawnienia
         for permission_name, permission_value in self.permissions.items():
-            cursor.execute('''
+            cursor = DBManager().execute('''
             INSERT INTO role_permissions (role_id, permission_name, permission_value)
             VALUES (?, ?, ?)
             ''', (self.id, permission_name, permission_value))
         
-        conn.commit()
+        DBManager().commit()
+        PermissionMatrix().invalidate()
+        ModelEvents().publish(Role, action, self)
         return self.id
     
     def delete(self):
@@ -1430,14 +1207,18 @@ class Role:
         if self.id is None:
             return False
             
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
-        # Usuń rolę (kaskadowo usunie uprawnienia i przypisania)
-        cursor.execute("DELETE FROM roles WHERE id = ?", (self.id,))
-        conn.commit()
-        
-        return cursor.rowcount > 0
+        # Usuń uprawnienia i przypisania roli jawnie - ID roli może zostać użyte
+        # ponownie, a profil "default" nie włącza PRAGMA foreign_keys
+        DBManager().execute("DELETE FROM role_permissions WHERE role_id = ?", (self.id,))
+        DBManager().execute("DELETE FROM user_roles WHERE role_id = ?", (self.id,))
+        cursor = DBManager().execute("DELETE FROM roles WHERE id = ?", (self.id,))
+        DBManager().commit()
+        PermissionMatrix().invalidate()
+        
+        if cursor.rowcount > 0:
+            ModelEvents().publish(Role, ModelEvents.DELETE, self)
+            return True
+        return False
     
     # Dodaj do klasy User rozszerzenia związane z rolami
     @staticmethod
@@ -1454,7 +1235,10 @@ class Role:
             # Administratorzy mają wszystkie uprawnienia
             if self.is_admin:
                 return True
-            return Role.check_user_permission(self.id, permission_name)
+            # Zalogowany użytkownik ma uprawnienia ustalone przy logowaniu
+            if self.permissions is not None:
+                return permission_name in self.permissions
+            return PermissionMatrix().has(self.id, permission_name)
         
         def set_roles(self, role_ids):
             """Ustawia role dla użytkownika"""
@@ -1468,6 +1252,86 @@ class Role:
 # Wywołaj rozszerzenie klasy User
 Role._extend_user_class()
 
+
+class PermissionMatrix:
+    """
+    Macierz uprawnień użytkowników w ramach sesji
+    
+    Ładuje przypisania ról i uprawnienia jednym zapytaniem i przechowuje
+    uprawnienia każdego użytkownika jako maskę bitową (bit na nazwę
+    uprawnienia). Zastępuje odczyt ról użytkownika i uprawnień każdej roli
+    osobno. Macierz jest unieważniana przez Role.save(), Role.delete(),
+    Role.set_user_roles() i Role.add_user_roles().
+    """
+    
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PermissionMatrix, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+    
+    def __init__(self):
+        if self._initialized:
+            return
+        self._bits = {}  # nazwa uprawnienia -> bit
+        self._masks = {}  # ID użytkownika -> maska uprawnień
+        self._loaded = False
+        self.version = 0  # zwiększana przy każdym unieważnieniu
+        self._initialized = True
+    
+    def _load(self):
+        """Ładuje przyznane uprawnienia wszystkich użytkowników"""
+        conn = DBManager().get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT DISTINCT ur.user_id, rp.permission_name
+        FROM user_roles ur
+        JOIN role_permissions rp ON rp.role_id = ur.role_id
+        WHERE rp.permission_value
+        ''')
+        
+        self._bits = {}
+        self._masks = {}
+        for row in cursor.fetchall():
+            bit = self._bits.setdefault(row['permission_name'], 1 << len(self._bits))
+            self._masks[row['user_id']] = self._masks.get(row['user_id'], 0) | bit
+        self._loaded = True
+    
+    def mask(self, user_id):
+        """Zwraca maskę bitową uprawnień użytkownika"""
+        if not self._loaded:
+            self._load()
+        return self._masks.get(user_id, 0)
+    
+    def has(self, user_id, permission_name):
+        """
+        Sprawdza, czy któraś z ról użytkownika przyznaje uprawnienie
+        
+        Args:
+            user_id (int): ID użytkownika
+            permission_name (str): Nazwa uprawnienia
+        
+        Returns:
+            bool: True jeśli użytkownik ma uprawnienie (bez uwzględnienia is_admin)
+        """
+        mask = self.mask(user_id)
+        return bool(mask & self._bits.get(permission_name, 0))
+    
+    def permissions(self, user_id):
+        """Zwraca zbiór nazw uprawnień użytkownika"""
+        mask = self.mask(user_id)
+        return frozenset(name for name, bit in self._bits.items() if mask & bit)
+    
+    def invalidate(self):
+        """Unieważnia macierz - zostanie załadowana przy następnym odczycie"""
+        self._bits = {}
+        self._masks = {}
+        self._loaded = False
+        self.version += 1
+
 class WorkloadLimits:
     """Model limitów obciążenia pracą"""
     
@@ -1501,12 +1365,9 @@ class WorkloadLimits:
     
     def save(self):
         """Zapisuje limity obciążenia pracą"""
-        conn = DBManager().get_connection()
-        cursor = conn.cursor()
-        
         if self.id is None:
             # Nowy rekord
-            cursor.execute('''
+            cursor = DBManager().execute('''
             INSERT INTO workload_limits (max_implementations, max_offers, max_total_projects)
             VALUES (?, ?, ?)
             ''', (self.max_implementations, self.max_offers, self.max_total_projects))
@@ -1514,11 +1375,11 @@ class WorkloadLimits:
             self.id = cursor.lastrowid
         else:
             # Aktualizacja istniejącego rekordu
-            cursor.execute('''
+            DBManager().defer('''
             UPDATE workload_limits
             SET max_implementations = ?, max_offers = ?, max_total_projects = ?
             WHERE id = ?
             ''', (self.max_implementations, self.max_offers, self.max_total_projects, self.id))
         
-        conn.commit()
+        DBManager().commit()
         return self.id
\ No newline at end of file
@@ -1,8 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from database.models import Role, User
+from database.models import Role, User, Task, ModelEvents
 from database.db_manager import DBManager
 from utils.auth import AuthManager
+from gui.model_updates import subscribe_widget, sorted_position, upsert_row, remove_row
 
 class AdminPanel(ttk.Frame):
     """Panel administracyjny"""
@@ -23,12 +24,16 @@ class AdminPanel(ttk.Frame):
         
         # Zmienne
         self.selected_user_id = None
+        self.user_sort_keys = {}  # ID wiersza -> (nazwisko, imię)
         
         # Stwórz widgety
         self._create_widgets()
         
         # Załaduj dane
         self._load_users()
+        
+        # Zapisani i usunięci użytkownicy aktualizują tylko swój wiersz tabeli
+        subscribe_widget(self, User, self._on_user_changed)
     
     def _create_widgets(self):
         """Tworzy widgety panelu administracyjnego"""
@@ -176,30 +181,47 @@ class AdminPanel(ttk.Frame):
     def _load_users(self):
         """Ładuje użytkowników do tabeli"""
         # Wyczyść istniejących użytkowników
-        for item in self.users_tree.get_children():
-            self.users_tree.delete(item)
+        self.users_tree.delete(*self.users_tree.get_children())
+        self.user_sort_keys = {}
         
         # Pobierz użytkowników
         users = User.get_all_users()
         
         # Dodaj użytkowników do tabeli
         for user in users:
-            values = [
-                user.id,
-                user.username,
-                f"{user.first_name} {user.last_name}",
-                "Tak" if user.is_admin else "Nie"
-            ]
-            
-            item = self.users_tree.insert("", "end", values=values)
-            
-            # Zaznacz użytkowników z prośbą o reset hasła na czerwono
-            if user.reset_requested:
-                self.users_tree.item(item, tags=("reset_requested",))
+            self.user_sort_keys[str(user.id)] = (user.last_name, user.first_name, user.id)
+            self.users_tree.insert("", "end", iid=str(user.id), values=self._user_values(user), tags=self._user_tags(user))
         
         # Utwórz tag dla zaznaczenia
         self.users_tree.tag_configure("reset_requested", background="#FFCCCC")
     
+    def _user_values(self, user):
+        """Zwraca wartości wiersza tabeli dla użytkownika"""
+        return [
+            user.id,
+            user.username,
+            f"{user.first_name} {user.last_name}",
+            "Tak" if user.is_admin else "Nie"
+        ]
+    
+    def _user_tags(self, user):
+        """Zwraca tagi wiersza użytkownika (prośba o reset hasła na czerwono)"""
+        return ("reset_requested",) if user.reset_requested else ()
+    
+    def _on_user_changed(self, action, user):
+        """Aktualizuje wiersz użytkownika po jego zapisie lub usunięciu (ModelEvents)"""
+        item_id = str(user.id)
+        if action == ModelEvents.DELETE:
+            remove_row(self.users_tree, item_id)
+            self.user_sort_keys.pop(item_id, None)
+            return
+        
+        # Kolejność jak w User.get_all_users()
+        key = (user.last_name, user.first_name, user.id)
+        position = sorted_position(self.users_tree, self.user_sort_keys, item_id, key)
+        self.user_sort_keys[item_id] = key
+        upsert_row(self.users_tree, item_id, self._user_values(user), position, self._user_tags(user))
+    
     def _on_user_select(self, event):
         """Obsługuje wybór użytkownika z tabeli"""
         selection = self.users_tree.selection()
@@ -332,12 +354,9 @@ class AdminPanel(ttk.Frame):
             if selected_role_ids:
                 user.set_roles(selected_role_ids)
             
-            # Zamknij okno dialogowe
+            # Zamknij okno dialogowe (wiersz użytkownika odświeży _on_user_changed)
             dialog.destroy()
             
-            # Odśwież listę użytkowników
-            self._load_users()
-            
             # Wyświetl komunikat
             messagebox.showinfo(
                 "Sukces", 
@@ -483,11 +502,11 @@ class AdminPanel(ttk.Frame):
             # Przypisz role do użytkownika
             user.set_roles(selected_role_ids)
             
-            # Zamknij okno dialogowe
-            dialog.destroy()
+            # Role mogły się zmienić zalogowanemu użytkownikowi
+            self.auth_manager.refresh_permissions()
             
-            # Odśwież listę użytkowników
-            self._load_users()
+            # Zamknij okno dialogowe (wiersz użytkownika odświeży _on_user_changed)
+            dialog.destroy()
             
             # Wyświetl komunikat
             messagebox.showinfo(
@@ -518,19 +537,17 @@ class AdminPanel(ttk.Frame):
             messagebox.showerror("Błąd", "Nie możesz usunąć swojego konta.")
             return
         
-        # Potwierdź usunięcie
-        if not messagebox.askyesno(
-            "Potwierdzenie",
-            f"Czy na pewno chcesz usunąć użytkownika {user.username}?"
-        ):
+        # Potwierdź usunięcie (razem z historią czasu pracy użytkownika)
+        message = f"Czy na pewno chcesz usunąć użytkownika {user.username}?"
+        task_count, _ = Task.get_totals(user.id)
+        if task_count:
+            message += f"\n\nRazem z nim zostaną usunięte jego zadania z historii czasu pracy ({task_count})."
+        if not messagebox.askyesno("Potwierdzenie", message, icon=messagebox.WARNING if task_count else None):
             return
         
         # Usuń użytkownika
         if user.delete():
-            # Odśwież listę użytkowników
-            self._load_users()
-            
-            # Wyczyść wybór
+            # Wyczyść wybór (wiersz usunie _on_user_changed)
             self.selected_user_id = None
             
             # Wyświetl komunikat
@@ -583,9 +600,6 @@ class AdminPanel(ttk.Frame):
             self.new_password_entry.delete(0, tk.END)
             self.confirm_password_entry.delete(0, tk.END)
             
-            # Odśwież listę użytkowników
-            self._load_users()
-            
             # Wyświetl komunikat
             messagebox.showinfo(
                 "Sukces", 
@@ -618,9 +632,6 @@ class AdminPanel(ttk.Frame):
         result = self.auth_manager.reset_password(user.id)
         
         if isinstance(result, tuple) and result[0]:
-            # Odśwież listę użytkowników
-            self._load_users()
-            
             # Pokaż tymczasowe hasło
             temp_password = result[1]
             messagebox.showinfo(
@@ -1,30 +1,35 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import datetime
 import calendar
+import queue
+import threading
+from collections import OrderedDict
+from database.db_manager import DBManager
 from database.models import User, Implementation, Offer
+from utils.gantt_data import get_gantt_data, task_bars, MONTHS_PL, DAYS_PL
+from utils.gantt_export import export_gantt
+from gui.model_updates import subscribe_widget
 
 class GanttPanel(ttk.Frame):
     """Panel wykresu Gantta dla wdrożeń i ofert"""
     
-    MONTHS_PL = ["", "Styczeń", "Luty", "Marzec", "Kwiecień", "Maj", "Czerwiec", 
-             "Lipiec", "Sierpień", "Wrzesień", "Październik", "Listopad", "Grudzień"]
-    DAYS_PL = ["Pon", "Wt", "Śr", "Czw", "Pt", "Sob", "Ndz"]
-
-    COLORS = {
-        "Wdrożenie": "#4CAF50",  # Zielony
-        "Spawanie": "#2196F3",    # Niebieski
-        "Malowanie": "#FFC107",   # Żółty
-        "Klejenie": "#F44336",    # Czerwony
-        "Implementation": "#81C784",  # Jasnozielony
-        "Offer": "#90CAF9"        # Jasnoniebieski
-    }
-    
     # Dodajemy stałe skali widoku
     SCALE_DAY = "Dzień"
     SCALE_WEEK = "Tydzień"
     SCALE_MONTH = "Miesiąc"
     
+    # Opóźnienie obsługi zmiany rozmiaru canvasa (ms)
+    RESIZE_DELAY = 150
+    # Liczba zapamiętanych zakresów dat z danymi wykresu
+    DATA_CACHE_SIZE = 8
+    # Odstęp sprawdzania wyników pracy w tle - pobierania danych i eksportu (ms)
+    PREFETCH_POLL = 50
+    # Maksymalna liczba narysowanych dni, zanim wykres zostanie narysowany od nowa
+    MAX_DRAWN_DAYS = 366
+    # Zapas dni i wierszy rysowanych poza widocznym oknem
+    VIEW_MARGIN = 5
+    
     def __init__(self, parent, current_user, is_admin=False):
         """
         Inicjalizuje panel wykresu Gantta
@@ -54,9 +59,34 @@ class GanttPanel(ttk.Frame):
         self.header_height = 50  # Wysokość nagłówka w pikselach
         self.margin_left = 150  # Margines lewy w pikselach
         
+        # Stan rysowania
+        self._data_cache = OrderedDict()  # (filtr użytkownika, początek, koniec) -> dane wykresu (LRU)
+        self._cache_generation = 0  # Zwiększany przy unieważnieniu danych
+        self._cache_version = None  # DBManager().data_version() z chwili zapamiętania danych
+        self._prefetch_thread = None
+        self._prefetch_key = None  # Zakres, wokół którego pobierane są dane w tle
+        self._prefetch_results = queue.Queue()
+        self._export_results = queue.Queue()
+        self._layout = None  # Skala i wiersze narysowanego wykresu
+        self.origin_date = self.start_date  # Dzień o współrzędnej X = margin_left
+        self._drawn_days = set()  # Narysowane dni (numery licząc od origin_date)
+        self._drawn_rows = set()  # Narysowane wiersze (etykieta i linie)
+        self._drawn_bars = set()  # Narysowane paski (wiersz, numer paska)
+        self._bar_specs = {}  # Wiersz -> paski w bieżącym zakresie
+        self._gantt_data = []
+        self._view_x = 0  # Przesunięcie kolumny użytkowników
+        self._row_count = 0
+        self._resize_job = None
+        self._refresh_pending = False
+        
         # Stwórz widgety
         self._create_widgets()
         
+        # Odświeżaj wykres po zmianach projektów i użytkowników (wiersze wykresu)
+        subscribe_widget(self, Implementation, self._on_data_changed)
+        subscribe_widget(self, Offer, self._on_data_changed)
+        subscribe_widget(self, User, self._on_data_changed)
+        
         # Załaduj dane
         self._load_data()
         
@@ -147,6 +177,14 @@ class GanttPanel(ttk.Frame):
             command=lambda: self._change_date_range(2)
         ).pack(side=tk.RIGHT, padx=5)
         
+        # Przycisk eksportu wykresu
+        self.export_button = ttk.Button(
+            filter_frame,
+            text="Eksportuj",
+            command=self._export_chart
+        )
+        self.export_button.pack(side=tk.RIGHT, padx=5)
+        
         # Przycisk "Dzisiaj"
         ttk.Button(
             filter_frame,
@@ -166,8 +204,8 @@ class GanttPanel(ttk.Frame):
         self.canvas = tk.Canvas(canvas_frame, bg="white")
         
         # Paski przewijania
-        y_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
-        x_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        y_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self._yview)
+        x_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=self._xview)
         
         # Konfiguracja canvasa
         self.canvas.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
@@ -203,12 +241,24 @@ class GanttPanel(ttk.Frame):
         self._draw_gantt()
     
     def _on_canvas_configure(self, event):
-        """Obsługuje zmianę rozmiaru canvasa"""
+        """Obsługuje zmianę rozmiaru canvasa (z opóźnieniem, raz na serię zdarzeń)"""
         self.canvas_width = event.width
         self.canvas_height = event.height
         
-        # Ponownie narysuj wykres
-        self._draw_gantt()
+        if self._resize_job is not None:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(self.RESIZE_DELAY, self._on_resize_done)
+    
+    def _on_resize_done(self):
+        """Dopasowuje wykres do nowego rozmiaru canvasa"""
+        self._resize_job = None
+        
+        # Komunikat o braku danych na środku canvasa
+        for item in self.canvas.find_withtag("message"):
+            self.canvas.coords(item, self.canvas_width // 2, self.canvas_height // 2)
+        
+        # Dorysuj odsłonięte dni i wiersze
+        self._draw_visible()
     
     def _on_filter_change(self, event):
         """Obsługuje zmianę filtru użytkownika"""
@@ -222,23 +272,13 @@ class GanttPanel(ttk.Frame):
         # Dostosuj szerokość dnia w zależności od skali
         if scale == self.SCALE_DAY:
             self.day_width = 60  # Szerszy widok dla dni
-            # Ustaw zakres na 7 dni
-            today = datetime.date.today()
-            self.start_date = today
-            self.end_date = today + datetime.timedelta(days=6)
         elif scale == self.SCALE_WEEK:
             self.day_width = 30  # Średni widok dla tygodni
-            # Ustaw zakres na 4 tygodnie
-            today = datetime.date.today()
-            # Znajdź początek tygodnia (poniedziałek)
-            start_date = today - datetime.timedelta(days=today.weekday())
-            self.start_date = start_date
-            self.end_date = start_date + datetime.timedelta(days=27)  # 4 tygodnie
         else:  # Miesiąc
             self.day_width = 20  # Standardowy widok miesięczny
-            # Ustaw zakres na 3 miesiące
-            self.start_date = self._first_day_of_month(datetime.date.today())
-            self.end_date = self._last_day_of_month(self._add_months(self.start_date, 2))
+        
+        # Zakres dat wokół dzisiejszego dnia
+        self.start_date, self.end_date = self._today_range()
         
         # Aktualizuj etykietę
         self._update_date_label()
@@ -252,66 +292,77 @@ class GanttPanel(ttk.Frame):
         end_str = self.end_date.strftime("%d.%m.%Y")
         self.date_label.config(text=f"{start_str} - {end_str}")
     
-    def _change_date_range(self, amount):
-        """Zmienia zakres dat o podaną wartość"""
+    def _shifted_range(self, amount):
+        """
+        Zwraca zakres dat przesunięty o podaną wartość względem bieżącego
+        
+        Args:
+            amount (int): Liczba kroków nawigacji (ujemna - w tył)
+        
+        Returns:
+            tuple: (pierwszy dzień, ostatni dzień)
+        """
         scale = self.scale_var.get()
         
         if scale == self.SCALE_DAY:
             # Przesuwanie o dni
-            self.start_date += datetime.timedelta(days=amount * 7)  # Przesuwamy o tygodnie
-            self.end_date += datetime.timedelta(days=amount * 7)
+            step = datetime.timedelta(days=amount * 7)  # Przesuwamy o tygodnie
+            return self.start_date + step, self.end_date + step
         elif scale == self.SCALE_WEEK:
             # Przesuwanie o tygodnie
-            self.start_date += datetime.timedelta(days=amount * 14)  # Przesuwamy o 2 tygodnie
-            self.end_date += datetime.timedelta(days=amount * 14)
+            step = datetime.timedelta(days=amount * 14)  # Przesuwamy o 2 tygodnie
+            return self.start_date + step, self.end_date + step
         else:  # Miesiąc
             # Przesuwanie o miesiące
-            if amount > 0:
-                # Przesuwanie w przód
-                self.start_date = self._add_months(self.start_date, amount)
-                self.end_date = self._last_day_of_month(self._add_months(self.start_date, 2))
-            else:
-                # Przesuwanie w tył
-                self.start_date = self._add_months(self.start_date, amount)
-                self.end_date = self._last_day_of_month(self._add_months(self.start_date, 2))
-        
-        # Aktualizuj etykietę
-        self._update_date_label()
-        
-        # Ponownie narysuj wykres
-        self._draw_gantt()
+            start_date = self._add_months(self.start_date, amount)
+            return start_date, self._last_day_of_month(self._add_months(start_date, 2))
     
-    def _go_to_today(self):
-        """Przechodzi do dzisiejszej daty"""
+    def _today_range(self):
+        """Zwraca zakres dat bieżącej skali zawierający dzisiejszy dzień"""
         scale = self.scale_var.get()
         
         today = datetime.date.today()
         
         if scale == self.SCALE_DAY:
-            self.start_date = today
-            self.end_date = today + datetime.timedelta(days=6)
+            # Ustaw zakres na 7 dni
+            return today, today + datetime.timedelta(days=6)
         elif scale == self.SCALE_WEEK:
             # Znajdź początek tygodnia (poniedziałek)
             start_date = today - datetime.timedelta(days=today.weekday())
-            self.start_date = start_date
-            self.end_date = start_date + datetime.timedelta(days=27)  # 4 tygodnie
+            return start_date, start_date + datetime.timedelta(days=27)  # 4 tygodnie
         else:  # Miesiąc
-            self.start_date = self._first_day_of_month(today)
-            self.end_date = self._last_day_of_month(self._add_months(self.start_date, 2))
+            # Ustaw zakres na 3 miesiące
+            start_date = self._first_day_of_month(today)
+            return start_date, self._last_day_of_month(self._add_months(start_date, 2))
+    
+    def _change_date_range(self, amount):
+        """Zmienia zakres dat o podaną wartość"""
+        self.start_date, self.end_date = self._shifted_range(amount)
         
         # Aktualizuj etykietę
         self._update_date_label()
         
-        # Ponownie narysuj wykres
-        self._draw_gantt()
+        # Przesuń wykres do nowego zakresu
+        self._show_range()
+    
+    def _go_to_today(self):
+        """Przechodzi do dzisiejszej daty"""
+        self.start_date, self.end_date = self._today_range()
+        
+        # Aktualizuj etykietę
+        self._update_date_label()
+        
+        # Przesuń wykres do nowego zakresu
+        self._show_range()
     
     def _draw_gantt(self):
-        """Rysuje wykres Gantta"""
+        """Rysuje cały wykres od nowa (nowe wiersze lub skala)"""
         # Wyczyść canvas
         self.canvas.delete("all")
+        self._layout = None
         
         # Pobierz dane do wykresu
-        gantt_data = self._get_gantt_data()
+        gantt_data = self._get_range_data()
         
         if not gantt_data:
             # Brak danych do wyświetlenia
@@ -319,152 +370,421 @@ class GanttPanel(ttk.Frame):
                 self.canvas_width // 2, 
                 self.canvas_height // 2,
                 text="Brak danych do wyświetlenia",
-                font=("Arial", 12)
+                font=("Arial", 12),
+                tags=("message",)
             )
             return
         
-        # Oblicz całkowitą liczbę dni
-        total_days = (self.end_date - self.start_date).days + 1
+        # Współrzędne dni liczone są od daty początkowej, dzięki czemu narysowane
+        # dni zostają na miejscu przy przesuwaniu zakresu
+        self._layout = self._layout_key(gantt_data)
+        self.origin_date = self.start_date
+        self._drawn_days = set()
+        self._drawn_rows = set()
+        self._view_x = 0
+        self._row_count = len(gantt_data)
         
-        # Oblicz całkowitą szerokość wykresu
-        chart_width = self.margin_left + (total_days * self.day_width)
+        # Kolumna użytkowników
+        self._draw_rows()
         
-        # Oblicz całkowitą wysokość wykresu
-        chart_height = self.header_height + (len(gantt_data) * self.row_height)
+        # Siatka, nagłówek i paski zadań
+        self._pan(gantt_data)
+    
+    def _show_range(self):
+        """
+        Pokazuje bieżący zakres dat
         
-        # Skonfiguruj obszar przewijania
-        self.canvas.config(scrollregion=(0, 0, chart_width, chart_height))
+        Jeśli wiersze i skala się nie zmieniły, narysowane dni zostają na miejscu,
+        a widok jest tylko przesuwany. W przeciwnym razie wykres jest rysowany od nowa.
+        """
+        gantt_data = self._get_range_data()
         
-        # Narysuj tło
-        self._draw_background(total_days, len(gantt_data))
+        if gantt_data and self._layout == self._layout_key(gantt_data):
+            self._pan(gantt_data)
+        else:
+            self._draw_gantt()
+    
+    def _layout_key(self, gantt_data):
+        """Zwraca dane, od których zależy układ wykresu (wiersze i skala)"""
+        return (self.scale_var.get(), self.day_width, tuple(user_data["label"] for user_data in gantt_data))
+    
+    def _get_range_data(self):
+        """
+        Zwraca dane wykresu dla bieżącego filtru i zakresu dat
         
-        # Narysuj nagłówek
-        self._draw_header(total_days)
+        Dane są zapamiętywane dla kilku ostatnio używanych zakresów (także
+        pobranych w tle przez _start_prefetch()), więc nawigacja do nich
+        nie wymaga zapytania do bazy. Zmiany z innych połączeń unieważniają
+        zapamiętane dane (_check_data_version), a zmiany zapisane w tym
+        kliencie - zdarzenia ModelEvents (_on_data_changed).
         
-        # Narysuj dane
-        self._draw_data(gantt_data, total_days)
+        Returns:
+            list: Dane wykresu z _get_gantt_data()
+        """
+        self._check_data_version()
+        key = (self.user_filter_var.get(), self.start_date, self.end_date)
+        if key in self._data_cache:
+            self._data_cache.move_to_end(key)
+        else:
+            self._cache_data(key, self._get_gantt_data(*key))
+        return self._data_cache[key]
     
-    def _get_gantt_data(self):
-        """Pobiera dane do wykresu Gantta"""
-        # Dane wykresu: lista słowników {label, tasks}
-        gantt_data = []
+    def _check_data_version(self):
+        """Czyści zapamiętane dane, jeśli baza zmieniła się od ich pobrania"""
+        data_version = DBManager().data_version()
+        if data_version != self._cache_version:
+            self._invalidate_cache()
+            self._cache_version = data_version
+    
+    def _invalidate_cache(self):
+        """Czyści zapamiętane dane; wyniki trwającego pobierania w tle zostaną odrzucone"""
+        self._data_cache.clear()
+        self._cache_generation += 1
+        self._prefetch_key = None
+    
+    def _cache_data(self, key, gantt_data):
+        """Zapamiętuje dane zakresu, usuwając najdawniej używany zakres"""
+        self._data_cache[key] = gantt_data
+        self._data_cache.move_to_end(key)
+        while len(self._data_cache) > self.DATA_CACHE_SIZE:
+            self._data_cache.popitem(last=False)
+    
+    def _start_prefetch(self):
+        """
+        Pobiera w tle dane sąsiednich zakresów (następnego, poprzedniego i dzisiejszego)
+        
+        Wątek roboczy korzysta z połączenia z puli DBManager i nie dotyka
+        widgetów. Wyniki są przekazywane przez kolejkę i trafiają do pamięci
+        podręcznej w wątku GUI (_collect_prefetch).
+        """
+        if self._prefetch_thread is not None:
+            return
+        
+        self._check_data_version()
+        user_filter = self.user_filter_var.get()
+        keys = []
+        for start_date, end_date in (self._shifted_range(1), self._shifted_range(-1), self._today_range()):
+            key = (user_filter, start_date, end_date)
+            if key not in self._data_cache and key not in keys:
+                keys.append(key)
+        
+        self._prefetch_key = (user_filter, self.start_date, self.end_date)
+        if not keys:
+            return
+        
+        self._prefetch_thread = threading.Thread(
+            target=self._prefetch,
+            args=(keys, self._cache_generation)
+        )
+        self._prefetch_thread.daemon = True
+        self._prefetch_thread.start()
+        self.after(self.PREFETCH_POLL, self._collect_prefetch)
+    
+    def _prefetch(self, keys, generation):
+        """Wątek roboczy: pobiera dane podanych zakresów"""
+        try:
+            with DBManager().connection(readonly=True):
+                for key in keys:
+                    self._prefetch_results.put((generation, key, self._get_gantt_data(*key)))
+        except Exception as e:
+            # Zakres zostanie pobrany zwykłym zapytaniem przy nawigacji
+            print(f"Błąd pobierania danych wykresu w tle: {e}")
+    
+    def _collect_prefetch(self):
+        """Przenosi wyniki pobierania w tle do pamięci podręcznej"""
+        # Zmiana bazy w trakcie pobierania zmienia pokolenie i odrzuca wyniki
+        self._check_data_version()
+        while True:
+            try:
+                generation, key, gantt_data = self._prefetch_results.get_nowait()
+            except queue.Empty:
+                break
+            
+            # Dane sprzed zmiany projektów, użytkowników lub bazy są nieaktualne
+            if generation == self._cache_generation and key not in self._data_cache:
+                self._cache_data(key, gantt_data)
+        
+        if self._prefetch_thread.is_alive():
+            self.after(self.PREFETCH_POLL, self._collect_prefetch)
+            return
+        
+        self._prefetch_thread = None
+        
+        # W międzyczasie zmienił się zakres lub dane - pobierz jego sąsiadów
+        if self.winfo_exists() and self._prefetch_key != (self.user_filter_var.get(), self.start_date, self.end_date):
+            self._start_prefetch()
+    
+    def _on_data_changed(self, action, obj):
+        """Unieważnia zapamiętane dane po zapisie lub usunięciu projektu albo użytkownika (ModelEvents)"""
+        self._invalidate_cache()
+        
+        # Wiele zmian naraz (np. automatyczne przydzielanie) - jedno odświeżenie
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._refresh)
+    
+    def _refresh(self):
+        """Odświeża wykres po zmianie danych"""
+        self._refresh_pending = False
+        self._show_range()
+    
+    def _day_x(self, day):
+        """Zwraca współrzędną X początku dnia o podanym numerze (licząc od origin_date)"""
+        return self.margin_left + (day * self.day_width)
+    
+    def _row_y(self, row):
+        """Zwraca współrzędną Y początku wiersza o podanym numerze"""
+        return self.header_height + (row * self.row_height)
+    
+    def _get_gantt_data(self, user_filter, start_date, end_date):
+        """
+        Pobiera dane do wykresu Gantta
+        
+        Nie korzysta z widgetów, więc może działać w wątku roboczym.
+        
+        Args:
+            user_filter (str): Wartość filtru użytkownika
+            start_date (datetime.date): Pierwszy dzień zakresu
+            end_date (datetime.date): Ostatni dzień zakresu
+        
+        Returns:
+            list: Lista słowników {label, tasks} (utils.gantt_data.get_gantt_data)
+        """
+        # Operacje w widocznym zakresie, jednym zapytaniem
+        return get_gantt_data(self._filter_users(user_filter), start_date, end_date)
+    
+    def _filter_users(self, user_filter):
+        """
+        Zwraca użytkowników - wiersze wykresu dla podanego filtru
+        
+        Args:
+            user_filter (str): Wartość filtru użytkownika
         
+        Returns:
+            list: Lista użytkowników
+        """
         # Pobierz wybranego użytkownika
         selected_user_id = None
-        if self.user_filter_var.get() != "Wszyscy użytkownicy":
+        if user_filter != "Wszyscy użytkownicy":
             try:
-                selected_user_id = int(self.user_filter_var.get().split(":")[0])
+                selected_user_id = int(user_filter.split(":")[0])
             except:
                 pass
         
         # Pobierz użytkowników
         if selected_user_id:
-            users = [User.get_by_id(selected_user_id)]
+            return [User.get_by_id(selected_user_id)]
         elif self.is_admin:
-            users = User.get_all_users()
+            return User.get_all_users()
         else:
-            users = [self.current_user]
+            return [self.current_user]
+    
+    def _export_chart(self):
+        """Eksportuje wykres bieżącego filtru i zakresu dat do pliku SVG lub PDF"""
+        # Wybierz plik docelowy
+        file_path = filedialog.asksaveasfilename(
+            title="Eksportuj wykres Gantta",
+            filetypes=[("Pliki SVG", "*.svg"), ("Pliki PDF", "*.pdf")],
+            defaultextension=".svg",
+            initialfile=f"gantt_{self.start_date.strftime('%Y%m%d')}_{self.end_date.strftime('%Y%m%d')}.svg"
+        )
         
-        # Dla każdego użytkownika
-        for user in users:
-            if not user:
-                continue
-                
-            user_label = f"{user.first_name} {user.last_name}"
-            user_tasks = []
-            
-            # Pobierz wdrożenia
-            implementations = Implementation.get_by_user_id(user.id)
-            
-            for impl in implementations:
-                # Dla każdej operacji przypisanej do użytkownika
-                for operation_name, op_data in impl.operations.items():
-                    user_id = op_data.get("user_id")
-                    start_date = op_data.get("start_date")
-                    end_date = op_data.get("end_date")
-                    
-                    if user_id == user.id and start_date and end_date:
-                        try:
-                            # Bezpieczna konwersja dat z obsługą błędów
-                            start_date_obj = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()
-                            end_date_obj = datetime.datetime.strptime(end_date, "%Y-%m-%d").date()
-                            
-                            # Sprawdź czy zadanie mieści się w zakresie widocznym
-                            if end_date_obj < self.start_date or start_date_obj > self.end_date:
-                                continue
-                            
-                            # Dodaj zadanie
-                            user_tasks.append({
-                                "label": f"{impl.name} - {operation_name}",
-                                "start_date": start_date_obj,
-                                "end_date": end_date_obj,
-                                "type": "Implementation",
-                                "operation": operation_name
-                            })
-                        except ValueError:
-                            # Ignoruj wpisy z nieprawidłowymi datami
-                            continue
-            
-            # Pobierz oferty
-            offers = Offer.get_by_user_id(user.id)
-            
-            for offer in offers:
-                # Dla każdej operacji przypisanej do użytkownika
-                for operation_name, op_data in offer.operations.items():
-                    user_id = op_data.get("user_id")
-                    start_date = op_data.get("start_date")
-                    end_date = op_data.get("end_date")
-                    
-                    if user_id == user.id and start_date and end_date:
-                        try:
-                            # Bezpieczna konwersja dat z obsługą błędów
-                            start_date_obj = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()
-                            end_date_obj = datetime.datetime.strptime(end_date, "%Y-%m-%d").date()
-                            
-                            # Sprawdź czy zadanie mieści się w zakresie widocznym
-                            if end_date_obj < self.start_date or start_date_obj > self.end_date:
-                                continue
-                            
-                            # Dodaj zadanie
-                            user_tasks.append({
-                                "label": f"{offer.name} - {operation_name}",
-                                "start_date": start_date_obj,
-                                "end_date": end_date_obj,
-                                "type": "Offer",
-                                "operation": operation_name
-                            })
-                        except ValueError:
-                            # Ignoruj wpisy z nieprawidłowymi datami
-                            continue
-            
-            # Dodaj dane użytkownika NAWET jeśli nie ma zadań
-            gantt_data.append({
-                "label": user_label,
-                "tasks": user_tasks
-            })
+        if not file_path:
+            return
+        
+        # Eksport w wątku roboczym, aby duży wykres nie blokował okna
+        users = self._filter_users(self.user_filter_var.get())
+        options = {"day_width": self.day_width, "merge": self.scale_var.get() == self.SCALE_MONTH}
+        self.export_button["state"] = tk.DISABLED
+        
+        export_thread = threading.Thread(
+            target=self._export,
+            args=(users, self.start_date, self.end_date, file_path, options)
+        )
+        export_thread.daemon = True
+        export_thread.start()
+        self.after(self.PREFETCH_POLL, self._collect_export)
+    
+    def _export(self, users, start_date, end_date, file_path, options):
+        """Wątek roboczy: eksportuje wykres i przekazuje wynik przez kolejkę"""
+        try:
+            with DBManager().connection(readonly=True):
+                success = export_gantt(users, start_date, end_date, file_path, **options)
+        except Exception as e:
+            print(f"Błąd eksportu wykresu w tle: {e}")
+            success = False
+        self._export_results.put((file_path, success))
+    
+    def _collect_export(self):
+        """Czeka na zakończenie eksportu i pokazuje jego wynik"""
+        try:
+            file_path, success = self._export_results.get_nowait()
+        except queue.Empty:
+            self.after(self.PREFETCH_POLL, self._collect_export)
+            return
         
-        return gantt_data
+        if not self.winfo_exists():
+            return
+        self.export_button["state"] = tk.NORMAL
+        
+        if success:
+            messagebox.showinfo("Sukces", f"Wykres został wyeksportowany do pliku {file_path}.")
+        else:
+            messagebox.showerror("Błąd", "Nie udało się wyeksportować wykresu.")
 
+    def _xview(self, *args):
+        """Przewija wykres w poziomie i rysuje odsłonięte dni"""
+        self.canvas.xview(*args)
+        self._draw_visible()
     
-    def _draw_background(self, total_days, rows):
-        """Rysuje tło wykresu"""
-        scale = self.scale_var.get()
+    def _yview(self, *args):
+        """Przewija wykres w pionie i rysuje odsłonięte wiersze"""
+        self.canvas.yview(*args)
+        self._draw_visible()
+    
+    def _pan(self, gantt_data):
+        """Przesuwa widok do bieżącego zakresu dat i rysuje jego widoczną część"""
+        first = (self.start_date - self.origin_date).days
+        last = (self.end_date - self.origin_date).days
+        chart_height = self._row_y(self._row_count)
+        
+        # Zbyt wiele narysowanych dni - siatka i nagłówek są rysowane od nowa
+        if len(self._drawn_days) > self.MAX_DRAWN_DAYS:
+            self.canvas.delete("grid", "header")
+            self._drawn_days = set()
+        
+        # Nazwy miesięcy i paski zadań zależą od zakresu - rysowane od nowa
+        self.canvas.delete("months", "bars")
+        self._draw_months(first, last)
+        self._gantt_data = gantt_data
+        self._bar_specs = {}
+        self._drawn_bars = set()
+        
+        # Kolumna użytkowników zostaje na początku zakresu, nad dniami spoza niego
+        view_x = first * self.day_width
+        self.canvas.move("rows", view_x - self._view_x, 0)
+        self._view_x = view_x
+        
+        # Poziome linie wierszy na całą szerokość zakresu
+        for item in self.canvas.find_withtag("row_line"):
+            y = self.canvas.coords(item)[1]
+            self.canvas.coords(item, view_x, y, self._day_x(last + 1), y)
+        
+        # Obszar przewijania obejmuje tylko bieżący zakres
+        fraction = self.canvas.xview()[0]
+        self.canvas.config(scrollregion=(view_x, 0, self._day_x(last + 1), chart_height))
+        self.canvas.xview_moveto(fraction)
+    
+        self._draw_visible()
         
-        # Wybierz odstęp linii siatki w zależności od skali
-        if scale == self.SCALE_DAY:
-            grid_spacing = 1  # Linia co dzień
-        elif scale == self.SCALE_WEEK:
-            grid_spacing = 7  # Linia co tydzień
-        else:  # Miesiąc
-            grid_spacing = 1  # Linia co dzień, ale zmieniamy jej styl dla różnych dni
+        # Po narysowaniu pobierz w tle sąsiednie zakresy
+        self.after_idle(self._start_prefetch)
+    
+    def _draw_visible(self):
+        """
+        Rysuje brakujące elementy widocznej części wykresu
+        
+        Na canvasie powstają tylko dni i wiersze w obrębie okna (z zapasem
+        VIEW_MARGIN), kolejne są dorysowywane przy przewijaniu.
+        """
+        if self._layout is None:
+            return
+        
+        first = (self.start_date - self.origin_date).days
+        last = (self.end_date - self.origin_date).days
+        
+        # Widoczne dni (z linią zamykającą last + 1) i wiersze
+        x_from = self.canvas.canvasx(0)
+        x_to = self.canvas.canvasx(self.canvas_width)
+        first_day = max(first, int((x_from - self.margin_left) // self.day_width) - self.VIEW_MARGIN)
+        last_day = min(last + 1, int((x_to - self.margin_left) // self.day_width) + self.VIEW_MARGIN)
+        
+        y_from = self.canvas.canvasy(0)
+        y_to = self.canvas.canvasy(self.canvas_height)
+        first_row = max(0, int((y_from - self.header_height) // self.row_height) - self.VIEW_MARGIN)
+        last_row = min(self._row_count - 1, int((y_to - self.header_height) // self.row_height) + self.VIEW_MARGIN)
+        
+        self._draw_days([day for day in range(first_day, last_day + 1) if day not in self._drawn_days])
+        
+        for row in range(first_row, last_row + 1):
+            if row not in self._drawn_rows:
+                self._draw_row(row)
+            self._draw_row_bars(row, first_day, last_day)
         
-        # Rysuj siatkę pionową
-        for i in range(total_days + 1):
-            x = self.margin_left + (i * self.day_width)
+        # Kolejność warstw: siatka, paski, kolumna użytkowników, linie wierszy
+        self.canvas.tag_raise("bars")
+        self.canvas.tag_raise("rows")
+        self.canvas.tag_raise("row_line")
+    
+    def _draw_rows(self):
+        """Rysuje nagłówek i tło kolumny użytkowników"""
+        # Tło kolumny zasłania dni narysowane przed bieżącym zakresem
+        self.canvas.create_rectangle(
+            0, 0,
+            self.margin_left, self._row_y(self._row_count),
+            fill="white",
+            outline="",
+            tags=("rows",)
+        )
+        
+        # Tytuł kolumny
+        self.canvas.create_text(
+            self.margin_left // 2, 
+            self.header_height // 2,
+            text="Użytkownik",
+            font=("Arial", 10, "bold"),
+            tags=("rows",)
+        )
+        
+        # Linia oddzielająca
+        self.canvas.create_line(
+            self.margin_left, 0, 
+            self.margin_left, self.header_height,
+            fill="black",
+            tags=("rows",)
+        )
+        
+    def _draw_row(self, row):
+        """Rysuje etykietę wiersza i jego poziome linie"""
+        y = self._row_y(row)
+        last = (self.end_date - self.origin_date).days
+        
+        self.canvas.create_text(
+            self._view_x + (self.margin_left // 2), 
+            y + (self.row_height // 2),
+            text=self._gantt_data[row]["label"],
+            font=("Arial", 9),
+            tags=("rows",)
+        )
+        
+        # Linia nad wierszem, a pod ostatnim wierszem także linia zamykająca
+        for line_y in ([y, self._row_y(row + 1)] if row == self._row_count - 1 else [y]):
+            self.canvas.create_line(
+                self._view_x, line_y, 
+                self._day_x(last + 1), line_y,
+                fill="#DDDDDD",
+                tags=("row_line",)
+            )
+        
+        self._drawn_rows.add(row)
+    
+    def _draw_days(self, days):
+        """
+        Rysuje linie siatki i nagłówek podanych dni
+        
+        Args:
+            days (list): Numery dni (licząc od origin_date)
+        """
+        scale = self.scale_var.get()
+        chart_height = self._row_y(self._row_count)
+        today = datetime.date.today()
+        
+        for day in days:
+            x = self._day_x(day)
+            current_date = self.origin_date + datetime.timedelta(days=day)
             
             # Wybierz styl linii w zależności od dnia
             if scale == self.SCALE_MONTH:
-                current_date = self.start_date + datetime.timedelta(days=i)
                 # Podświetl pierwszy dzień miesiąca i pierwszy dzień tygodnia (poniedziałek)
                 if current_date.day == 1:
                     line_color = "#444444"  # Ciemny dla pierwszego dnia miesiąca
@@ -475,12 +795,10 @@ class GanttPanel(ttk.Frame):
                 else:
                     line_color = "#DDDDDD"  # Jasny dla normalnych dni
                     line_width = 1
-            elif scale == self.SCALE_WEEK and i % 7 == 0:
+            elif scale == self.SCALE_WEEK and current_date.weekday() == 0:
+                # Zakresy tygodniowe zaczynają się w poniedziałek
                 line_color = "#888888"
                 line_width = 1
-            elif scale == self.SCALE_DAY:
-                line_color = "#DDDDDD"
-                line_width = 1
             else:
                 line_color = "#DDDDDD"
                 line_width = 1
@@ -488,230 +806,163 @@ class GanttPanel(ttk.Frame):
             # Linia pionowa
             self.canvas.create_line(
                 x, 0, 
-                x, self.header_height + (rows * self.row_height),
+                x, chart_height,
                 fill=line_color,
-                width=line_width
-            )
-        
-        # Siatka pozioma (wiersze)
-        for i in range(rows + 1):
-            y = self.header_height + (i * self.row_height)
-            
-            # Linia pozioma
-            self.canvas.create_line(
-                0, y, 
-                self.margin_left + (total_days * self.day_width), y,
-                fill="#DDDDDD"
+                width=line_width,
+                tags=("grid",)
             )
         
-        # Dodaj podświetlenie dzisiejszego dnia
-        today = datetime.date.today()
-        if self.start_date <= today <= self.end_date:
-            # Oblicz pozycję dzisiejszego dnia
-            today_offset = (today - self.start_date).days
-            x = self.margin_left + (today_offset * self.day_width)
+            # Podświetlenie dzisiejszego dnia (pod wszystkimi elementami)
+            if current_date == today:
+                self.canvas.create_rectangle(
+                    x, 0,
+                    x + self.day_width, chart_height,
+                    fill="#FFFFDD",  # Jasny żółty
+                    outline="",
+                    tags=("grid", "today_highlight")
+                )
+                self.canvas.tag_lower("today_highlight")
             
-            # Narysuj podświetlenie
-            self.canvas.create_rectangle(
-                x, 0,
-                x + self.day_width, self.header_height + (rows * self.row_height),
-                fill="#FFFFDD",  # Jasny żółty
-                outline="",
-                tags="today_highlight"
-            )
+            # Nagłówek dnia
+            self._draw_day_header(x, current_date, scale)
             
-            # Przesuń podświetlenie za tło
-            self.canvas.tag_lower("today_highlight")
+            self._drawn_days.add(day)
     
-    def _draw_header(self, total_days):
-        """Rysuje nagłówek wykresu"""
-        # Tytuł wykresu
-        self.canvas.create_text(
-            self.margin_left // 2, 
-            self.header_height // 2,
-            text="Użytkownik",
-            font=("Arial", 10, "bold")
-        )
-        
-        # Linia oddzielająca
-        self.canvas.create_line(
-            self.margin_left, 0, 
-            self.margin_left, self.header_height,
-            fill="black"
-        )
+    def _draw_day_header(self, x, current_date, scale):
+        """Rysuje etykiety dnia w nagłówku (format zależy od skali)"""
+        # Dzień miesiąca
+        day = current_date.day
         
-        # Aktualna data
-        current_date = self.start_date
+        # Nazwa dnia tygodnia (po polsku)
+        day_name = DAYS_PL[current_date.weekday()]
         
-        # Poprzedni miesiąc
-        prev_month = None
-        month_start_x = 0
+        if scale == self.SCALE_DAY:
+            # Dla widoku dziennego pokazujemy pełną datę i dzień tygodnia
+            self.canvas.create_text(
+                x + (self.day_width // 2), 
+                self.header_height - 15,
+                text=f"{day} {day_name}",
+                font=("Arial", 9),
+                tags=("header",)
+            )
+            # Dodaj też numer tygodnia
+            week_num = current_date.isocalendar()[1]
+            self.canvas.create_text(
+                x + (self.day_width // 2), 
+                self.header_height - 35,
+                text=f"Tydz. {week_num}",
+                font=("Arial", 8),
+                tags=("header",)
+            )
+        elif scale == self.SCALE_WEEK:
+            # Dla widoku tygodniowego pokazujemy dzień i datę (nazwę dnia w poniedziałki)
+            self.canvas.create_text(
+                x + (self.day_width // 2), 
+                self.header_height - 15,
+                text=f"{day} {day_name}" if current_date.weekday() == 0 else f"{day}",
+                font=("Arial", 9),
+                tags=("header",)
+            )
+        else:  # Miesiąc - pionowe etykiety dla dni
+            # Dla widoku miesięcznego pokazujemy pionowo
+            self.canvas.create_text(
+                x + (self.day_width // 2), 
+                self.header_height - 10,
+                text=f"{day}",
+                font=("Arial", 8),
+                tags=("header",)
+            )
+            # Pionowa etykieta dnia tygodnia
+            self.canvas.create_text(
+                x + (self.day_width // 2), 
+                self.header_height - 30,
+                text=f"{day_name}",
+                font=("Arial", 7),
+                angle=90,  # Pionowy tekst
+                tags=("header",)
+            )
         
-        # Format nagłówka zależy od skali
-        scale = self.scale_var.get()
+    def _draw_months(self, first, last):
+        """Rysuje nazwy miesięcy nad widoczną częścią każdego miesiąca zakresu"""
+        current_date = self.origin_date + datetime.timedelta(days=first)
+        end_date = self.origin_date + datetime.timedelta(days=last)
         
-        # Dla każdego dnia
-        for i in range(total_days):
-            x = self.margin_left + (i * self.day_width)
-            
-            # Dzień miesiąca
-            day = current_date.day
-            
-            # Nazwa dnia tygodnia (po polsku)
-            day_name = self.DAYS_PL[current_date.weekday()]
-            
-            # Format w zależności od skali
-            if scale == self.SCALE_DAY:
-                # Dla widoku dziennego pokazujemy pełną datę i dzień tygodnia
-                self.canvas.create_text(
-                    x + (self.day_width // 2), 
-                    self.header_height - 15,
-                    text=f"{day} {day_name}",
-                    font=("Arial", 9)
-                )
-                # Dodaj też numer tygodnia
-                week_num = current_date.isocalendar()[1]
-                self.canvas.create_text(
-                    x + (self.day_width // 2), 
-                    self.header_height - 35,
-                    text=f"Tydz. {week_num}",
-                    font=("Arial", 8)
-                )
-            elif scale == self.SCALE_WEEK:
-                # Dla widoku tygodniowego pokazujemy dzień i datę
-                if current_date.weekday() == 0 or i == 0:  # Poniedziałek lub pierwszy dzień
-                    self.canvas.create_text(
-                        x + (self.day_width // 2), 
-                        self.header_height - 15,
-                        text=f"{day} {day_name}",
-                        font=("Arial", 9)
-                    )
-                else:
-                    self.canvas.create_text(
-                        x + (self.day_width // 2), 
-                        self.header_height - 15,
-                        text=f"{day}",
-                        font=("Arial", 9)
-                    )
-            else:  # Miesiąc - pionowe etykiety dla dni
-                # Dla widoku miesięcznego pokazujemy pionowo
-                self.canvas.create_text(
-                    x + (self.day_width // 2), 
-                    self.header_height - 10,
-                    text=f"{day}",
-                    font=("Arial", 8)
-                )
-                # Pionowa etykieta dnia tygodnia
-                self.canvas.create_text(
-                    x + (self.day_width // 2), 
-                    self.header_height - 30,
-                    text=f"{day_name}",
-                    font=("Arial", 7),
-                    angle=90  # Pionowy tekst
-                )
-            
-            # Narysuj nazwę miesiąca jeśli się zmienił (po polsku)
-            month = current_date.month
-            
-            if prev_month != month:
-                # Zakończ poprzedni miesiąc
-                if prev_month is not None:
-                    month_width = x - month_start_x
-                    month_name = self.MONTHS_PL[prev_month]  # Polska nazwa miesiąca
-                    year = current_date.year if current_date.month > prev_month else current_date.year - 1
-                    
-                    self.canvas.create_text(
-                        month_start_x + (month_width // 2), 
-                        self.header_height // 2 - 25,  # Wyżej, aby uniknąć nakładania
-                        text=f"{month_name} {year}",
-                        font=("Arial", 9, "bold")
-                    )
-                
-                # Rozpocznij nowy miesiąc
-                prev_month = month
-                month_start_x = x
-            
-            # Przejdź do następnego dnia
-            current_date += datetime.timedelta(days=1)
-        
-        # Narysuj ostatni miesiąc
-        if prev_month is not None:
-            month_width = self.margin_left + (total_days * self.day_width) - month_start_x
-            month_name = self.MONTHS_PL[prev_month]  # Polska nazwa miesiąca
-            year = current_date.year if current_date.month <= prev_month else current_date.year - 1
+        while current_date <= end_date:
+            month_end = min(self._last_day_of_month(current_date), end_date)
+            month_start_x = self._day_x((current_date - self.origin_date).days)
+            month_width = self._day_x((month_end - self.origin_date).days + 1) - month_start_x
             
             self.canvas.create_text(
                 month_start_x + (month_width // 2), 
-                self.header_height // 2 - 25,
-                text=f"{month_name} {year}",
-                font=("Arial", 9, "bold")
+                self.header_height // 2 - 25,  # Wyżej, aby uniknąć nakładania
+                text=f"{MONTHS_PL[current_date.month]} {current_date.year}",  # Polska nazwa miesiąca
+                font=("Arial", 9, "bold"),
+                tags=("months",)
             )
     
-    def _draw_data(self, gantt_data, total_days):
-        """Rysuje dane na wykresie"""
-        # Dla każdego użytkownika
-        for i, user_data in enumerate(gantt_data):
-            # Pozycja Y wiersza
-            y = self.header_height + (i * self.row_height)
+            current_date = month_end + datetime.timedelta(days=1)
+    
+    def _row_bar_specs(self, row):
+        """
+        Zwraca paski wiersza w bieżącym zakresie dat
+        
+        W skali miesięcznej nachodzące na siebie zadania są łączone w jeden
+        pasek zajętości (bez etykiety), aby nie tworzyć nieczytelnych,
+        nakładających się elementów.
+        
+        Args:
+            row (int): Numer wiersza
+        
+        Returns:
+            list: Lista krotek (pierwszy dzień, ostatni dzień, kolor, etykieta lub None)
+        """
+        if row not in self._bar_specs:
+            # Dni pasków liczone od origin_date, a nie od początku zakresu
+            offset = (self.start_date - self.origin_date).days
+            self._bar_specs[row] = [
+                (first_day + offset, last_day + offset, color, label)
+                for first_day, last_day, color, label in task_bars(
+                    self._gantt_data[row]["tasks"],
+                    self.start_date,
+                    self.end_date,
+                    merge=self.scale_var.get() == self.SCALE_MONTH
+                )
+            ]
+        return self._bar_specs[row]
+    
+    def _draw_row_bars(self, row, first_day, last_day):
+        """Rysuje paski wiersza, które nachodzą na dni od first_day do last_day"""
+        y = self._row_y(row)
+        bar_height = self.row_height - 6
+        
+        for index, (start_day, end_day, color, label) in enumerate(self._row_bar_specs(row)):
+            if (row, index) in self._drawn_bars or end_day < first_day or start_day > last_day:
+                continue
             
-            # Etykieta wiersza
-            self.canvas.create_text(
-                self.margin_left // 2, 
-                y + (self.row_height // 2),
-                text=user_data["label"],
-                font=("Arial", 9)
+            # Pozycja X i szerokość
+            x = self._day_x(start_day)
+            width = (end_day - start_day + 1) * self.day_width
+            
+            # Narysuj pasek zadania
+            self.canvas.create_rectangle(
+                x, y + 3,
+                x + width, y + bar_height + 3,
+                fill=color,
+                outline="white",
+                tags=("bars", "task")
             )
             
-            # Dla każdego zadania
-            for task in user_data["tasks"]:
-                # Oblicz pozycję X
-                start_offset = max(0, (task["start_date"] - self.start_date).days)
-                task_duration = (task["end_date"] - task["start_date"]).days + 1
-                
-                # Ogranicz do widocznego zakresu
-                if start_offset < 0:
-                    task_duration += start_offset
-                    start_offset = 0
-                
-                if start_offset + task_duration > total_days:
-                    task_duration = total_days - start_offset
+            # Dodaj etykietę zadania
+            # Wyświetlaj etykietę tylko jeśli jest wystarczająca szerokość
+            if label and width > 50:
+                self.canvas.create_text(
+                    x + (width // 2), 
+                    y + (bar_height // 2) + 3,
+                    text=label,
+                    fill="black",
+                    font=("Arial", 8),
+                    width=width - 10,  # Limit szerokości tekstu
+                    tags=("bars", "task_label")
+                )
                 
-                # Tylko rysuj zadanie, jeśli jest widoczne
-                if task_duration > 0:
-                    # Pozycja X i szerokość
-                    x = self.margin_left + (start_offset * self.day_width)
-                    width = task_duration * self.day_width
-                    
-                    # Wybierz kolor
-                    if task["type"] == "Implementation":
-                        color = self.COLORS["Implementation"]
-                    else:
-                        color = self.COLORS["Offer"]
-                    
-                    # Kolor operacji jeśli jest
-                    if "operation" in task:
-                        if task["operation"] in self.COLORS:
-                            color = self.COLORS[task["operation"]]
-                    
-                    # Narysuj pasek zadania
-                    bar_height = self.row_height - 6
-                    self.canvas.create_rectangle(
-                        x, y + 3,
-                        x + width, y + bar_height + 3,
-                        fill=color,
-                        outline="white",
-                        tags=("task",)
-                    )
-                    
-                    # Dodaj etykietę zadania
-                    # Wyświetlaj etykietę tylko jeśli jest wystarczająca szerokość
-                    if width > 50:
-                        self.canvas.create_text(
-                            x + (width // 2), 
-                            y + (bar_height // 2) + 3,
-                            text=task["label"],
-                            fill="black",
-                            font=("Arial", 8),
-                            width=width - 10,  # Limit szerokości tekstu
-                            tags=("task_label",)
-                        )
\ No newline at end of file
+            self._drawn_bars.add((row, index))
@@ -4,6 +4,7 @@ from tkinter import filedialog
 from database.db_manager import DBManager
 from utils.auth import AuthManager
 from database.models import User, Task, Implementation, Offer, Role
+from database.migrations import migrate
 from gui.task_panel import TaskPanel
 from gui.admin_panel import AdminPanel
 from gui.implementation import ImplementationPanel
@@ -50,12 +51,8 @@ class MainWindow:
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
     
     def _create_tables(self):
-        """Tworzy tabele w bazie danych"""
-        User.create_tables()
-        Task.create_tables()
-        Implementation.create_tables()
-        Offer.create_tables()
-        Role.create_tables()  # Dodane tworzenie tabel ról
+        """Tworzy tabele w bazie danych (migracja jest wykonywana raz na proces)"""
+        migrate()
     
     def _create_widgets(self):
         """Tworzy widgety głównego okna"""
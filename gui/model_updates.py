@@ -0,0 +1,84 @@
+import bisect
+from database.models import ModelEvents
+
+
+def subscribe_widget(widget, model, callback):
+    """
+    Subskrybuje zmiany modelu na czas życia widgetu
+    
+    Args:
+        widget (tk.Widget): Widget, po którego zniszczeniu subskrypcja jest usuwana
+        model (type): Klasa modelu (np. Task)
+        callback (callable): Funkcja callback(action, obj)
+    """
+    events = ModelEvents()
+    events.subscribe(model, callback)
+    
+    def on_destroy(event):
+        if event.widget is widget:
+            events.unsubscribe(model, callback)
+    
+    widget.bind("<Destroy>", on_destroy, add="+")
+
+
+def sorted_position(tree, sort_keys, item_id, key, reverse=False):
+    """
+    Zwraca pozycję, na której wiersz zachowa kolejność posortowanej tabeli
+    
+    Pozycja jest wyszukiwana binarnie, więc klucze muszą być unikalne i zgodne
+    z kolejnością zapytania - przy równych wartościach dołącz ID rekordu
+    w tym samym kierunku co w ORDER BY.
+    
+    Args:
+        tree (ttk.Treeview): Tabela
+        sort_keys (dict): ID wiersza -> klucz sortowania (dla wierszy tabeli)
+        item_id (str): ID wstawianego lub przesuwanego wiersza (pomijany w tabeli)
+        key: Klucz sortowania wiersza
+        reverse (bool): Czy tabela jest posortowana malejąco
+    
+    Returns:
+        int: Pozycja wśród pozostałych wierszy
+    """
+    children = list(tree.get_children())
+    if tree.exists(item_id):
+        del children[tree.index(item_id)]
+    if reverse:
+        # Wiersze od końca są posortowane rosnąco; przed wierszem są te z większym kluczem
+        children.reverse()
+        return len(children) - bisect.bisect_right(children, key, key=sort_keys.__getitem__)
+    return bisect.bisect_left(children, key, key=sort_keys.__getitem__)
+
+
+def upsert_row(tree, item_id, values, position="end", tags=()):
+    """
+    Wstawia wiersz lub aktualizuje istniejący, przesuwając go na podaną pozycję
+    
+    Zaznaczenie i przewinięcie tabeli pozostają bez zmian.
+    
+    Args:
+        tree (ttk.Treeview): Tabela
+        item_id (str): ID wiersza
+        values (list): Wartości kolumn
+        position (int|str): Pozycja wśród pozostałych wierszy (sorted_position) lub "end"
+        tags (tuple): Tagi wiersza
+    """
+    if not tree.exists(item_id):
+        tree.insert("", position, iid=item_id, values=values, tags=tags)
+        return
+    
+    tree.item(item_id, values=values, tags=tags)
+    if position == "end" or tree.index(item_id) == position:
+        return
+    
+    # Po odłączeniu wiersza pozycja dotyczy pozostałych wierszy
+    selected = item_id in tree.selection()
+    tree.detach(item_id)
+    tree.move(item_id, "", position)
+    if selected:
+        tree.selection_add(item_id)
+
+
+def remove_row(tree, item_id):
+    """Usuwa wiersz z tabeli, jeśli jest wyświetlany"""
+    if tree.exists(item_id):
+        tree.delete(item_id)
@@ -4,6 +4,8 @@ import re
 import datetime
 from tkcalendar import DateEntry
 from database.models import Implementation, Offer, User
+from database.db_manager import DBManager
+from scheduler.incremental import WorkloadCache, scheduling_inputs, affected_operations
 
 class ProjectFormWindow:
     """Ulepszone okno dla dodawania/edycji wdrożeń i ofert"""
@@ -310,65 +312,81 @@ class ProjectFormWindow:
         print(f"Zapisywanie projektu: {name}")
         print(f"Daty: {start_date} - {end_date}")
         
-        # Utwórz nowy lub zaktualizuj istniejący projekt
-        if not self.project:
-            # Nowy projekt
-            project = self.project_class(
-                name=name,
-                description=description,
-                status=status
-            )
-            
-            # Zapisz projekt, co utworzy domyślne operacje
-            project.save()
-            
-            # Po utworzeniu nowego projektu, ustaw go jako aktualny projekt
-            self.project = project
-        else:
-            # Edycja istniejącego projektu
-            self.project.name = name
-            self.project.description = description
-            self.project.status = status
-        
-        # Aktualizuj dane operacji
-        for operation_name in self.operations:
-            # Pobierz ustawienia z formularza
-            is_enabled = self.operation_enabled[operation_name].get()
-            min_days = self.operation_min_days[operation_name].get()
-            
-            print(f"Zapisywanie operacji {operation_name}: required={is_enabled}, min_days={min_days}")
-            
-            # Zapewnij, że operacja jest zainicjalizowana
-            if operation_name not in self.project.operations:
-                self.project.operations[operation_name] = {}
+        # Dane planowania sprzed zmian (None dla nowego projektu)
+        before = scheduling_inputs(self.project) if self.project else None
+        
+        # Zapisz projekt i jego operacje w jednej transakcji; formularz przejmuje
+        # nowy projekt dopiero po zatwierdzeniu, bo wycofanie unieważnia jego id
+        try:
+            with DBManager().transaction():
+                # Utwórz nowy lub zaktualizuj istniejący projekt
+                if not self.project:
+                    # Nowy projekt
+                    project = self.project_class(
+                        name=name,
+                        description=description,
+                        status=status
+                    )
+                    
+                    # Zapisz projekt, co utworzy domyślne operacje
+                    project.save()
+                else:
+                    # Edycja istniejącego projektu
+                    project = self.project
+                    project.name = name
+                    project.description = description
+                    project.status = status
                 
-            # Zachowaj istniejące dane użytkownika i daty
-            op_data = self.project.operations[operation_name]
-            user_id = op_data.get("user_id")
-            op_start_date = op_data.get("start_date")
-            op_end_date = op_data.get("end_date")
-            
-            # Zapisz dane o wymaganiu operacji
-            self.project.operations[operation_name]["required"] = is_enabled
-            
-            # Zapisz minimalną liczbę dni
-            try:
-                min_days_int = int(min_days)
-                if min_days_int < 1:
-                    min_days_int = 1
-            except ValueError:
-                min_days_int = 1
+                # Aktualizuj dane operacji
+                for operation_name in self.operations:
+                    # Pobierz ustawienia z formularza
+                    is_enabled = self.operation_enabled[operation_name].get()
+                    min_days = self.operation_min_days[operation_name].get()
+                    
+                    print(f"Zapisywanie operacji {operation_name}: required={is_enabled}, min_days={min_days}")
+                    
+                    # Zapewnij, że operacja jest zainicjalizowana
+                    if operation_name not in project.operations:
+                        project.operations[operation_name] = {}
+                    
+                    # Zachowaj istniejące dane użytkownika i daty
+                    op_data = project.operations[operation_name]
+                    user_id = op_data.get("user_id")
+                    op_start_date = op_data.get("start_date")
+                    op_end_date = op_data.get("end_date")
+                    
+                    # Zapisz dane o wymaganiu operacji
+                    project.operations[operation_name]["required"] = is_enabled
+                    
+                    # Zapisz minimalną liczbę dni
+                    try:
+                        min_days_int = int(min_days)
+                        if min_days_int < 1:
+                            min_days_int = 1
+                    except ValueError:
+                        min_days_int = 1
+                    
+                    project.operations[operation_name]["min_days"] = min_days_int
+                    
+                    # Dla operacji Wdrożenie ustaw daty z formularza
+                    if operation_name == "Wdrożenie":
+                        project.operations[operation_name]["start_date"] = start_date
+                        project.operations[operation_name]["end_date"] = end_date
+                        project.operations[operation_name]["user_id"] = user_id
                 
-            self.project.operations[operation_name]["min_days"] = min_days_int
-            
-            # Dla operacji Wdrożenie ustaw daty z formularza
-            if operation_name == "Wdrożenie":
-                self.project.operations[operation_name]["start_date"] = start_date
-                self.project.operations[operation_name]["end_date"] = end_date
-                self.project.operations[operation_name]["user_id"] = user_id
-        
-        # Zapisz projekt do bazy danych
-        self.project.save()
+                # Przydziel od nowa tylko operacje, których dotyczy zmiana dat lub wymagań
+                WorkloadCache().replan_project(
+                    self.project_type, project, affected_operations(before, project)
+                )
+                
+                # Zapisz projekt do bazy danych
+                project.save()
+        except Exception:
+            # Obciążenie zawiera już niezapisany przydział - wczytaj je od nowa
+            WorkloadCache().invalidate()
+            raise
+        
+        self.project = project
         
         print(f"Projekt zapisany: {self.project.name}")
         print(f"Operacje po zapisie: {self.project.operations}")
@@ -2,11 +2,19 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import datetime
 import re
-from database.models import Implementation, Offer, User, WorkloadLimits
+from database.models import Project, Implementation, Offer, User, UserDirectory, WorkloadLimits, PermissionMatrix, ModelEvents
+from database.db_manager import DBManager
+from scheduler.planner import plan_assignments, apply_plan, user_skills_from_roles, SPECIALIST_OPERATIONS
+from scheduler.incremental import WorkloadCache, scheduling_inputs, affected_operations
 from utils.export import export_implementations_to_excel, export_offers_to_excel
 from gui.project_form import ProjectFormWindow
+from gui.model_updates import subscribe_widget, sorted_position, upsert_row, remove_row
 from tkcalendar import DateEntry
 
+# Typ projektu (Project.PROJECT_TYPE) -> nazwa wyświetlana w filtrze i tabeli
+PROJECT_TYPE_NAMES = {"implementation": "Wdrożenie", "offer": "Oferta"}
+
+
 class ProjectsPanel(ttk.Frame):
     """Panel zarządzania projektami (wdrożenia i oferty)"""
     
@@ -28,12 +36,17 @@ class ProjectsPanel(ttk.Frame):
         self.status_filter_var = tk.StringVar(value="Wszystkie")
         self.project_type_filter_var = tk.StringVar(value="Wszystkie")
         self.sort_by_var = tk.StringVar(value="Termin rosnąco")
+        self.project_sort_keys = {}  # ID wiersza -> klucz bieżącego sortowania
         
         # Stwórz widgety
         self._create_widgets()
         
         # Załaduj dane
         self._load_projects()
+        
+        # Zapisane i usunięte projekty aktualizują tylko swój wiersz tabeli
+        subscribe_widget(self, Implementation, lambda action, project: self._on_project_changed("implementation", action, project))
+        subscribe_widget(self, Offer, lambda action, project: self._on_project_changed("offer", action, project))
     
     def _create_widgets(self):
         """Tworzy widgety panelu zarządzania projektami"""
@@ -195,78 +208,100 @@ class ProjectsPanel(ttk.Frame):
     def _load_projects(self):
         """Ładuje projekty do tabeli"""
         # Wyczyść istniejące projekty
-        for item in self.projects_tree.get_children():
-            self.projects_tree.delete(item)
-        
-        # Pobierz projekty
-        all_projects = []
-        
-        # Czy pokazywać wdrożenia
-        if self.project_type_filter_var.get() in ["Wszystkie", "Wdrożenie"]:
-            implementations = Implementation.get_all()
-            
-            # Filtrowanie po statusie
-            if self.status_filter_var.get() != "Wszystkie":
-                implementations = [impl for impl in implementations if impl.status == self.status_filter_var.get()]
-            
-            # Dodaj typ projektu do każdego wdrożenia
-            for impl in implementations:
-                impl.project_type = "Wdrożenie"
-                all_projects.append(impl)
-        
-        # Czy pokazywać oferty
-        if self.project_type_filter_var.get() in ["Wszystkie", "Oferta"]:
-            offers = Offer.get_all()
-            
-            # Filtrowanie po statusie
-            if self.status_filter_var.get() != "Wszystkie":
-                offers = [offer for offer in offers if offer.status == self.status_filter_var.get()]
-            
-            # Dodaj typ projektu do każdej oferty
-            for offer in offers:
-                offer.project_type = "Oferta"
-                all_projects.append(offer)
-        
-        # Sortowanie projektów
-        sort_option = self.sort_by_var.get()
-        if sort_option == "Termin rosnąco":
-            all_projects.sort(key=self._get_project_deadline)
-        elif sort_option == "Termin malejąco":
-            all_projects.sort(key=self._get_project_deadline, reverse=True)
-        elif sort_option == "Nazwa A-Z":
-            all_projects.sort(key=lambda p: p.name)
-        elif sort_option == "Nazwa Z-A":
-            all_projects.sort(key=lambda p: p.name, reverse=True)
+        self.projects_tree.delete(*self.projects_tree.get_children())
+        self.project_sort_keys = {}
+        
+        # Filtrowanie i sortowanie w SQL
+        status = self.status_filter_var.get()
+        filters = {
+            "status": None if status == "Wszystkie" else status,
+            "order_by": self._sort_column(),
+            "descending": self._sort_descending()
+        }
+        
+        # Wdrożenia i oferty jednym zapytaniem
+        all_projects = self._filtered_project_class().query(**filters)
+        for project in all_projects:
+            project.project_type = PROJECT_TYPE_NAMES[project.PROJECT_TYPE]
         
         # Dodaj projekty do tabeli
         for project in all_projects:
-            # Pobierz termin (data zakończenia)
-            deadline = self._get_project_deadline_str(project)
-            
-            # Przygotuj informacje o operacjach
-            operations_text = self._format_operations(project)
-            
-            values = [
-                project.id,
-                project.project_type,
-                project.name,
-                project.status,
-                deadline,
-                operations_text
-            ]
-            
-            item = self.projects_tree.insert("", "end", values=values)
-            
             # Dodaj tagi dla rozróżnienia typów projektów
-            if project.project_type == "Wdrożenie":
-                self.projects_tree.item(item, tags=("implementation",))
-            else:
-                self.projects_tree.item(item, tags=("offer",))
+            tag = project.PROJECT_TYPE
+            item_id = f"{tag}:{project.id}"
+            
+            self.project_sort_keys[item_id] = self._project_sort_key(project)
+            self.projects_tree.insert("", "end", iid=item_id, values=self._project_values(project), tags=(tag,))
         
         # Kolorowe tła dla wdrożeń i ofert
         self.projects_tree.tag_configure("implementation", background="#E8F5E9")  # Jasny zielony
         self.projects_tree.tag_configure("offer", background="#E3F2FD")  # Jasny niebieski
     
+    def _project_values(self, project):
+        """Zwraca wartości wiersza tabeli dla projektu"""
+        return [
+            project.id,
+            project.project_type,
+            project.name,
+            project.status,
+            self._get_project_deadline_str(project),  # Termin (data zakończenia)
+            self._format_operations(project)
+        ]
+    
+    def _project_sort_key(self, project):
+        """Zwraca klucz sortowania projektu dla wybranej opcji sortowania (jak ORDER BY w Project.query)"""
+        if self.sort_by_var.get() in ("Termin rosnąco", "Termin malejąco"):
+            return (self._get_project_deadline(project), project.id)
+        if self.sort_by_var.get() in ("Nazwa A-Z", "Nazwa Z-A"):
+            return (project.name, project.id)
+        return (project.id,)  # Bez sortowania - od najnowszych
+    
+    def _filtered_project_class(self):
+        """Zwraca klasę modelu dla wybranego filtru typu (Project dla obu typów)"""
+        return {"Wdrożenie": Implementation, "Oferta": Offer}.get(self.project_type_filter_var.get(), Project)
+    
+    def _sort_column(self):
+        """Zwraca kolumnę sortowania dla Project.query()"""
+        if self.sort_by_var.get() in ("Termin rosnąco", "Termin malejąco"):
+            return "deadline"
+        if self.sort_by_var.get() in ("Nazwa A-Z", "Nazwa Z-A"):
+            return "name"
+        return None
+    
+    def _sort_descending(self):
+        """Sprawdza, czy wybrano sortowanie malejące"""
+        return self.sort_by_var.get() in ("Termin malejąco", "Nazwa Z-A")
+    
+    def _on_project_changed(self, project_type, action, project):
+        """
+        Aktualizuje wiersz projektu po jego zapisie lub usunięciu (ModelEvents)
+        
+        Args:
+            project_type (str): Typ projektu ("implementation" lub "offer")
+            action (str): ModelEvents.INSERT, UPDATE lub DELETE
+            project (Implementation|Offer): Projekt
+        """
+        item_id = f"{project_type}:{project.id}"
+        project.project_type = PROJECT_TYPE_NAMES[project_type]
+        
+        visible = (
+            action != ModelEvents.DELETE
+            and self.project_type_filter_var.get() in ("Wszystkie", project.project_type)
+            and self.status_filter_var.get() in ("Wszystkie", project.status)
+        )
+        if not visible:
+            remove_row(self.projects_tree, item_id)
+            self.project_sort_keys.pop(item_id, None)
+            return
+        
+        key = self._project_sort_key(project)
+        position = sorted_position(
+            self.projects_tree, self.project_sort_keys, item_id, key,
+            reverse=self._sort_descending() or self._sort_column() is None
+        )
+        self.project_sort_keys[item_id] = key
+        upsert_row(self.projects_tree, item_id, self._project_values(project), position, (project_type,))
+    
     def _get_project_deadline(self, project):
         """Zwraca datę zakończenia projektu do sortowania"""
         # Pobierz datę zakończenia z operacji "Wdrożenie"
@@ -307,8 +342,7 @@ class ProjectsPanel(ttk.Frame):
             
             # Pobierz dane użytkownika
             user_id = op_data.get("user_id")
-            user = User.get_by_id(user_id) if user_id else None
-            user_name = f"{user.first_name} {user.last_name}" if user else "-"
+            user_name = UserDirectory().get_full_name(user_id)
             
             # Dostosuj etykietę dla operacji Wdrożenie w przypadku oferty
             display_name = operation_name
@@ -349,20 +383,12 @@ class ProjectsPanel(ttk.Frame):
         
         self._on_project_select(event)
         
-        if self.selected_project_type == "implementation":
-            # Pobierz wdrożenie z bazy
-            implementation = Implementation.get_by_id(self.selected_project_id)
-            
-            if implementation:
-                # Pokaż okno przypisania użytkowników
-                self._show_assign_users_dialog(implementation, "implementation")
-        else:
-            # Pobierz ofertę z bazy
-            offer = Offer.get_by_id(self.selected_project_id)
-            
-            if offer:
-                # Pokaż okno przypisania użytkowników
-                self._show_assign_users_dialog(offer, "offer")
+        # Pobierz wdrożenie lub ofertę z bazy
+        project = Project.get_by_id(self.selected_project_id)
+        
+        if project:
+            # Pokaż okno przypisania użytkowników
+            self._show_assign_users_dialog(project, project.PROJECT_TYPE)
             
     def _on_filter_change(self, event):
         """Obsługuje zmianę filtru"""
@@ -403,18 +429,14 @@ class ProjectsPanel(ttk.Frame):
             return
         
         # Pobierz projekt
-        project = None
-        if self.selected_project_type == "implementation":
-            project = Implementation.get_by_id(self.selected_project_id)
-        else:
-            project = Offer.get_by_id(self.selected_project_id)
+        project = Project.get_by_id(self.selected_project_id)
         
         if not project:
             messagebox.showerror("Błąd", "Nie znaleziono projektu.")
             return
         
         # Pokaż okno przypisania użytkowników
-        self._show_assign_users_dialog(project, self.selected_project_type)
+        self._show_assign_users_dialog(project, project.PROJECT_TYPE)
 
     def _on_project_saved(self):
         """Obsługuje zdarzenie zapisania projektu"""
@@ -449,10 +471,9 @@ class ProjectsPanel(ttk.Frame):
         
         # Usuń projekt
         if project.delete():
-            # Odśwież listę projektów
-            self._load_projects()
+            WorkloadCache().remove_project(self.selected_project_type, project.id)
             
-            # Wyczyść wybór
+            # Wyczyść wybór (wiersz usunie _on_project_changed)
             self.selected_project_id = None
             self.selected_project_type = None
             
@@ -475,8 +496,9 @@ class ProjectsPanel(ttk.Frame):
             project (Implementation|Offer): Projekt
             project_type (str): Typ projektu ("implementation" lub "offer")
         """
-        # Pobierz wszystkich użytkowników
+        # Pobierz wszystkich użytkowników i ich uprawnienia
         users = User.get_all_users()
+        permissions = PermissionMatrix()
         
         # Utwórz okno dialogowe
         dialog = tk.Toplevel(self)
@@ -672,35 +694,13 @@ class ProjectsPanel(ttk.Frame):
             )
             
             # Przygotuj listę użytkowników z odpowiednimi rolami
-            filtered_users = []
-            for user in users:
-                user_roles = user.get_roles()
-                has_required_role = False
-                
-                # Sprawdź czy użytkownik ma odpowiednią rolę dla operacji
-                for role in user_roles:
-                    # Wdrożenie - wymaga roli "Wdrożenia" dla głównej operacji wdrożenia
-                    # lub roli "Oferty" dla głównej operacji oferty
-                    if operation_name == "Wdrożenie":
-                        if (project_type == "implementation" and role.permissions.get("task_implementation", False)) or \
-                        (project_type == "offer" and role.permissions.get("task_offer", False)):
-                            has_required_role = True
-                            break
-                    # Spawanie - wymaga roli "Spawanie"
-                    elif operation_name == "Spawanie" and role.permissions.get("task_welding", False):
-                        has_required_role = True
-                        break
-                    # Malowanie - wymaga roli "Malowanie"
-                    elif operation_name == "Malowanie" and role.permissions.get("task_painting", False):
-                        has_required_role = True
-                        break
-                    # Klejenie - wymaga roli "Klejenie"
-                    elif operation_name == "Klejenie" and role.permissions.get("task_gluing", False):
-                        has_required_role = True
-                        break
-                
-                if has_required_role:
-                    filtered_users.append(user)
+            # Wdrożenie - wymaga uprawnienia "task_implementation" dla wdrożenia
+            # lub "task_offer" dla oferty, pozostałe - uprawnienia danej operacji
+            if operation_name == "Wdrożenie":
+                required_permission = f"task_{project_type}"
+            else:
+                required_permission = f"task_{SPECIALIST_OPERATIONS[operation_name]}"
+            filtered_users = [user for user in users if permissions.has(user.id, required_permission)]
             
             # Przygotuj listę użytkowników
             user_options = [""] + [f"{user.id}: {user.first_name} {user.last_name}" for user in filtered_users]
@@ -768,7 +768,9 @@ class ProjectsPanel(ttk.Frame):
                 "start_date_entry": start_date_entry,
                 "end_date_entry": end_date_entry,
                 "required_var": required_var,
-                "min_days_var": min_days_var
+                "min_days_var": min_days_var,
+                # Wartości pokazane w oknie - do wykrycia zmian wprowadzonych ręcznie
+                "initial": (user_var.get(), op_start_date.strftime("%Y-%m-%d"), op_end_date.strftime("%Y-%m-%d"))
             }
         
         # IMPORTANT: This is the ONLY buttons frame, moved outside of the loop
@@ -827,6 +829,12 @@ class ProjectsPanel(ttk.Frame):
             messagebox.showerror("Błąd", "Główna data rozpoczęcia nie może być późniejsza niż data zakończenia.")
             return
         
+        # Dane planowania sprzed zmian
+        before = scheduling_inputs(project)
+        
+        # Operacje, którym administrator zmienił w oknie użytkownika lub daty
+        edited_operations = set()
+        
         # Aktualizuj status
         project.status = status
         
@@ -853,6 +861,13 @@ class ProjectsPanel(ttk.Frame):
             is_required = ui["required_var"].get()
             min_days = ui["min_days_var"].get()
             
+            # Daty "Wdrożenia" to daty główne, więc liczy się tylko użytkownik
+            initial_user, initial_start, initial_end = ui["initial"]
+            if user_option != initial_user or (
+                operation_name != "Wdrożenie" and (start_date, end_date) != (initial_start, initial_end)
+            ):
+                edited_operations.add(operation_name)
+            
             # Sprawdź czy data rozpoczęcia jest wcześniejsza niż data zakończenia
             if start_date > end_date:
                 messagebox.showerror(
@@ -912,21 +927,29 @@ class ProjectsPanel(ttk.Frame):
                     )
                     return
         
-        # Zapisz projekt
-        project.save()
+        # Przydziel od nowa tylko operacje, których dotyczy zmiana dat głównych lub
+        # wymagań, a ręcznie ustawione przypisania i daty zachowaj
+        operations = affected_operations(before, project) - edited_operations
         
-        # Zamknij okno dialogowe
+        # Zapisz projekt (tylko zmienione operacje)
+        try:
+            with DBManager().transaction():
+                replanned = WorkloadCache().replan_project(project_type, project, operations)
+                project.save()
+        except Exception:
+            # Obciążenie zawiera już niezapisany przydział - wczytaj je od nowa
+            WorkloadCache().invalidate()
+            raise
+        
+        # Zamknij okno dialogowe (wiersz projektu odświeży _on_project_changed)
         dialog.destroy()
         
-        # Odśwież listę projektów
-        self._load_projects()
-        
         # Wyświetl komunikat
         project_type_name = "wdrożenia" if project_type == "implementation" else "oferty"
-        messagebox.showinfo(
-            "Sukces", 
-            f"Przypisania użytkowników do {project_type_name} '{project.name}' zostały zaktualizowane."
-        )
+        message = f"Przypisania użytkowników do {project_type_name} '{project.name}' zostały zaktualizowane."
+        if replanned:
+            message += f"\nPonownie przydzielono operacje: {', '.join(replanned)}."
+        messagebox.showinfo("Sukces", message)
             
     def _auto_assign_users(self):
         """Automatycznie przydziela użytkowników do projektów z zachowaniem ustawień"""
@@ -937,11 +960,10 @@ class ProjectsPanel(ttk.Frame):
             messagebox.showinfo("Informacja", "Brak użytkowników do przypisania.")
             return
         
-        # Pobierz wszystkie wdrożenia o statusie "W trakcie"
-        implementations = [impl for impl in Implementation.get_all() if impl.status == "W trakcie"]
-        
-        # Pobierz wszystkie oferty o statusie "W trakcie"
-        offers = [offer for offer in Offer.get_all() if offer.status == "W trakcie"]
+        # Pobierz wszystkie wdrożenia i oferty o statusie "W trakcie"
+        projects = Project.query(status="W trakcie")
+        implementations = [p for p in projects if p.PROJECT_TYPE == "implementation"]
+        offers = [p for p in projects if p.PROJECT_TYPE == "offer"]
         
         if not implementations and not offers:
             messagebox.showinfo("Informacja", "Brak projektów w trakcie do przypisania.")
@@ -956,230 +978,17 @@ class ProjectsPanel(ttk.Frame):
         ):
             return
         
-        # Pobierz limity obciążenia
-        workload_limits = WorkloadLimits.get_limits()
-        
-        # Inicjalizuj obciążenie użytkowników i umiejętności
-        user_load = {}
-        user_skills = {}
-        
-        for user in users:
-            user_load[user.id] = {
-                "implementations_count": 0,
-                "offers_count": 0,
-                "total_projects": 0,
-                "dates": {}  # data -> liczba zadań
-            }
-            
-            # Określ umiejętności użytkownika na podstawie ról
-            user_roles = user.get_roles()
-            user_skills[user.id] = {
-                "can_implementation": False,
-                "can_offer": False,
-                "can_welding": False,
-                "can_painting": False,
-                "can_gluing": False
-            }
-            
-            for role in user_roles:
-                # Sprawdź uprawnienia roli
-                if role.permissions.get("task_implementation", False):
-                    user_skills[user.id]["can_implementation"] = True
-                if role.permissions.get("task_offer", False):
-                    user_skills[user.id]["can_offer"] = True
-                if role.permissions.get("task_welding", False):
-                    user_skills[user.id]["can_welding"] = True
-                if role.permissions.get("task_painting", False):
-                    user_skills[user.id]["can_painting"] = True
-                if role.permissions.get("task_gluing", False):
-                    user_skills[user.id]["can_gluing"] = True
-        
-        # Przygotuj dane o użytkownikach
-        user_dict = {user.id: user for user in users}
-        
-        # Pobierz aktualne obciążenie z istniejących wdrożeń i ofert
-        self._calculate_current_workload(implementations, offers, user_load)
-        
-        # Posortuj wdrożenia według daty rozpoczęcia
-        implementations.sort(key=lambda impl: impl.operations.get("Wdrożenie", {}).get("start_date") or "9999-99-99")
-        
-        # Posortuj oferty według daty rozpoczęcia
-        offers.sort(key=lambda offer: offer.operations.get("Wdrożenie", {}).get("start_date") or "9999-99-99")
-        
-        # Przetwarzamy wdrożenia - KLUCZOWY FIX: wykonaj kopię całego słownika operacji
-        for impl in implementations:
-            # Zrób kopię operacji, aby zachować ustawienia
-            operations_backup = {}
-            for op_name, op_data in impl.operations.items():
-                operations_backup[op_name] = op_data.copy() if op_data else {}
-            
-            # Najpierw przetwarzamy główną operację wdrożenia
-            main_op_data = operations_backup.get("Wdrożenie", {})
-            main_start = main_op_data.get("start_date")
-            main_end = main_op_data.get("end_date")
-            is_required = main_op_data.get("required", True)
-            min_days = main_op_data.get("min_days", 1)
-            
-            if not main_start or not main_end or not is_required:
-                # Pomijamy wdrożenia bez dat lub niewymagane
-                continue
-            
-            # Znajdź najlepszego użytkownika do głównej operacji wdrożenia
-            best_user_id = self._find_best_user(
-                "implementation", main_start, main_end, user_load, user_skills, workload_limits
-            )
-            
-            if best_user_id:
-                # Ustaw użytkownika w operacji, zachowując wszystkie pozostałe wartości
-                main_op_data["user_id"] = best_user_id
-                impl.operations["Wdrożenie"] = main_op_data
-                
-                # Aktualizuj obciążenie użytkownika
-                self._update_user_workload(user_load, best_user_id, "implementation", main_start, main_end)
-            
-            # Przetwarzamy pozostałe operacje
-            for operation_name in ["Spawanie", "Malowanie", "Klejenie"]:
-                op_data = operations_backup.get(operation_name, {})
-                is_required = op_data.get("required", True)
-                min_days = op_data.get("min_days", 1)
-                
-                if not is_required:
-                    # Przywróć operację z kopii zapasowej
-                    impl.operations[operation_name] = op_data
-                    continue
-                
-                # Określ typ umiejętności potrzebnej do operacji
-                skill_type = ""
-                if operation_name == "Spawanie":
-                    skill_type = "welding"
-                elif operation_name == "Malowanie":
-                    skill_type = "painting"
-                elif operation_name == "Klejenie":
-                    skill_type = "gluing"
-                
-                # Wyznacz daty dla operacji z uwzględnieniem min_days
-                op_start = main_start
-                
-                try:
-                    start_date_obj = datetime.datetime.strptime(op_start, "%Y-%m-%d").date()
-                    end_date_obj = start_date_obj + datetime.timedelta(days=min_days-1)
-                    op_end = end_date_obj.strftime("%Y-%m-%d")
-                    
-                    if op_end > main_end:
-                        op_end = main_end
-                except ValueError:
-                    op_start = main_start
-                    op_end = main_end
-                
-                # Znajdź najlepszego użytkownika
-                best_user_id = self._find_best_user(
-                    skill_type, op_start, op_end, user_load, user_skills, workload_limits
-                )
-                
-                if best_user_id:
-                    # Aktualizuj tylko user_id, start_date i end_date, zachowując inne wartości
-                    op_data["user_id"] = best_user_id
-                    op_data["start_date"] = op_start
-                    op_data["end_date"] = op_end
-                    
-                    # Przywróć operację z aktualizowanymi danymi
-                    impl.operations[operation_name] = op_data
-                    
-                    # Aktualizuj obciążenie
-                    self._update_user_workload(user_load, best_user_id, "specialist", op_start, op_end)
-        
-        # Podobne podejście dla ofert
-        for offer in offers:
-            # Zrób kopię operacji, aby zachować ustawienia
-            operations_backup = {}
-            for op_name, op_data in offer.operations.items():
-                operations_backup[op_name] = op_data.copy() if op_data else {}
-            
-            # Najpierw przetwarzamy główną operację oferty
-            main_op_data = operations_backup.get("Wdrożenie", {})
-            main_start = main_op_data.get("start_date")
-            main_end = main_op_data.get("end_date")
-            is_required = main_op_data.get("required", True)
-            min_days = main_op_data.get("min_days", 1)
-            
-            if not main_start or not main_end or not is_required:
-                # Pomijamy oferty bez dat lub niewymagane
-                continue
-            
-            # Znajdź najlepszego użytkownika do głównej operacji oferty
-            best_user_id = self._find_best_user(
-                "offer", main_start, main_end, user_load, user_skills, workload_limits
-            )
-            
-            if best_user_id:
-                # Ustaw użytkownika w operacji, zachowując wszystkie pozostałe wartości
-                main_op_data["user_id"] = best_user_id
-                offer.operations["Wdrożenie"] = main_op_data
-                
-                # Aktualizuj obciążenie użytkownika
-                self._update_user_workload(user_load, best_user_id, "offer", main_start, main_end)
-            
-            # Przetwarzamy pozostałe operacje
-            for operation_name in ["Spawanie", "Malowanie", "Klejenie"]:
-                op_data = operations_backup.get(operation_name, {})
-                is_required = op_data.get("required", True)
-                min_days = op_data.get("min_days", 1)
-                
-                if not is_required:
-                    # Przywróć operację z kopii zapasowej
-                    offer.operations[operation_name] = op_data
-                    continue
-                
-                # Określ typ umiejętności potrzebnej do operacji
-                skill_type = ""
-                if operation_name == "Spawanie":
-                    skill_type = "welding"
-                elif operation_name == "Malowanie":
-                    skill_type = "painting"
-                elif operation_name == "Klejenie":
-                    skill_type = "gluing"
-                
-                # Wyznacz daty dla operacji z uwzględnieniem min_days
-                op_start = main_start
-                
-                try:
-                    start_date_obj = datetime.datetime.strptime(op_start, "%Y-%m-%d").date()
-                    end_date_obj = start_date_obj + datetime.timedelta(days=min_days-1)
-                    op_end = end_date_obj.strftime("%Y-%m-%d")
-                    
-                    if op_end > main_end:
-                        op_end = main_end
-                except ValueError:
-                    op_start = main_start
-                    op_end = main_end
-                
-                # Znajdź najlepszego użytkownika
-                best_user_id = self._find_best_user(
-                    skill_type, op_start, op_end, user_load, user_skills, workload_limits
-                )
-                
-                if best_user_id:
-                    # Aktualizuj tylko user_id, start_date i end_date, zachowując inne wartości
-                    op_data["user_id"] = best_user_id
-                    op_data["start_date"] = op_start
-                    op_data["end_date"] = op_end
-                    
-                    # Przywróć operację z aktualizowanymi danymi
-                    offer.operations[operation_name] = op_data
-                    
-                    # Aktualizuj obciążenie
-                    self._update_user_workload(user_load, best_user_id, "specialist", op_start, op_end)
-        
-        # Zapisz wszystkie wdrożenia
-        for impl in implementations:
-            impl.save()
-        
-        # Zapisz wszystkie oferty
-        for offer in offers:
-            offer.save()
+        # Zaplanuj przypisania (scheduler nie zmienia projektów ani bazy)
+        plan = plan_assignments(
+            implementations, offers, user_skills_from_roles(users), WorkloadLimits.get_limits()
+        )
         
-        # Odśwież listę projektów
-        self._load_projects()
+        # Zapisz zmienione wdrożenia i oferty w jednej transakcji
+        # (ich wiersze odświeży _on_project_changed po zatwierdzeniu)
+        with DBManager().transaction():
+            for project in apply_plan(implementations, offers, plan):
+                project.save()
+        WorkloadCache().invalidate()
         
         # Wyświetl komunikat
         messagebox.showinfo(
@@ -1188,190 +997,11 @@ class ProjectsPanel(ttk.Frame):
             "Przydzielono tylko wymagane operacje z zachowaniem minimalnej liczby dni."
         )
         
-    def _calculate_current_workload(self, implementations, offers, user_load):
-        """Oblicza aktualne obciążenie użytkowników na podstawie istniejących przypisań"""
-        # Przetwarzaj wdrożenia
-        for impl in implementations:
-            for operation_name, op_data in impl.operations.items():
-                user_id = op_data.get("user_id")
-                start_date = op_data.get("start_date")
-                end_date = op_data.get("end_date")
-                
-                if user_id and start_date and end_date:
-                    if operation_name == "Wdrożenie":
-                        # Zwiększ licznik wdrożeń i projektów
-                        if user_id in user_load:
-                            user_load[user_id]["implementations_count"] += 1
-                            user_load[user_id]["total_projects"] += 1
-                    
-                    # Dodaj obciążenie dzienne
-                    self._add_daily_workload(user_load, user_id, start_date, end_date)
-        
-        # Przetwarzaj oferty
-        for offer in offers:
-            for operation_name, op_data in offer.operations.items():
-                user_id = op_data.get("user_id")
-                start_date = op_data.get("start_date")
-                end_date = op_data.get("end_date")
-                
-                if user_id and start_date and end_date:
-                    if operation_name == "Wdrożenie":
-                        # Zwiększ licznik ofert i projektów
-                        if user_id in user_load:
-                            user_load[user_id]["offers_count"] += 1
-                            user_load[user_id]["total_projects"] += 1
-                    
-                    # Dodaj obciążenie dzienne
-                    self._add_daily_workload(user_load, user_id, start_date, end_date)
-
-    def _add_daily_workload(self, user_load, user_id, start_date, end_date):
-        """Dodaje obciążenie dzienne dla użytkownika w podanym okresie"""
-        if user_id not in user_load:
-            return
-        
-        try:
-            # Przygotuj daty do iteracji
-            start_date_obj = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()
-            end_date_obj = datetime.datetime.strptime(end_date, "%Y-%m-%d").date()
-            
-            # Dodaj obciążenie dla każdego dnia
-            date_obj = start_date_obj
-            while date_obj <= end_date_obj:
-                date_str = date_obj.strftime("%Y-%m-%d")
-                
-                if date_str not in user_load[user_id]["dates"]:
-                    user_load[user_id]["dates"][date_str] = 0
-                
-                user_load[user_id]["dates"][date_str] += 1
-                date_obj += datetime.timedelta(days=1)
-        except ValueError:
-            # Ignoruj nieprawidłowe daty
-            pass
-
-    def _find_best_user(self, task_type, start_date, end_date, user_load, user_skills, workload_limits):
-        """
-        Znajduje najlepszego użytkownika do przypisania zadania
-        
-        Args:
-            task_type (str): Typ zadania lub umiejętności ("implementation", "offer", "welding", itp.)
-            start_date (str): Data rozpoczęcia w formacie YYYY-MM-DD
-            end_date (str): Data zakończenia w formacie YYYY-MM-DD
-            user_load (dict): Słownik z obciążeniem użytkowników
-            user_skills (dict): Słownik z umiejętnościami użytkowników
-            workload_limits (WorkloadLimits): Limity obciążenia
-            
-        Returns:
-            int: ID najlepszego użytkownika lub None jeśli nie znaleziono
-        """
-        best_user_id = None
-        best_load = float("inf")
-        
-        try:
-            # Przygotuj daty do iteracji
-            start_date_obj = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()
-            end_date_obj = datetime.datetime.strptime(end_date, "%Y-%m-%d").date()
-        except ValueError:
-            # Jeśli daty są nieprawidłowe, zwróć None
-            return None
-        
-        # Dla każdego użytkownika
-        for user_id, load_data in user_load.items():
-            # Sprawdź czy użytkownik ma odpowiednie umiejętności
-            if task_type == "implementation" and not user_skills[user_id]["can_implementation"]:
-                continue
-            elif task_type == "offer" and not user_skills[user_id]["can_offer"]:
-                continue
-            elif task_type == "welding" and not user_skills[user_id]["can_welding"]:
-                continue
-            elif task_type == "painting" and not user_skills[user_id]["can_painting"]:
-                continue
-            elif task_type == "gluing" and not user_skills[user_id]["can_gluing"]:
-                continue
-            
-            # Sprawdź limity projektów
-            if task_type == "implementation":
-                if load_data["implementations_count"] >= workload_limits.max_implementations:
-                    continue
-                if load_data["total_projects"] >= workload_limits.max_total_projects:
-                    continue
-            elif task_type == "offer":
-                if load_data["offers_count"] >= workload_limits.max_offers:
-                    continue
-                if load_data["total_projects"] >= workload_limits.max_total_projects:
-                    continue
-            
-            # Oblicz obciążenie użytkownika w okresie zadania
-            user_period_load = 0
-            date_obj = start_date_obj
-            
-            while date_obj <= end_date_obj:
-                date_str = date_obj.strftime("%Y-%m-%d")
-                daily_load = load_data["dates"].get(date_str, 0)
-                
-                # Jeśli użytkownik ma już więcej niż 2 zadania w danym dniu, unikaj przydzielania kolejnych
-                if daily_load >= 2:
-                    user_period_load += 100  # Duża kara za przekroczenie dziennego limitu
-                else:
-                    user_period_load += daily_load
-                
-                date_obj += datetime.timedelta(days=1)
-            
-            # Sprawdź czy lepszy niż dotychczasowy
-            if user_period_load < best_load:
-                best_load = user_period_load
-                best_user_id = user_id
-        
-        return best_user_id
-
-    def _update_user_workload(self, user_load, user_id, task_type, start_date, end_date):
-        """
-        Aktualizuje obciążenie użytkownika po przypisaniu zadania
-        
-        Args:
-            user_load (dict): Słownik z obciążeniem użytkowników
-            user_id (int): ID użytkownika
-            task_type (str): Typ zadania ("implementation", "offer", "specialist")
-            start_date (str): Data rozpoczęcia w formacie YYYY-MM-DD
-            end_date (str): Data zakończenia w formacie YYYY-MM-DD
-        """
-        if user_id not in user_load:
-            return
-        
-        # Aktualizuj liczniki projektów
-        if task_type == "implementation":
-            user_load[user_id]["implementations_count"] += 1
-            user_load[user_id]["total_projects"] += 1
-        elif task_type == "offer":
-            user_load[user_id]["offers_count"] += 1
-            user_load[user_id]["total_projects"] += 1
-        
-        # Dodaj obciążenie dzienne
-        self._add_daily_workload(user_load, user_id, start_date, end_date)
-
     def _export_to_excel(self):
         """Eksportuje projekty do pliku Excel"""
         # Pobierz filtrowane projekty
-        all_projects = []
-        
-        # Pobierz wdrożenia jeśli wybrane
-        if self.project_type_filter_var.get() in ["Wszystkie", "Wdrożenie"]:
-            implementations = Implementation.get_all()
-            
-            # Filtrowanie po statusie
-            if self.status_filter_var.get() != "Wszystkie":
-                implementations = [impl for impl in implementations if impl.status == self.status_filter_var.get()]
-            
-            all_projects.extend([(impl, "implementation") for impl in implementations])
-        
-        # Pobierz oferty jeśli wybrane
-        if self.project_type_filter_var.get() in ["Wszystkie", "Oferta"]:
-            offers = Offer.get_all()
-            
-            # Filtrowanie po statusie
-            if self.status_filter_var.get() != "Wszystkie":
-                offers = [offer for offer in offers if offer.status == self.status_filter_var.get()]
-            
-            all_projects.extend([(offer, "offer") for offer in offers])
+        status = self.status_filter_var.get()
+        all_projects = self._filtered_project_class().query(status=None if status == "Wszystkie" else status)
         
         if not all_projects:
             messagebox.showinfo("Informacja", "Brak projektów do eksportu.")
@@ -1388,8 +1018,8 @@ class ProjectsPanel(ttk.Frame):
             return
         
         # Podziel projekty na wdrożenia i oferty
-        implementations = [p[0] for p in all_projects if p[1] == "implementation"]
-        offers = [p[0] for p in all_projects if p[1] == "offer"]
+        implementations = [p for p in all_projects if p.PROJECT_TYPE == "implementation"]
+        offers = [p for p in all_projects if p.PROJECT_TYPE == "offer"]
         
         # Zapisz dwie zakładki: wdrożenia i oferty
         try:
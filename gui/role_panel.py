@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from database.models import Role, User
+from database.models import Role, User, ModelEvents
+from utils.auth import AuthManager
+from gui.model_updates import subscribe_widget, sorted_position, upsert_row, remove_row
 
 class RolePanel(ttk.Frame):
     """Panel zarządzania rolami"""
@@ -30,6 +32,8 @@ class RolePanel(ttk.Frame):
         
         # Zmienne
         self.selected_role_id = None
+        self.role_sort_keys = {}  # ID wiersza -> nazwa roli
+        self.user_sort_keys = {}  # ID wiersza -> (nazwisko, imię)
         
         # Stwórz widgety
         self._create_widgets()
@@ -37,6 +41,10 @@ class RolePanel(ttk.Frame):
         # Załaduj dane
         self._load_roles()
         self._load_users()  # Dodanie ładowania użytkowników przy inicjalizacji
+        
+        # Zapisane i usunięte role oraz użytkownicy aktualizują tylko swój wiersz tabeli
+        subscribe_widget(self, Role, self._on_role_changed)
+        subscribe_widget(self, User, self._on_user_changed)
     
     def _create_widgets(self):
         """Tworzy widgety panelu zarządzania rolami"""
@@ -172,8 +180,8 @@ class RolePanel(ttk.Frame):
     def _load_roles(self):
         """Ładuje role do tabeli"""
         # Wyczyść istniejące role
-        for item in self.roles_tree.get_children():
-            self.roles_tree.delete(item)
+        self.roles_tree.delete(*self.roles_tree.get_children())
+        self.role_sort_keys = {}
         
         # Pobierz role
         roles = Role.get_all_roles()
@@ -186,15 +194,32 @@ class RolePanel(ttk.Frame):
                 role.description
             ]
             
-            self.roles_tree.insert("", "end", values=values)
+            self.role_sort_keys[str(role.id)] = role.name
+            self.roles_tree.insert("", "end", iid=str(role.id), values=values)
+    
+    def _on_role_changed(self, action, role):
+        """Aktualizuje wiersz roli i checkboxy ról po zapisie lub usunięciu roli (ModelEvents)"""
+        item_id = str(role.id)
+        if action == ModelEvents.DELETE:
+            remove_row(self.roles_tree, item_id)
+            self.role_sort_keys.pop(item_id, None)
+        else:
+            # Kolejność jak w Role.get_all_roles()
+            position = sorted_position(self.roles_tree, self.role_sort_keys, item_id, role.name)
+            self.role_sort_keys[item_id] = role.name
+            upsert_row(self.roles_tree, item_id, [role.id, role.name, role.description], position)
+        
+        # Lista ról wybranego użytkownika pokazuje wszystkie role
+        if self.selected_user_id:
+            self._update_role_checkboxes()
     
     # Dodaj to do klasy RolePanel w gui/role_panel.py
 
     def _load_users(self):
         """Ładuje użytkowników do tabeli"""
         # Wyczyść istniejących użytkowników
-        for item in self.users_tree.get_children():
-            self.users_tree.delete(item)
+        self.users_tree.delete(*self.users_tree.get_children())
+        self.user_sort_keys = {}
         
         # Pobierz użytkowników
         users = User.get_all_users()
@@ -207,12 +232,30 @@ class RolePanel(ttk.Frame):
                 f"{user.first_name} {user.last_name}"
             ]
             
-            self.users_tree.insert("", "end", values=values)
+            self.user_sort_keys[str(user.id)] = (user.last_name, user.first_name, user.id)
+            self.users_tree.insert("", "end", iid=str(user.id), values=values)
         
         # Również odśwież checkboxy ról, jeśli jest wybrany użytkownik
         if self.selected_user_id:
             self._update_role_checkboxes()
     
+    def _on_user_changed(self, action, user):
+        """Aktualizuje wiersz użytkownika po jego zapisie lub usunięciu (ModelEvents)"""
+        item_id = str(user.id)
+        if action == ModelEvents.DELETE:
+            remove_row(self.users_tree, item_id)
+            self.user_sort_keys.pop(item_id, None)
+            if self.selected_user_id == user.id:
+                self.selected_user_id = None
+                self._update_role_checkboxes()
+            return
+        
+        # Kolejność jak w User.get_all_users()
+        key = (user.last_name, user.first_name, user.id)
+        position = sorted_position(self.users_tree, self.user_sort_keys, item_id, key)
+        self.user_sort_keys[item_id] = key
+        upsert_row(self.users_tree, item_id, [user.id, user.username, f"{user.first_name} {user.last_name}"], position)
+    
     def _update_role_checkboxes(self):
         """Aktualizuje checkboxy ról dla wybranego użytkownika"""
         # Wyczyść istniejące checkboxy
@@ -351,15 +394,12 @@ class RolePanel(ttk.Frame):
             permissions=permissions
         )
         
-        # Zapisz rolę
+        # Zapisz rolę (wiersz roli odświeży _on_role_changed)
         role.save()
         
         # Zamknij okno dialogowe
         dialog.destroy()
         
-        # Odśwież listę ról
-        self._load_roles()
-        
         # Wyświetl komunikat
         messagebox.showinfo(
             "Sukces", 
@@ -464,19 +504,13 @@ class RolePanel(ttk.Frame):
         role.description = description
         role.permissions = permissions
         
-        # Zapisz rolę
+        # Zapisz rolę i odśwież uprawnienia sesji (rola może należeć do zalogowanego użytkownika)
         role.save()
+        AuthManager().refresh_permissions()
         
-        # Zamknij okno dialogowe
+        # Zamknij okno dialogowe (wiersz roli i checkboxy odświeży _on_role_changed)
         dialog.destroy()
         
-        # Odśwież listę ról
-        self._load_roles()
-        
-        # Zaktualizuj checkboxy ról jeśli potrzeba
-        if self.selected_user_id:
-            self._update_role_checkboxes()
-        
         # Wyświetl komunikat
         messagebox.showinfo(
             "Sukces", 
@@ -506,14 +540,9 @@ class RolePanel(ttk.Frame):
         
         # Usuń rolę
         if role.delete():
-            # Odśwież listę ról
-            self._load_roles()
-            
-            # Zaktualizuj checkboxy ról jeśli potrzeba
-            if self.selected_user_id:
-                self._update_role_checkboxes()
+            AuthManager().refresh_permissions()
             
-            # Wyczyść wybór
+            # Wyczyść wybór (wiersz roli i checkboxy odświeży _on_role_changed)
             self.selected_role_id = None
             
             # Wyświetl komunikat
@@ -547,6 +576,7 @@ class RolePanel(ttk.Frame):
         
         # Zapisz przypisanie ról
         user.set_roles(selected_role_ids)
+        AuthManager().refresh_permissions()
         
         # Wyświetl komunikat
         messagebox.showinfo(
@@ -1,14 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import datetime
-from database.db_manager import DBManager
-from database.models import Task, User, Implementation, Offer
+from database.models import Task, User, UserDirectory, Implementation, Offer, ModelEvents
 from utils.timer import TaskTimer
 from utils.export import export_tasks_to_excel
+from gui.model_updates import subscribe_widget, sorted_position, upsert_row, remove_row
 
 class TaskPanel(ttk.Frame):
     """Panel zadań użytkownika"""
     
+    # Liczba zadań wczytywanych jednym zapytaniem (widoczne wiersze i zapas na przewijanie)
+    PAGE_SIZE = 200
+    # Część wczytanej listy, po której przewinięciu doładowywana jest kolejna strona
+    PREFETCH_THRESHOLD = 0.8
+    # Liczba stron utrzymywanych w tabeli - wiersze dalej od widocznego fragmentu są usuwane
+    WINDOW_PAGES = 3
+    
     def __init__(self, parent, current_user, is_admin=False):
         """
         Inicjalizuje panel zadań
@@ -38,11 +45,22 @@ class TaskPanel(ttk.Frame):
         self.offer_var = tk.StringVar()
         self.time_label_var = tk.StringVar(value="00:00:00")
         self.user_filter_var = tk.StringVar()
+        self.tasks_summary_var = tk.StringVar()
         
         # Stan UI
         self.active_task = False
         self.selected_task_id = None
         
+        # Stronicowanie historii zadań
+        self.tasks_user_id = None  # None - zadania wszystkich użytkowników
+        self.tasks_cursor = None  # (start_time, id) ostatniego wczytanego zadania
+        self.tasks_newer_cursor = None  # (start_time, id) pierwszego wczytanego zadania
+        self.tasks_keys = {}  # ID wiersza -> (start_time, id) wyświetlonego zadania
+        self.tasks_has_more = False
+        self.tasks_has_newer = False  # Czy nowsze zadania zostały usunięte z tabeli
+        self.tasks_loading = False
+        self.tasks_total = (0, 0)  # (liczba zadań, łączny czas w sekundach)
+        
         # Słowniki do przechowywania danych
         self.implementations = {}
         self.offers = {}
@@ -54,6 +72,9 @@ class TaskPanel(ttk.Frame):
         # Załaduj dane
         self._load_data()
         
+        # Zapisane i usunięte zadania aktualizują tylko swój wiersz tabeli
+        subscribe_widget(self, Task, self._on_task_changed)
+        
         # Zdarzenia
         self.task_type_var.trace_add("write", self._on_task_type_change)
     
@@ -217,6 +238,9 @@ class TaskPanel(ttk.Frame):
                 command=self._export_to_excel
             ).pack(side=tk.RIGHT, padx=5)
 
+        # Liczba zadań i łączny czas (z całej historii, nie tylko wczytanych stron)
+        ttk.Label(tasks_frame, textvariable=self.tasks_summary_var).pack(side=tk.BOTTOM, anchor=tk.W, pady=(5, 0))
+        
         # Tabela zadań - teraz na całą szerokość
         table_frame = ttk.Frame(tasks_frame)
         table_frame.pack(fill=tk.BOTH, expand=True)
@@ -257,12 +281,12 @@ class TaskPanel(ttk.Frame):
             self.tasks_tree.column("user", width=150, minwidth=150)
 
         # Paski przewijania - tylko pionowy
-        y_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tasks_tree.yview)
-        self.tasks_tree.configure(yscrollcommand=y_scrollbar.set)
+        self.tasks_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tasks_tree.yview)
+        self.tasks_tree.configure(yscrollcommand=self._on_tasks_scroll)
 
         # Pakowanie komponentów z paskami przewijania
         self.tasks_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tasks_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         # Podwójne kliknięcie do edycji
         self.tasks_tree.bind("<Double-1>", self._on_task_double_click)
@@ -303,57 +327,184 @@ class TaskPanel(ttk.Frame):
         self._load_tasks()
    
     def _load_tasks(self):
-        """Ładuje zadania do tabeli"""
-        # Wyczyść istniejące zadania
-        for item in self.tasks_tree.get_children():
-            self.tasks_tree.delete(item)
+        """
+        Ładuje pierwszą stronę zadań do tabeli
         
-        # Pobierz zadania
+        Kolejne strony są doładowywane podczas przewijania (_on_tasks_scroll)
+        w obu kierunkach, a tabela trzyma najwyżej WINDOW_PAGES stron. Liczba
+        zadań i łączny czas są liczone w bazie.
+        """
+        # Wyczyść istniejące zadania
+        self.tasks_tree.delete(*self.tasks_tree.get_children())
+        self.tasks_cursor = None
+        self.tasks_newer_cursor = None
+        self.tasks_keys = {}
+        self.tasks_durations = {}  # ID wiersza -> czas trwania (do aktualizacji podsumowania)
+        self.tasks_has_more = True
+        self.tasks_has_newer = False
+        
+        # Wybierz zakres zadań
         if self.is_admin and self.user_filter_var.get() != "Wszyscy użytkownicy":
             # Filtrowane zadania dla admina
-            selected_user = None
-            for user_label, user in self.users.items():
-                if user_label == self.user_filter_var.get():
-                    selected_user = user
-                    break
-            
-            if selected_user:
-                tasks = Task.get_by_user_id(selected_user.id)
-            else:
-                tasks = []
+            selected_user = self.users.get(self.user_filter_var.get())
+            self.tasks_user_id = selected_user.id if selected_user else None
+            self.tasks_has_more = selected_user is not None
         elif self.is_admin:
             # Wszystkie zadania dla admina
-            tasks = Task.get_all_tasks()
+            self.tasks_user_id = None
         else:
             # Zadania bieżącego użytkownika
-            tasks = Task.get_by_user_id(self.current_user.id)
+            self.tasks_user_id = self.current_user.id
         
-        # Dodaj zadania do tabeli
-        for task in tasks:
-            # Konwertuj czas trwania z sekund na format hh:mm:ss
-            duration_formatted = self._format_duration(task.duration)
+        self.tasks_total = Task.get_totals(self.tasks_user_id) if self.tasks_has_more else (0, 0)
+        self._load_more_tasks()
             
-            values = [
-                task.id,
-                task.start_time,
-                task.end_time or "",
-                duration_formatted,
-                task.category,
-                task.task_type,
-                task.description or ""
-            ]
+    def _load_more_tasks(self):
+        """Doładowuje na końcu tabeli stronę starszych zadań i usuwa nadmiar z początku"""
+        self.tasks_loading = False
+        if self.tasks_has_more:
+            tasks = Task.get_page(self.tasks_user_id, self.tasks_cursor, self.PAGE_SIZE)
+            self.tasks_has_more = len(tasks) == self.PAGE_SIZE
+            if tasks:
+                self.tasks_cursor = (tasks[-1].start_time, tasks[-1].id)
             
-            if self.is_admin:
-                # Dodaj kolumnę z użytkownikiem
-                if hasattr(task, 'user_full_name'):
-                    user_name = task.user_full_name
-                else:
-                    user = User.get_by_id(task.user_id)
-                    user_name = f"{user.first_name} {user.last_name}" if user else "Nieznany"
+            for task in tasks:
+                self._insert_task_row(task, "end")
+            
+            # Usuń najnowsze wiersze spoza okna, zachowując widoczny fragment
+            children = self.tasks_tree.get_children()
+            excess = len(children) - self.WINDOW_PAGES * self.PAGE_SIZE
+            if excess > 0:
+                self._remove_task_rows(children[:excess])
+                self.tasks_newer_cursor = self.tasks_keys[children[excess]]
+                self.tasks_has_newer = True
+                self.tasks_tree.yview_scroll(-excess, "units")
                 
-                values.insert(1, user_name)
+        self._update_tasks_summary()
+    
+    def _load_newer_tasks(self):
+        """Doładowuje na początku tabeli stronę nowszych zadań i usuwa nadmiar z końca"""
+        self.tasks_loading = False
+        if self.tasks_has_newer:
+            tasks = Task.get_page(self.tasks_user_id, limit=self.PAGE_SIZE, before=self.tasks_newer_cursor)
+            self.tasks_has_newer = len(tasks) == self.PAGE_SIZE
+            if tasks:
+                self.tasks_newer_cursor = (tasks[0].start_time, tasks[0].id)
+            
+            for index, task in enumerate(tasks):
+                self._insert_task_row(task, index)
+            # Wiersze wstawione nad widocznym fragmentem nie powinny go przesuwać
+            self.tasks_tree.yview_scroll(len(tasks), "units")
             
-            self.tasks_tree.insert("", "end", values=values)
+            # Usuń najstarsze wiersze spoza okna
+            children = self.tasks_tree.get_children()
+            limit = self.WINDOW_PAGES * self.PAGE_SIZE
+            if len(children) > limit:
+                self._remove_task_rows(children[limit:])
+                self.tasks_cursor = self.tasks_keys[children[limit - 1]]
+                self.tasks_has_more = True
+        
+        self._update_tasks_summary()
+    
+    def _insert_task_row(self, task, index):
+        """Wstawia wiersz wczytanego zadania na podanej pozycji tabeli"""
+        self.tasks_keys[str(task.id)] = (task.start_time, task.id)
+        self.tasks_durations[str(task.id)] = task.duration or 0
+        self.tasks_tree.insert("", index, iid=str(task.id), values=self._task_values(task))
+    
+    def _remove_task_rows(self, item_ids):
+        """Usuwa z tabeli wiersze zadań spoza okna wczytanych stron"""
+        self.tasks_tree.delete(*item_ids)
+        for item_id in item_ids:
+            self.tasks_keys.pop(item_id, None)
+            self.tasks_durations.pop(item_id, None)
+    
+    def _update_tasks_summary(self):
+        """Aktualizuje liczbę wyświetlonych zadań i łączny czas pod tabelą"""
+        count, total_duration = self.tasks_total
+        self.tasks_summary_var.set(
+            f"Wyświetlono {len(self.tasks_tree.get_children())} z {count} zadań, "
+            f"łączny czas: {self._format_duration(total_duration)}"
+        )
+            
+    def _on_tasks_scroll(self, first, last):
+        """Aktualizuje pasek przewijania i doładowuje zadania przy krańcach wczytanej listy"""
+        self.tasks_scrollbar.set(first, last)
+        
+        if self.tasks_loading:
+            return
+        
+        # Wstawianie wierszy wywołuje ponownie yscrollcommand - doładuj po bieżącym zdarzeniu
+        if self.tasks_has_more and float(last) >= self.PREFETCH_THRESHOLD:
+            self.tasks_loading = True
+            self.after_idle(self._load_more_tasks)
+        elif self.tasks_has_newer and float(first) <= 1 - self.PREFETCH_THRESHOLD:
+            self.tasks_loading = True
+            self.after_idle(self._load_newer_tasks)
+    
+    def _task_in_scope(self, task):
+        """Sprawdza, czy zadanie należy do zakresu wybranego filtrem"""
+        if self.is_admin and self.user_filter_var.get() != "Wszyscy użytkownicy":
+            selected_user = self.users.get(self.user_filter_var.get())
+            return selected_user is not None and task.user_id == selected_user.id
+        return self.tasks_user_id is None or task.user_id == self.tasks_user_id
+    
+    def _on_task_changed(self, action, task):
+        """Aktualizuje wiersz zadania i podsumowanie po zapisie lub usunięciu zadania (ModelEvents)"""
+        item_id = str(task.id)
+        in_scope = self._task_in_scope(task)
+        if not in_scope and not self.tasks_tree.exists(item_id):
+            return
+        
+        key = (task.start_time, task.id)
+        previous_duration = self.tasks_durations.pop(item_id, None)
+        removed = action == ModelEvents.DELETE or not in_scope
+        if removed:
+            remove_row(self.tasks_tree, item_id)
+            self.tasks_keys.pop(item_id, None)
+        elif self.tasks_tree.exists(item_id) or (
+            (not self.tasks_has_more or key > self.tasks_cursor)
+            and (not self.tasks_has_newer or key < self.tasks_newer_cursor)
+        ):
+            # Zadania spoza wczytanych stron pojawią się przy przewijaniu
+            position = sorted_position(self.tasks_tree, self.tasks_keys, item_id, key, reverse=True)
+            self.tasks_keys[item_id] = key
+            self.tasks_durations[item_id] = task.duration or 0
+            upsert_row(self.tasks_tree, item_id, self._task_values(task), position)
+        
+        # Liczba zadań i łączny czas zmieniają się o samo zdarzenie
+        count, total_duration = self.tasks_total
+        if action == ModelEvents.INSERT:
+            self.tasks_total = (count + 1, total_duration + (task.duration or 0))
+        elif previous_duration is None:
+            # Zadanie spoza wczytanych stron - jego poprzedni czas nie jest znany
+            self.tasks_total = Task.get_totals(self.tasks_user_id)
+        elif removed:
+            self.tasks_total = (count - 1, total_duration - previous_duration)
+        else:
+            self.tasks_total = (count, total_duration - previous_duration + (task.duration or 0))
+        self._update_tasks_summary()
+    
+    def _task_values(self, task):
+        """Zwraca wartości wiersza tabeli dla zadania"""
+        # Konwertuj czas trwania z sekund na format hh:mm:ss
+        duration_formatted = self._format_duration(task.duration)
+        
+        values = [
+            task.id,
+            task.start_time,
+            task.end_time or "",
+            duration_formatted,
+            task.category,
+            task.task_type,
+            task.description or ""
+        ]
+        
+        if self.is_admin:
+            # Dodaj kolumnę z użytkownikiem
+            values.insert(1, UserDirectory().get_full_name(task.user_id, "Nieznany"))
+        
+        return values
     
     def _format_duration(self, seconds):
         """Formatuje czas trwania w sekundach na format hh:mm:ss"""
@@ -459,12 +610,9 @@ class TaskPanel(ttk.Frame):
             offer_id=offer_id
         )
         
-        # Zapisz zadanie
+        # Zapisz zadanie (tabelę zaktualizuje _on_task_changed)
         task.save()
         
-        # Załaduj ponownie zadania
-        self._load_tasks()
-        
         # Zresetuj timer i UI, ale pozostaw aktywne zadanie
         self.time_label_var.set("00:00:00")
         self.timer.start()  # Rozpocznij ponownie timer
@@ -495,36 +643,18 @@ class TaskPanel(ttk.Frame):
         try:
             # Pobierz dzisiejsze zadania
             today = datetime.datetime.now().strftime("%Y-%m-%d")
+            tomorrow = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
             
-            conn = DBManager().get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-            SELECT task_type, SUM(duration) as total_duration
-            FROM tasks
-            WHERE user_id = ? AND date(start_time) = ?
-            GROUP BY task_type
-            ''', (self.current_user.id, today))
-            
-            task_summary = cursor.fetchall()
+            task_summary = Task.get_type_totals(self.current_user.id, today, tomorrow)
             
             # Całkowity czas
-            cursor.execute('''
-            SELECT SUM(duration) as total_duration
-            FROM tasks
-            WHERE user_id = ? AND date(start_time) = ?
-            ''', (self.current_user.id, today))
-            
-            total_result = cursor.fetchone()
-            total_seconds = total_result['total_duration'] if total_result and total_result['total_duration'] else 0
+            total_seconds = sum(seconds for _, seconds in task_summary)
             
             # Formatuj podsumowanie
             summary_text = f"Podsumowanie dnia pracy ({today}):\n\n"
             
             if task_summary:
-                for row in task_summary:
-                    task_type = row['task_type']
-                    seconds = row['total_duration'] if row['total_duration'] else 0
+                for task_type, seconds in task_summary:
                     hours, minutes, seconds = self._seconds_to_hms(seconds)
                     summary_text += f"{task_type}: {hours:02}:{minutes:02}:{seconds:02}\n"
             else:
@@ -684,11 +814,8 @@ class TaskPanel(ttk.Frame):
         # Zapisz zaktualizowane zadanie
         task.save()
         
-        # Zamknij okno dialogowe
+        # Zamknij okno dialogowe (wiersz zadania odświeży _on_task_changed)
         dialog.destroy()
-        
-        # Odśwież listę zadań
-        self._load_tasks()
     
     def _export_to_excel(self):
         """Eksportuje zadania do pliku Excel"""
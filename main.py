@@ -7,7 +7,7 @@ import sys
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-from database.models import User
+from database.migrations import migrate
 from gui.login import LoginWindow
 from gui.main_window import MainWindow
 
@@ -76,15 +76,8 @@ def close_application():
         sys.exit(0)
 
 if __name__ == "__main__":
-    # Inicjalizuj tabele w bazie danych i dokonaj migracji jeśli potrzeba
-    User.create_tables()
-    Task = getattr(__import__('database.models', fromlist=['Task']), 'Task')
-    Implementation = getattr(__import__('database.models', fromlist=['Implementation']), 'Implementation')
-    Offer = getattr(__import__('database.models', fromlist=['Offer']), 'Offer')
-    
-    Task.create_tables()
-    Implementation.create_tables()
-    Offer.create_tables()
+    # Zaktualizuj schemat bazy danych (jeśli jest aktualny, nic nie robi)
+    migrate()
     
     # Uruchom aplikację
     start_application()
\ No newline at end of file
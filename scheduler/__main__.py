@@ -0,0 +1,64 @@
+import sys
+import argparse
+from database.db_manager import DBManager
+from database.migrations import migrate
+from database.models import Implementation, Offer, User, UserDirectory, WorkloadLimits
+from scheduler.planner import plan_assignments, diff_plan, apply_plan, user_skills_from_roles, PROJECT_TYPES
+from scheduler.strategies import STRATEGIES
+
+# Zakres z wiersza poleceń -> typy projektów
+SCOPES = {
+    "all": PROJECT_TYPES,
+    "implementations": ("implementation",),
+    "offers": ("offer",),
+}
+
+
+def main(argv=None):
+    """Automatyczne przydzielanie użytkowników do projektów z wiersza poleceń"""
+    parser = argparse.ArgumentParser(description="Automatyczne przydzielanie użytkowników do projektów")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="greedy")
+    parser.add_argument("--scope", choices=sorted(SCOPES), default="all",
+                        help="Projekty, którym przydzielani są użytkownicy")
+    parser.add_argument("--dry-run", action="store_true", help="Pokaż zmiany bez zapisywania")
+    args = parser.parse_args(argv)
+    
+    migrate()
+    
+    users = User.get_all_users()
+    implementations = [impl for impl in Implementation.get_all() if impl.status == "W trakcie"]
+    offers = [offer for offer in Offer.get_all() if offer.status == "W trakcie"]
+    
+    plan = plan_assignments(
+        implementations, offers, user_skills_from_roles(users), WorkloadLimits.get_limits(),
+        strategy=args.strategy, scope=SCOPES[args.scope]
+    )
+    changes = diff_plan(implementations, offers, plan)
+    
+    names = {("implementation", impl.id): impl.name for impl in implementations}
+    names.update({("offer", offer.id): offer.name for offer in offers})
+    directory = UserDirectory()
+    
+    for previous, assignment in changes:
+        print(f"{names[(assignment.project_type, assignment.project_id)]} / {assignment.operation_name}: "
+              f"{directory.get_full_name(previous.user_id)} -> {directory.get_full_name(assignment.user_id)} "
+              f"({assignment.start_date} - {assignment.end_date})")
+    for task in plan.unassigned:
+        print(f"{names[(task.project_type, task.project_id)]} / {task.operation_name}: brak dostępnego użytkownika")
+    
+    print(f"Strategia {plan.strategy}: {len(plan.assignments)} przypisań, {len(changes)} zmian, "
+          f"{len(plan.unassigned)} bez wykonawcy, {plan.elapsed * 1000:.0f} ms")
+    
+    if args.dry_run:
+        return 0
+    
+    with DBManager().transaction():
+        for project in apply_plan(implementations, offers, plan):
+            project.save()
+    
+    print("Zapisano zmiany")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import sys
+import random
+import argparse
+import datetime
+from database.models import Implementation, Offer, WorkloadLimits
+from scheduler.planner import plan_assignments, SPECIALIST_OPERATIONS, MAIN_OPERATION
+from scheduler.strategies import STRATEGIES
+
+
+# Zestawy danych porównania: nazwa -> parametry synthetic_dataset()
+DATASETS = {
+    "200 użytkowników": {"users": 200, "projects": 2000, "span": 90},
+    # Mały zespół i krótkie projekty - tu optimum w oknach bywa gorsze od planu zachłannego
+    "50 użytkowników": {"users": 50, "projects": 200, "span": 30},
+}
+
+
+def synthetic_dataset(users=200, projects=2000, span=90, seed=1):
+    """
+    Tworzy losowe dane do porównania strategii (bez bazy danych)
+    
+    Args:
+        users (int): Liczba użytkowników
+        projects (int): Liczba projektów (po połowie wdrożeń i ofert)
+        span (int): Maksymalna długość projektu w dniach
+        seed (int): Ziarno generatora liczb losowych
+    
+    Returns:
+        tuple: (wdrożenia, oferty, umiejętności użytkowników)
+    """
+    rng = random.Random(seed)
+    
+    user_skills = {}
+    for user_id in range(1, users + 1):
+        user_skills[user_id] = {
+            skill: rng.random() < 0.4
+            for skill in ("can_implementation", "can_offer", "can_welding", "can_painting", "can_gluing")
+        }
+    
+    first_day = datetime.date(2026, 1, 1)
+    implementations = []
+    offers = []
+    for project_id in range(1, projects + 1):
+        cls, target = (Implementation, implementations) if project_id % 2 else (Offer, offers)
+        project = cls(f"Projekt {project_id}", "", id=project_id)
+        
+        start = first_day + datetime.timedelta(days=rng.randint(0, 365))
+        end = start + datetime.timedelta(days=rng.randint(span // 3, span) - 1)
+        project.operations[MAIN_OPERATION] = {
+            "user_id": None, "start_date": start.isoformat(), "end_date": end.isoformat(),
+            "required": True, "min_days": 1
+        }
+        for operation_name in SPECIALIST_OPERATIONS:
+            project.operations[operation_name] = {
+                "user_id": None, "start_date": None, "end_date": None,
+                "required": rng.random() < 0.8, "min_days": rng.randint(1, span // 3)
+            }
+        target.append(project)
+    
+    return implementations, offers, user_skills
+
+
+def run(strategies, users, projects, span, limits, seed=1):
+    """
+    Porównuje strategie na tych samych danych
+    
+    Returns:
+        list: Lista krotek (strategia, czas [s], przypisania, bez wykonawcy, koszt, przeciążone dni)
+    """
+    implementations, offers, user_skills = synthetic_dataset(users, projects, span, seed)
+    
+    results = []
+    for strategy in strategies:
+        plan = plan_assignments(implementations, offers, user_skills, limits, strategy=strategy)
+        name = plan.strategy if plan.fallback is None else f"{plan.strategy}/{plan.fallback}"
+        results.append((
+            name, plan.elapsed, len(plan.assignments), len(plan.unassigned),
+            plan.workload.total_cost(), plan.workload.overloaded_days()
+        ))
+    return results
+
+
+def main(argv=None):
+    """Porównanie strategii przydzielania na danych syntetycznych"""
+    parser = argparse.ArgumentParser(description="Porównanie strategii przydzielania")
+    parser.add_argument("--users", type=int, help="Własny zestaw danych zamiast DATASETS")
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument("--span", type=int, default=90)
+    parser.add_argument("--max-implementations", type=int, default=4)
+    parser.add_argument("--max-offers", type=int, default=6)
+    parser.add_argument("--max-total", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("strategies", nargs="*", default=sorted(STRATEGIES))
+    args = parser.parse_args(argv)
+    
+    limits = WorkloadLimits(args.max_implementations, args.max_offers, args.max_total)
+    
+    if args.users is None:
+        datasets = DATASETS
+    else:
+        datasets = {"własny": {"users": args.users, "projects": args.projects, "span": args.span}}
+    
+    for title, dataset in datasets.items():
+        print(f"{title}: {dataset['projects']} projektów, do {dataset['span']} dni")
+        print(f"{'strategia':<16}{'czas [s]':>10}{'przypisane':>12}{'bez wyk.':>10}{'koszt':>12}{'przeciąż.':>11}")
+        for name, elapsed, assigned, unassigned, cost, overloaded in run(
+            args.strategies, dataset["users"], dataset["projects"], dataset["span"], limits, args.seed
+        ):
+            print(f"{name:<16}{elapsed:>10.2f}{assigned:>12}{unassigned:>10}{cost:>12}{overloaded:>11}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import heapq
+
+
+class MinCostFlow:
+    """
+    Przepływ o minimalnym koszcie (najkrótsze ścieżki powiększające z potencjałami)
+    
+    Koszty krawędzi muszą być nieujemne. Implementacja w czystym Pythonie,
+    przeznaczona dla grafów rzędu kilku tysięcy krawędzi.
+    """
+    
+    def __init__(self, node_count=0):
+        """
+        Args:
+            node_count (int): Początkowa liczba wierzchołków (kolejne dodaje add_node())
+        """
+        # Krawędź: [wierzchołek docelowy, przepustowość, koszt, indeks krawędzi odwrotnej]
+        self.graph = [[] for _ in range(node_count)]
+    
+    @property
+    def node_count(self):
+        return len(self.graph)
+    
+    def add_node(self):
+        """Dodaje wierzchołek i zwraca jego numer"""
+        self.graph.append([])
+        return len(self.graph) - 1
+    
+    def add_edge(self, source, target, capacity, cost):
+        """
+        Dodaje krawędź skierowaną
+        
+        Returns:
+            tuple: (wierzchołek, indeks krawędzi) - do odczytu przepływu przez flow_on()
+        """
+        self.graph[source].append([target, capacity, cost, len(self.graph[target])])
+        self.graph[target].append([source, 0, -cost, len(self.graph[source]) - 1])
+        return source, len(self.graph[source]) - 1
+    
+    def flow_on(self, edge):
+        """Zwraca przepływ na krawędzi zwróconej przez add_edge()"""
+        source, index = edge
+        target, _, _, reverse = self.graph[source][index]
+        return self.graph[target][reverse][1]
+    
+    def solve(self, source, sink, max_flow):
+        """
+        Wysyła do max_flow jednostek przepływu najtańszymi ścieżkami
+        
+        Args:
+            source (int): Źródło
+            sink (int): Ujście
+            max_flow (int): Maksymalny przepływ
+        
+        Returns:
+            tuple: (przepływ, koszt)
+        """
+        graph = self.graph
+        potential = [0] * self.node_count
+        flow = 0
+        cost = 0
+        
+        while flow < max_flow:
+            # Dijkstra na kosztach zredukowanych
+            dist = [None] * self.node_count
+            previous = [None] * self.node_count  # wierzchołek -> (poprzednik, indeks krawędzi)
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, node = heapq.heappop(heap)
+                if d > dist[node]:
+                    continue
+                if node == sink:
+                    break
+                node_potential = potential[node]
+                for index, (target, capacity, edge_cost, _) in enumerate(graph[node]):
+                    if capacity <= 0:
+                        continue
+                    new_dist = d + edge_cost + node_potential - potential[target]
+                    if dist[target] is None or new_dist < dist[target]:
+                        dist[target] = new_dist
+                        previous[target] = (node, index)
+                        heapq.heappush(heap, (new_dist, target))
+            
+            if dist[sink] is None:
+                break
+            
+            # Aktualizacja potencjałów (wierzchołki nieosiągnięte lub dalsze niż ujście zostają
+            # z odległością ujścia, co zachowuje nieujemność kosztów zredukowanych)
+            sink_dist = dist[sink]
+            for node in range(self.node_count):
+                potential[node] += min(dist[node], sink_dist) if dist[node] is not None else sink_dist
+            
+            # Przepustowość ścieżki
+            push = max_flow - flow
+            node = sink
+            while node != source:
+                parent, index = previous[node]
+                push = min(push, graph[parent][index][1])
+                node = parent
+            
+            node = sink
+            while node != source:
+                parent, index = previous[node]
+                edge = graph[parent][index]
+                edge[1] -= push
+                graph[node][edge[3]][1] += push
+                cost += push * edge[2]
+                node = parent
+            
+            flow += push
+        
+        return flow, cost
@@ -0,0 +1,196 @@
+from database.db_manager import DBManager
+from database.models import Project, User, WorkloadLimits, PermissionMatrix, ModelEvents
+from utils.workload import WorkloadEngine
+from scheduler.planner import (
+    plan_assignments, diff_plan, apply_plan, current_assignments, user_skills_from_roles, MAIN_OPERATION, _load_type
+)
+
+# Status projektów, które biorą udział w automatycznym przydzielaniu
+ACTIVE_STATUS = "W trakcie"
+
+
+def scheduling_inputs(project):
+    """
+    Zwraca dane projektu, od których zależy plan jego operacji
+    
+    Args:
+        project (Implementation|Offer): Projekt
+    
+    Returns:
+        tuple: (daty operacji głównej, słownik operacja -> (required, min_days))
+    """
+    main_op_data = project.operations.get(MAIN_OPERATION) or {}
+    return (
+        (main_op_data.get("start_date"), main_op_data.get("end_date")),
+        {
+            operation_name: (op_data.get("required", True), op_data.get("min_days", 1))
+            for operation_name, op_data in project.operations.items()
+        }
+    )
+
+
+def affected_operations(before, project):
+    """
+    Zwraca operacje projektu do ponownego przydzielenia po zmianie
+    
+    Zmiana dat operacji głównej przesuwa wszystkie operacje, zmiana required
+    lub min_days dotyczy tylko danej operacji.
+    
+    Args:
+        before (tuple): Wynik scheduling_inputs() sprzed zmiany (None dla nowego projektu)
+        project (Implementation|Offer): Projekt po zmianie
+    
+    Returns:
+        set: Nazwy operacji
+    """
+    main_dates, operations = scheduling_inputs(project)
+    if before is None or before[0] != main_dates:
+        return set(operations)
+    
+    return {
+        operation_name for operation_name, inputs in operations.items()
+        if before[1].get(operation_name) != inputs
+    }
+
+
+class WorkloadCache:
+    """
+    Obciążenie użytkowników z projektów w trakcie, utrzymywane między zmianami (singleton)
+    
+    Pozwala przydzielić od nowa operacje jednego projektu bez wczytywania
+    wszystkich projektów i ról. Po każdym zapisie projektu poza replan_project()
+    należy wywołać update_project(), po usunięciu remove_project(), a po
+    pełnym przydzielaniu - invalidate(). Zmiany innych klientów bazy
+    (DBManager.data_version()), ról (PermissionMatrix.version) i użytkowników
+    (ModelEvents) powodują ponowne wczytanie.
+    """
+    
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(WorkloadCache, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+    
+    def __init__(self):
+        if self._initialized:
+            return
+        self._workload = None
+        self._user_skills = None
+        self._permissions_version = None
+        self._data_version = None
+        self._loads = {}  # (typ projektu, ID projektu) -> lista Assignment w obciążeniu
+        ModelEvents().subscribe(User, self._on_users_changed)
+        self._initialized = True
+    
+    def invalidate(self):
+        """Czyści obciążenie - zostanie wczytane z bazy przy następnym użyciu"""
+        self._workload = None
+        self._user_skills = None
+        self._loads = {}
+    
+    def _on_users_changed(self, action, user):
+        """Dodanie lub usunięcie użytkownika zmienia zbiór kandydatów (ModelEvents)"""
+        if action != ModelEvents.UPDATE:
+            self.invalidate()
+    
+    def _load(self):
+        """Wczytuje obciążenie, jeśli go brak lub baza albo role zmieniły się od wczytania"""
+        data_version = DBManager().data_version()
+        if (self._workload is not None
+                and self._permissions_version == PermissionMatrix().version
+                and self._data_version == data_version):
+            return
+        
+        self._user_skills = user_skills_from_roles(User.get_all_users())
+        self._permissions_version = PermissionMatrix().version
+        self._data_version = data_version
+        self._workload = WorkloadEngine(self._user_skills)
+        self._loads = {}
+        for project in Project.query(status=ACTIVE_STATUS):
+            self._add(project.PROJECT_TYPE, project)
+    
+    def _add(self, project_type, project):
+        """Dodaje przypisania projektu do obciążenia"""
+        if project.status != ACTIVE_STATUS:
+            return
+        
+        implementations, offers = ([project], []) if project_type == "implementation" else ([], [project])
+        loads = list(current_assignments(implementations, offers).values())
+        for assignment in loads:
+            self._workload.add_assignment(
+                assignment.user_id,
+                _load_type(project_type, assignment.operation_name),
+                assignment.start_date,
+                assignment.end_date
+            )
+        self._loads[(project_type, project.id)] = loads
+    
+    def _remove(self, project_type, project_id):
+        """Wycofuje z obciążenia przypisania projektu"""
+        for assignment in self._loads.pop((project_type, project_id), []):
+            self._workload.remove_assignment(
+                assignment.user_id,
+                _load_type(project_type, assignment.operation_name),
+                assignment.start_date,
+                assignment.end_date
+            )
+    
+    def update_project(self, project_type, project):
+        """
+        Aktualizuje obciążenie po zapisie projektu
+        
+        Args:
+            project_type (str): Typ projektu ("implementation" lub "offer")
+            project (Implementation|Offer): Zapisany projekt
+        """
+        if self._workload is None:
+            return
+        self._remove(project_type, project.id)
+        self._add(project_type, project)
+    
+    def remove_project(self, project_type, project_id):
+        """Usuwa z obciążenia przypisania usuniętego projektu"""
+        if self._workload is None:
+            return
+        self._remove(project_type, project_id)
+    
+    def replan_project(self, project_type, project, operations=None, strategy="greedy"):
+        """
+        Przydziela od nowa operacje jednego projektu względem obciążenia pozostałych
+        
+        Zmienia operacje projektu i obciążenie, ale nie zapisuje projektu -
+        zrób to zaraz potem (zapisywane są tylko zmienione operacje).
+        
+        Args:
+            project_type (str): Typ projektu ("implementation" lub "offer")
+            project (Implementation|Offer): Projekt
+            operations (set, optional): Operacje do przydzielenia (domyślnie wszystkie)
+            strategy (str|object): Strategia z scheduler.strategies.STRATEGIES
+        
+        Returns:
+            list: Nazwy operacji, które dostały innego użytkownika lub inne daty
+        """
+        if project.status != ACTIVE_STATUS or (operations is not None and not operations):
+            self.update_project(project_type, project)
+            return []
+        
+        self._load()
+        self._remove(project_type, project.id)
+        
+        implementations, offers = ([project], []) if project_type == "implementation" else ([], [project])
+        try:
+            plan = plan_assignments(
+                implementations, offers, self._user_skills, WorkloadLimits.get_limits(),
+                strategy=strategy, workload=self._workload, operations=operations
+            )
+            changes = diff_plan(implementations, offers, plan)
+            apply_plan(implementations, offers, plan)
+        except Exception:
+            self.invalidate()
+            raise
+        
+        # plan_assignments dodał już do obciążenia stan projektu po przydziale
+        self._loads[(project_type, project.id)] = list(current_assignments(implementations, offers).values())
+        return [assignment.operation_name for _, assignment in changes]
@@ -0,0 +1,325 @@
+import copy
+import time
+import datetime
+from collections import namedtuple
+from database.models import PermissionMatrix
+from utils.workload import WorkloadEngine
+from scheduler.strategies import get_strategy
+
+# Operacja główna projektu (zużywa limity projektów użytkownika)
+MAIN_OPERATION = "Wdrożenie"
+
+# Operacje specjalistyczne -> potrzebna umiejętność
+SPECIALIST_OPERATIONS = {
+    "Spawanie": "welding",
+    "Malowanie": "painting",
+    "Klejenie": "gluing",
+}
+
+PROJECT_TYPES = ("implementation", "offer")
+
+# Zadanie do zaplanowania (jedna wymagana operacja projektu)
+Task = namedtuple("Task", "project_type project_id operation_name task_type start_date end_date")
+
+# Przypisanie operacji projektu do użytkownika
+Assignment = namedtuple("Assignment", "project_type project_id operation_name user_id start_date end_date")
+
+
+class Plan:
+    """Wynik planowania: przypisania do zapisania i zadania bez wykonawcy"""
+    
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.assignments = []  # Lista Assignment
+        self.unassigned = []  # Lista Task, dla których nikt nie spełnia warunków
+        self.workload = None  # WorkloadEngine po zaplanowaniu
+        self.elapsed = 0.0
+        self.fallback = None  # Strategia bazowa, której plan okazał się lepszy
+    
+    def score(self):
+        """Ocena planu do porównań: (zadania bez wykonawcy, koszt obciążenia) - mniej znaczy lepiej"""
+        return len(self.unassigned), self.workload.total_cost()
+
+
+def user_skills_from_roles(users):
+    """
+    Określa umiejętności użytkowników na podstawie uprawnień ich ról
+    
+    Args:
+        users (list): Lista użytkowników
+    
+    Returns:
+        dict: ID użytkownika -> słownik umiejętności (can_implementation, can_offer, ...)
+    """
+    matrix = PermissionMatrix()
+    return {
+        user.id: {
+            skill: matrix.has(user.id, f"task_{skill_type}")
+            for skill_type, skill in WorkloadEngine.SKILLS.items()
+        }
+        for user in users
+    }
+
+
+def _start_key(project):
+    """Klucz sortowania projektów po dacie rozpoczęcia (projekty bez daty na końcu)"""
+    return project.operations.get(MAIN_OPERATION, {}).get("start_date") or "9999-99-99"
+
+
+def _specialist_period(main_start, main_end, min_days):
+    """Okres operacji specjalistycznej: min_days od początku projektu, nie dłużej niż projekt"""
+    try:
+        start_date_obj = datetime.datetime.strptime(main_start, "%Y-%m-%d").date()
+        end_date_obj = start_date_obj + datetime.timedelta(days=min_days - 1)
+        return main_start, min(end_date_obj.strftime("%Y-%m-%d"), main_end)
+    except ValueError:
+        return main_start, main_end
+
+
+def _load_type(project_type, operation_name):
+    """Typ obciążenia operacji: projekt dla operacji głównej, w pozostałych tylko dni pracy"""
+    return project_type if operation_name == MAIN_OPERATION else "specialist"
+
+
+def _key(item):
+    """Klucz operacji projektu dla Task i Assignment"""
+    return item.project_type, item.project_id, item.operation_name
+
+
+def build_tasks(implementations, offers, scope=PROJECT_TYPES, operations=None):
+    """
+    Tworzy listę zadań do zaplanowania w kolejności przydzielania
+    
+    Projekty są brane według daty rozpoczęcia, najpierw operacja główna, potem
+    specjalistyczne. Pomijane są projekty bez dat oraz operacje niewymagane.
+    
+    Args:
+        implementations (list): Wdrożenia
+        offers (list): Oferty
+        scope (tuple): Typy projektów do zaplanowania ("implementation", "offer")
+        operations (set, optional): Nazwy operacji do zaplanowania (domyślnie wszystkie)
+    
+    Returns:
+        list: Lista Task
+    """
+    tasks = []
+    for project_type, projects in (("implementation", implementations), ("offer", offers)):
+        if project_type not in scope:
+            continue
+        
+        for project in sorted(projects, key=_start_key):
+            main_op_data = project.operations.get(MAIN_OPERATION) or {}
+            main_start = main_op_data.get("start_date")
+            main_end = main_op_data.get("end_date")
+            
+            if not main_start or not main_end or not main_op_data.get("required", True):
+                continue
+            
+            if operations is None or MAIN_OPERATION in operations:
+                tasks.append(Task(project_type, project.id, MAIN_OPERATION, project_type, main_start, main_end))
+            
+            for operation_name, skill_type in SPECIALIST_OPERATIONS.items():
+                op_data = project.operations.get(operation_name) or {}
+                if not op_data.get("required", True):
+                    continue
+                if operations is not None and operation_name not in operations:
+                    continue
+                
+                op_start, op_end = _specialist_period(main_start, main_end, op_data.get("min_days", 1))
+                tasks.append(Task(project_type, project.id, operation_name, skill_type, op_start, op_end))
+    
+    return tasks
+
+
+def current_assignments(implementations, offers):
+    """
+    Zwraca obecne przypisania projektów (operacje z użytkownikiem i datami)
+    
+    Returns:
+        dict: (typ projektu, ID projektu, operacja) -> Assignment
+    """
+    assignments = {}
+    for project_type, projects in (("implementation", implementations), ("offer", offers)):
+        for project in projects:
+            for operation_name, op_data in project.operations.items():
+                user_id = op_data.get("user_id")
+                start_date = op_data.get("start_date")
+                end_date = op_data.get("end_date")
+                
+                if user_id and start_date and end_date:
+                    assignment = Assignment(project_type, project.id, operation_name, user_id, start_date, end_date)
+                    assignments[_key(assignment)] = assignment
+    
+    return assignments
+
+
+def plan_assignments(implementations, offers, user_skills, workload_limits, strategy="greedy",
+                     scope=PROJECT_TYPES, daily_limit=None, overload_penalty=None, workload=None,
+                     operations=None):
+    """
+    Planuje przypisanie użytkowników do operacji projektów
+    
+    Funkcja nie zmienia projektów ani bazy danych - wynik można porównać
+    z obecnym stanem (diff_plan) i zastosować (apply_plan).
+    
+    Obciążenie początkowe tworzą przypisania, które nie są planowane od nowa
+    (projekty spoza zakresu, operacje niewymagane). Zadanie, którego nikt nie
+    może dostać, zachowuje dotychczasowe przypisanie i trafia do plan.unassigned.
+    
+    Jeśli strategia ma atrybut baseline, planowanie jest powtarzane strategią
+    bazową i zwracany jest plan o lepszej ocenie (Plan.score()).
+    
+    Args:
+        implementations (list): Wdrożenia w trakcie
+        offers (list): Oferty w trakcie
+        user_skills (dict): ID użytkownika -> umiejętności (kolejność rozstrzyga remisy)
+        workload_limits (WorkloadLimits): Limity obciążenia
+        strategy (str|object): Strategia z scheduler.strategies.STRATEGIES
+        scope (tuple): Typy projektów do zaplanowania
+        daily_limit (int, optional): Liczba zadań dziennie, od której naliczana jest kara
+        overload_penalty (int, optional): Koszt dnia z przekroczonym limitem
+        workload (WorkloadEngine, optional): Obciążenie z pozostałych projektów, do którego
+            zostanie dodany plan (domyślnie nowe, tylko z podanych projektów)
+        operations (set, optional): Nazwy operacji do zaplanowania (domyślnie wszystkie)
+    
+    Returns:
+        Plan: Plan przypisań
+    """
+    start = time.perf_counter()
+    strategy = get_strategy(strategy)
+    
+    tasks = build_tasks(implementations, offers, scope, operations)
+    planned = {_key(task) for task in tasks}
+    current = current_assignments(implementations, offers)
+    
+    if workload is None:
+        workload = WorkloadEngine(user_skills, daily_limit, overload_penalty)
+    for key, assignment in current.items():
+        if key not in planned:
+            workload.add_assignment(
+                assignment.user_id,
+                _load_type(assignment.project_type, assignment.operation_name),
+                assignment.start_date,
+                assignment.end_date
+            )
+    
+    name = getattr(strategy, "name", type(strategy).__name__)
+    baseline = getattr(strategy, "baseline", None)
+    if baseline is None:
+        plan = _assign(name, strategy, tasks, current, workload, user_skills, workload_limits)
+    else:
+        # Strategia może przegrać ze swoją strategią bazową - zostaje lepszy z dwóch planów
+        plan = _assign(name, strategy, tasks, current, copy.deepcopy(workload), user_skills, workload_limits)
+        other = _assign(
+            name, get_strategy(baseline), tasks, current, copy.deepcopy(workload), user_skills, workload_limits
+        )
+        if other.score() < plan.score():
+            other.fallback = baseline
+            plan = other
+        _add_plan_load(plan, current, workload)
+        plan.workload = workload
+    
+    plan.elapsed = time.perf_counter() - start
+    return plan
+
+
+def _assign(name, strategy, tasks, current, workload, user_skills, workload_limits):
+    """
+    Przydziela zadania po kolei według strategii, dodając je do obciążenia
+    
+    Returns:
+        Plan: Plan przypisań (bez czasu wykonania)
+    """
+    plan = Plan(name)
+    for index, task in enumerate(tasks):
+        load_type = _load_type(task.project_type, task.operation_name)
+        user_id = strategy.choose(workload, tasks, index, user_skills, workload_limits)
+        
+        if user_id is None:
+            plan.unassigned.append(task)
+            previous = current.get(_key(task))
+            if previous:
+                workload.add_assignment(previous.user_id, load_type, previous.start_date, previous.end_date)
+            continue
+        
+        workload.add_assignment(user_id, load_type, task.start_date, task.end_date)
+        plan.assignments.append(Assignment(
+            task.project_type, task.project_id, task.operation_name,
+            user_id, task.start_date, task.end_date
+        ))
+    
+    plan.workload = workload
+    return plan
+
+
+def _add_plan_load(plan, current, workload):
+    """Dodaje do obciążenia przypisania planu (i dotychczasowe przypisania zadań bez wykonawcy)"""
+    for task in plan.unassigned:
+        previous = current.get(_key(task))
+        if previous:
+            workload.add_assignment(
+                previous.user_id, _load_type(task.project_type, task.operation_name),
+                previous.start_date, previous.end_date
+            )
+    for assignment in plan.assignments:
+        workload.add_assignment(
+            assignment.user_id, _load_type(assignment.project_type, assignment.operation_name),
+            assignment.start_date, assignment.end_date
+        )
+
+
+def _projects_by_key(implementations, offers):
+    """Słownik (typ projektu, ID projektu) -> projekt"""
+    projects = {("implementation", impl.id): impl for impl in implementations}
+    projects.update({("offer", offer.id): offer for offer in offers})
+    return projects
+
+
+def diff_plan(implementations, offers, plan):
+    """
+    Porównuje plan z obecnymi przypisaniami (tryb próbny)
+    
+    Returns:
+        list: Lista krotek (obecne Assignment, nowe Assignment) dla zmienionych operacji
+    """
+    projects = _projects_by_key(implementations, offers)
+    
+    changes = []
+    for assignment in plan.assignments:
+        project = projects[(assignment.project_type, assignment.project_id)]
+        op_data = project.operations.get(assignment.operation_name) or {}
+        previous = assignment._replace(
+            user_id=op_data.get("user_id"),
+            start_date=op_data.get("start_date"),
+            end_date=op_data.get("end_date")
+        )
+        if previous != assignment:
+            changes.append((previous, assignment))
+    
+    return changes
+
+
+def apply_plan(implementations, offers, plan):
+    """
+    Wpisuje plan do operacji projektów (zachowując required i min_days)
+    
+    Projekty nie są zapisywane - zrób to w DBManager().transaction().
+    
+    Returns:
+        list: Zmienione projekty
+    """
+    projects = _projects_by_key(implementations, offers)
+    
+    changed = {}
+    for previous, assignment in diff_plan(implementations, offers, plan):
+        project = projects[(assignment.project_type, assignment.project_id)]
+        op_data = project.operations.setdefault(
+            assignment.operation_name,
+            {"user_id": None, "start_date": None, "end_date": None, "required": True, "min_days": 1}
+        )
+        op_data["user_id"] = assignment.user_id
+        op_data["start_date"] = assignment.start_date
+        op_data["end_date"] = assignment.end_date
+        changed[id(project)] = project
+    
+    return list(changed.values())
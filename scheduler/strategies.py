@@ -0,0 +1,268 @@
+from scheduler.flow import MinCostFlow
+
+# Typy zadań, które zużywają limity projektów użytkownika
+PROJECT_TASK_TYPES = ("implementation", "offer")
+
+
+class GreedyStrategy:
+    """
+    Strategia zachłanna: każde zadanie dostaje użytkownik z najmniejszym
+    obciążeniem w okresie zadania (dotychczasowy algorytm panelu projektów)
+    """
+    
+    name = "greedy"
+    
+    def choose(self, workload, tasks, index, user_skills, workload_limits):
+        """
+        Wybiera użytkownika dla zadania tasks[index]
+        
+        Args:
+            workload (WorkloadEngine): Obciążenie użytkowników po wcześniejszych zadaniach
+            tasks (list): Wszystkie zadania planu w kolejności przydzielania
+            index (int): Indeks bieżącego zadania
+            user_skills (dict): Słownik z umiejętnościami użytkowników
+            workload_limits (WorkloadLimits): Limity obciążenia
+        
+        Returns:
+            int: ID użytkownika lub None, jeśli nikt nie może dostać zadania
+        """
+        task = tasks[index]
+        return workload.find_best_user(
+            task.task_type, task.start_date, task.end_date, user_skills, workload_limits
+        )
+
+
+class LookaheadStrategy(GreedyStrategy):
+    """
+    Najmniej obciążony użytkownik z uwzględnieniem nadchodzących projektów
+    
+    Przy głównych operacjach (które zużywają limity projektów) koszt kandydata
+    jest powiększany o jego "rzadkość": dla kolejnych `window` projektów każdego
+    typu sumowany jest udział kandydata w puli osób, które mogą je dostać.
+    Dzięki temu jedyni specjaliści od ofert nie wyczerpują limitu na wdrożeniach,
+    które mógłby dostać ktoś inny.
+    """
+    
+    name = "lookahead"
+    
+    def __init__(self, window=20, weight=None):
+        """
+        Args:
+            window (int): Liczba nadchodzących projektów branych pod uwagę
+            weight (float, optional): Waga rzadkości (domyślnie kara za przeciążony dzień)
+        """
+        self.window = window
+        self.weight = weight
+    
+    def choose(self, workload, tasks, index, user_skills, workload_limits):
+        task = tasks[index]
+        candidates = workload.candidate_costs(
+            task.task_type, task.start_date, task.end_date, user_skills, workload_limits
+        )
+        if not candidates:
+            return None
+        if task.task_type not in PROJECT_TASK_TYPES or len(candidates) == 1:
+            return min(candidates, key=lambda candidate: candidate[1])[0]
+        
+        # Ile projektów każdego typu czeka w oknie wyprzedzenia
+        upcoming = dict.fromkeys(PROJECT_TASK_TYPES, 0)
+        for next_task in tasks[index + 1:]:
+            if next_task.task_type in upcoming and upcoming[next_task.task_type] < self.window:
+                upcoming[next_task.task_type] += 1
+        
+        # Pula kandydatów nie zależy od dat, więc wystarczy ją policzyć raz na typ
+        scarcity = {}
+        for task_type, count in upcoming.items():
+            if not count:
+                continue
+            pool = [
+                user_id for user_id in workload.counts
+                if workload.is_eligible(user_id, task_type, user_skills, workload_limits)
+            ]
+            for user_id in pool:
+                scarcity[user_id] = scarcity.get(user_id, 0) + count / len(pool)
+        
+        weight = self.weight if self.weight is not None else workload.OVERLOAD_PENALTY
+        return min(
+            candidates,
+            key=lambda candidate: candidate[1] + weight * scarcity.get(candidate[0], 0)
+        )[0]
+
+
+class MinCostStrategy(GreedyStrategy):
+    """
+    Optymalny przydział głównych operacji w oknach planowania (przepływ o minimalnym koszcie)
+    
+    Kolejne `window` głównych operacji jest przydzielanych razem jako problem
+    przepływu: operacja -> (użytkownik, typ projektu) -> użytkownik -> ujście,
+    z przepustowościami równymi pozostałym limitom projektów użytkownika.
+    Najpierw maksymalizowana jest liczba przydzielonych operacji, potem
+    minimalizowany koszt obciążenia z początku okna. Operacje specjalistyczne
+    nie mają limitów - dostają użytkownika jak w strategii zachłannej.
+    
+    Koszty kandydatów nie uwzględniają operacji z tego samego okna, więc okno
+    jest rozwiązywane dwa razy: bez kary i z karą za kolejne operacje jednego
+    użytkownika. Zostaje rozwiązanie o mniejszym rzeczywistym koszcie obciążenia.
+    
+    Optimum w oknach nie gwarantuje lepszego planu całości (np. mały zespół
+    i krótkie projekty), dlatego plan_assignments() wylicza też plan strategii
+    bazowej i zwraca lepszy z nich.
+    """
+    
+    name = "mincost"
+    baseline = GreedyStrategy.name  # Strategia, z której planem porównywany jest wynik
+    
+    def __init__(self, window=60, candidates=None):
+        """
+        Args:
+            window (int): Liczba głównych operacji rozwiązywanych razem
+            candidates (int, optional): Liczba najtańszych kandydatów operacji
+                (domyślnie wielkość okna, aby operacje okna mogły trafić do różnych osób)
+        """
+        self.window = window
+        self.candidates = candidates or window
+        self._tasks = None
+        self._decisions = {}  # indeks zadania -> ID użytkownika lub None
+    
+    def choose(self, workload, tasks, index, user_skills, workload_limits):
+        task = tasks[index]
+        if task.task_type not in PROJECT_TASK_TYPES:
+            return super().choose(workload, tasks, index, user_skills, workload_limits)
+        
+        if self._tasks is not tasks:
+            self._tasks = tasks
+            self._decisions = {}
+        if index not in self._decisions:
+            self._decisions.update(self._solve_window(workload, tasks, index, user_skills, workload_limits))
+        
+        user_id = self._decisions.pop(index)
+        if user_id is None or not workload.is_eligible(user_id, task.task_type, user_skills, workload_limits):
+            # Brak miejsca w oknie lub decyzja nieaktualna - wybór zachłanny
+            return super().choose(workload, tasks, index, user_skills, workload_limits)
+        return user_id
+    
+    def _solve_window(self, workload, tasks, index, user_skills, workload_limits):
+        """
+        Przydziela razem główne operacje okna zaczynającego się od tasks[index]
+        
+        Returns:
+            dict: Indeks zadania -> ID użytkownika lub None
+        """
+        window = [
+            position for position in range(index, len(tasks))
+            if tasks[position].task_type in PROJECT_TASK_TYPES
+        ][:self.window]
+        
+        # Kandydaci każdej operacji: najtańsi użytkownicy mogący ją dostać
+        candidates = {}
+        for position in window:
+            task = tasks[position]
+            costs = workload.candidate_costs(
+                task.task_type, task.start_date, task.end_date, user_skills, workload_limits
+            )
+            costs.sort(key=lambda candidate: candidate[1])
+            candidates[position] = costs[:self.candidates]
+        
+        # Kara za kolejną operację okna u użytkownika: przeciążenie przez średnią długość
+        # operacji, proporcjonalnie do części okresu okna, w której użytkownik ma zapas
+        days = [workload.period_days(tasks[position].start_date, tasks[position].end_date) for position in window]
+        window_start = min(tasks[position].start_date for position in window)
+        window_end = max(tasks[position].end_date for position in window)
+        window_days = workload.period_days(window_start, window_end) or 1
+        overload_cost = workload.OVERLOAD_PENALTY * sum(days) / len(days)
+        conflict_costs = {
+            user_id: round(overload_cost * workload.free_days(user_id, window_start, window_end) / window_days)
+            for costs in candidates.values()
+            for user_id, _ in costs
+        }
+        
+        best = None
+        for penalties in (dict.fromkeys(conflict_costs, 0), conflict_costs):
+            decisions = self._flow_decisions(tasks, window, candidates, penalties, workload, workload_limits)
+            score = self._score(workload, tasks, decisions)
+            if best is None or score < best[0]:
+                best = (score, decisions)
+        return best[1]
+    
+    def _flow_decisions(self, tasks, window, candidates, conflict_costs, workload, workload_limits):
+        """Rozwiązuje przydział okna przepływem o minimalnym koszcie"""
+        # Pominięcie operacji musi kosztować więcej niż dowolny zestaw przydziałów
+        skip_cost = 1 + len(window) * max(conflict_costs.values(), default=0) + sum(
+            max((cost for _, cost in costs), default=0) for costs in candidates.values()
+        )
+        limit_by_type = {
+            "implementation": ("implementations_count", workload_limits.max_implementations),
+            "offer": ("offers_count", workload_limits.max_offers),
+        }
+        
+        # Wierzchołki: 0 źródło, 1 ujście, dalej operacje, pary (użytkownik, typ) i użytkownicy
+        flow = MinCostFlow(2)
+        type_nodes = {}
+        user_nodes = {}
+        edges = []
+        for position in window:
+            task_type = tasks[position].task_type
+            task_node = flow.add_node()
+            flow.add_edge(0, task_node, 1, 0)
+            flow.add_edge(task_node, 1, 1, skip_cost)
+            
+            for user_id, cost in candidates[position]:
+                counts = workload.counts[user_id]
+                if user_id not in user_nodes:
+                    user_nodes[user_id] = flow.add_node()
+                    # Każda kolejna operacja użytkownika jest droższa o karę nałożenia
+                    for extra in range(workload_limits.max_total_projects - counts["total_projects"]):
+                        flow.add_edge(user_nodes[user_id], 1, 1, extra * conflict_costs[user_id])
+                if (user_id, task_type) not in type_nodes:
+                    counter, limit = limit_by_type[task_type]
+                    type_nodes[(user_id, task_type)] = flow.add_node()
+                    flow.add_edge(type_nodes[(user_id, task_type)], user_nodes[user_id], limit - counts[counter], 0)
+                
+                edge = flow.add_edge(task_node, type_nodes[(user_id, task_type)], 1, cost)
+                edges.append((position, user_id, edge))
+        
+        flow.solve(0, 1, len(window))
+        
+        decisions = dict.fromkeys(window)
+        for position, user_id, edge in edges:
+            if flow.flow_on(edge):
+                decisions[position] = user_id
+        return decisions
+    
+    def _score(self, workload, tasks, decisions):
+        """Zwraca (liczba pominiętych operacji, przyrost kosztu obciążenia) dla decyzji okna"""
+        assigned = [(user_id, tasks[position]) for position, user_id in decisions.items() if user_id is not None]
+        before = workload.total_cost()
+        for user_id, task in assigned:
+            workload.add_assignment(user_id, task.task_type, task.start_date, task.end_date)
+        after = workload.total_cost()
+        for user_id, task in assigned:
+            workload.remove_assignment(user_id, task.task_type, task.start_date, task.end_date)
+        return len(decisions) - len(assigned), after - before
+
+
+# Dostępne strategie: nazwa -> klasa
+STRATEGIES = {
+    GreedyStrategy.name: GreedyStrategy,
+    LookaheadStrategy.name: LookaheadStrategy,
+    MinCostStrategy.name: MinCostStrategy,
+}
+
+
+def get_strategy(strategy, **options):
+    """
+    Zwraca obiekt strategii
+    
+    Args:
+        strategy (str|object): Nazwa strategii z STRATEGIES lub gotowy obiekt z metodą choose()
+        **options: Parametry konstruktora strategii
+    
+    Returns:
+        object: Strategia
+    """
+    if not isinstance(strategy, str):
+        return strategy
+    
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Nieznana strategia przydzielania: {strategy}")
+    return STRATEGIES[strategy](**options)
@@ -0,0 +1,143 @@
+import sys
+import time
+import argparse
+import datetime
+from database.models import WorkloadLimits
+from utils.workload import WorkloadEngine
+from scheduler.planner import build_tasks
+from scheduler.benchmark import synthetic_dataset
+
+
+class DailyWorkload:
+    """
+    Obciążenie w słowniku dat "YYYY-MM-DD" - dawne metody paneli projektów
+    (_add_daily_workload, _find_best_user), punkt odniesienia dla WorkloadEngine
+    """
+    
+    def __init__(self, user_ids):
+        self.user_load = {
+            user_id: {"implementations_count": 0, "offers_count": 0, "total_projects": 0, "dates": {}}
+            for user_id in user_ids
+        }
+    
+    def _dates(self, start_date, end_date):
+        """Kolejne daty okresu jako napisy"""
+        date_obj = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()
+        end_date_obj = datetime.datetime.strptime(end_date, "%Y-%m-%d").date()
+        while date_obj <= end_date_obj:
+            yield date_obj.strftime("%Y-%m-%d")
+            date_obj += datetime.timedelta(days=1)
+    
+    def add_assignment(self, user_id, task_type, start_date, end_date):
+        """Aktualizuje liczniki projektów i obciążenie każdego dnia okresu"""
+        load_data = self.user_load[user_id]
+        if task_type == "implementation":
+            load_data["implementations_count"] += 1
+            load_data["total_projects"] += 1
+        elif task_type == "offer":
+            load_data["offers_count"] += 1
+            load_data["total_projects"] += 1
+        
+        for date_str in self._dates(start_date, end_date):
+            load_data["dates"][date_str] = load_data["dates"].get(date_str, 0) + 1
+    
+    def find_best_user(self, task_type, start_date, end_date, user_skills, workload_limits):
+        """Przegląda każdy dzień okresu dla każdego użytkownika spełniającego warunki"""
+        best_user_id = None
+        best_load = float("inf")
+        
+        for user_id, load_data in self.user_load.items():
+            skill = WorkloadEngine.SKILLS.get(task_type)
+            if skill and not user_skills[user_id][skill]:
+                continue
+            
+            if task_type == "implementation":
+                if load_data["implementations_count"] >= workload_limits.max_implementations:
+                    continue
+                if load_data["total_projects"] >= workload_limits.max_total_projects:
+                    continue
+            elif task_type == "offer":
+                if load_data["offers_count"] >= workload_limits.max_offers:
+                    continue
+                if load_data["total_projects"] >= workload_limits.max_total_projects:
+                    continue
+            
+            user_period_load = 0
+            for date_str in self._dates(start_date, end_date):
+                daily_load = load_data["dates"].get(date_str, 0)
+                if daily_load >= WorkloadEngine.DAILY_LIMIT:
+                    user_period_load += WorkloadEngine.OVERLOAD_PENALTY
+                else:
+                    user_period_load += daily_load
+            
+            if user_period_load < best_load:
+                best_load = user_period_load
+                best_user_id = user_id
+        
+        return best_user_id
+
+
+def assign(workload, tasks, user_skills, limits):
+    """
+    Przydziela zadania po kolei najmniej obciążonym użytkownikom
+    
+    Returns:
+        tuple: (lista wybranych ID użytkowników, czas [s])
+    """
+    chosen = []
+    start = time.perf_counter()
+    for task in tasks:
+        user_id = workload.find_best_user(task.task_type, task.start_date, task.end_date, user_skills, limits)
+        if user_id is not None:
+            load_type = task.task_type if task.task_type in ("implementation", "offer") else "specialist"
+            workload.add_assignment(user_id, load_type, task.start_date, task.end_date)
+        chosen.append(user_id)
+    return chosen, time.perf_counter() - start
+
+
+def run(users, projects, span, limits, seed=1, compare=True):
+    """
+    Porównuje przydzielanie z WorkloadEngine i ze słownikiem dat na tych samych danych
+    
+    Returns:
+        list: Lista krotek (metoda, czas [s], przypisania, zgodność z WorkloadEngine)
+    """
+    implementations, offers, user_skills = synthetic_dataset(users, projects, span, seed)
+    tasks = build_tasks(implementations, offers)
+    
+    engine_chosen, engine_elapsed = assign(WorkloadEngine(user_skills), tasks, user_skills, limits)
+    results = [("engine", engine_elapsed, sum(1 for user_id in engine_chosen if user_id), True)]
+    
+    if compare:
+        daily_chosen, daily_elapsed = assign(DailyWorkload(user_skills), tasks, user_skills, limits)
+        results.append((
+            "daily", daily_elapsed, sum(1 for user_id in daily_chosen if user_id), daily_chosen == engine_chosen
+        ))
+    return results
+
+
+def main(argv=None):
+    """Porównanie silnika obciążenia z dawnym liczeniem dzień po dniu"""
+    parser = argparse.ArgumentParser(description="Porównanie silnika obciążenia z liczeniem dzień po dniu")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument("--span", type=int, default=90)
+    parser.add_argument("--max-implementations", type=int, default=4)
+    parser.add_argument("--max-offers", type=int, default=6)
+    parser.add_argument("--max-total", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--engine-only", action="store_true", help="Pomiń wolny pomiar dzień po dniu")
+    args = parser.parse_args(argv)
+    
+    limits = WorkloadLimits(args.max_implementations, args.max_offers, args.max_total)
+    
+    print(f"{'metoda':<10}{'czas [s]':>10}{'przypisane':>12}{'zgodne':>8}")
+    for name, elapsed, assigned, same in run(
+        args.users, args.projects, args.span, limits, args.seed, not args.engine_only
+    ):
+        print(f"{name:<10}{elapsed:>10.2f}{assigned:>12}{'tak' if same else 'nie':>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from database.models import User
+from database.models import User, UserDirectory, PermissionMatrix
 from utils.encryption import hash_password, verify_password
 
 class AuthManager:
@@ -16,6 +16,7 @@ class AuthManager:
         if self._initialized:
             return
         self.current_user = None
+        self.permissions = frozenset()  # Uprawnienia zalogowanego użytkownika
         self._initialized = True
     
     def register_user(self, username, first_name, last_name, password, is_admin=False):
@@ -75,20 +76,43 @@ class AuthManager:
         if not verify_password(user.password_hash, password):
             return None
         
+        # Ustaw bieżącego użytkownika (przy resecie hasła potrzebny do jego zmiany)
+        self.current_user = user
+        
+        # Nowa sesja - zacznij od świeżej mapy użytkowników i uprawnień
+        UserDirectory().invalidate()
+        PermissionMatrix().invalidate()
+        self.refresh_permissions()
+        
         # Sprawdź, czy użytkownik musi zmienić hasło
         if user.password_reset_required:
-            # Ustaw bieżącego użytkownika (potrzebne do zmiany hasła)
-            self.current_user = user
             return "reset_required"
         
-        # Ustaw bieżącego użytkownika
-        self.current_user = user
-        
         return user
     
+    def refresh_permissions(self):
+        """
+        Ustala uprawnienia zalogowanego użytkownika
+        
+        Wywoływane przy logowaniu oraz po zmianie ról lub uprawnień ról -
+        do tego czasu User.has_permission() korzysta z zapamiętanego zbioru.
+        
+        Returns:
+            frozenset: Nazwy uprawnień użytkownika
+        """
+        if self.current_user is None:
+            self.permissions = frozenset()
+            return self.permissions
+        
+        self.permissions = PermissionMatrix().permissions(self.current_user.id)
+        self.current_user.permissions = self.permissions
+        return self.permissions
+    
     def logout(self):
         """Wylogowuje aktualnego użytkownika"""
         self.current_user = None
+        self.permissions = frozenset()
+        UserDirectory().invalidate()
     
     def change_password(self, user_id, old_password, new_password):
         """
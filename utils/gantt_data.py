@@ -0,0 +1,138 @@
+import datetime
+import json
+from database.db_manager import DBManager
+from database.models import PROJECT_CLASSES
+
+MONTHS_PL = ["", "Styczeń", "Luty", "Marzec", "Kwiecień", "Maj", "Czerwiec", 
+             "Lipiec", "Sierpień", "Wrzesień", "Październik", "Listopad", "Grudzień"]
+DAYS_PL = ["Pon", "Wt", "Śr", "Czw", "Pt", "Sob", "Ndz"]
+
+# Kolory pasków: według operacji, a dla innych operacji według typu projektu
+GANTT_COLORS = {
+    "Wdrożenie": "#4CAF50",  # Zielony
+    "Spawanie": "#2196F3",    # Niebieski
+    "Malowanie": "#FFC107",   # Żółty
+    "Klejenie": "#F44336",    # Czerwony
+    "Implementation": "#81C784",  # Jasnozielony
+    "Offer": "#90CAF9"        # Jasnoniebieski
+}
+
+# Kolor paska zajętości (połączone, nachodzące na siebie zadania)
+OCCUPANCY_COLOR = "#78909C"
+
+
+def _parse_date(date_str, cache):
+    """Zamienia datę YYYY-MM-DD na datetime.date (None dla złych dat)"""
+    if date_str not in cache:
+        try:
+            cache[date_str] = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            cache[date_str] = None
+    return cache[date_str]
+
+
+def get_gantt_data(users, start_date, end_date):
+    """
+    Pobiera operacje projektów do wykresu Gantta jednym zapytaniem
+    
+    Zapytanie obejmuje tylko operacje podanych użytkowników, które nachodzą
+    na zakres [start_date, end_date] (indeks idx_project_operations_dates),
+    razem z nazwą i typem projektu.
+    
+    Args:
+        users (list): Użytkownicy - wiersze wykresu w podanej kolejności
+        start_date (datetime.date): Pierwszy widoczny dzień
+        end_date (datetime.date): Ostatni widoczny dzień
+    
+    Returns:
+        list: Lista słowników {label, tasks} dla każdego użytkownika (także bez zadań);
+            zadanie to słownik {label, start_date, end_date, type, operation}
+            z datami jako datetime.date
+    """
+    users = [user for user in users if user]
+    rows = {user.id: [] for user in users}
+    
+    conn = DBManager().get_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+    SELECT o.user_id, o.operation_name, o.start_date, o.end_date, p.name, p.project_type
+    FROM project_operations o
+    JOIN projects p ON p.id = o.project_id
+    WHERE o.end_date >= ? AND o.start_date <= ?
+      AND o.user_id IN (SELECT value FROM json_each(?))
+    ORDER BY p.id DESC, o.id
+    ''', (start_date.isoformat(), end_date.isoformat(), json.dumps(list(rows))))
+    
+    dates = {}
+    for op_data in cursor.fetchall():
+        op_start = _parse_date(op_data['start_date'], dates)
+        op_end = _parse_date(op_data['end_date'], dates)
+        
+        # Ignoruj wpisy z nieprawidłowymi datami (lub zapisanymi bez zer wiodących,
+        # których porównanie tekstowe w SQL mogło przepuścić)
+        if op_start is None or op_end is None or op_end < start_date or op_start > end_date:
+            continue
+        
+        rows[op_data['user_id']].append({
+            "label": f"{op_data['name']} - {op_data['operation_name']}",
+            "start_date": op_start,
+            "end_date": op_end,
+            "type": PROJECT_CLASSES[op_data['project_type']].__name__,
+            "operation": op_data['operation_name']
+        })
+    
+    return [
+        {"label": f"{user.first_name} {user.last_name}", "tasks": rows[user.id]}
+        for user in users
+    ]
+
+
+def task_bars(tasks, start_date, end_date, merge=False):
+    """
+    Zamienia zadania wiersza wykresu na paski w zakresie dat
+    
+    Zadania są przycinane do zakresu [start_date, end_date]. Przy merge=True
+    nachodzące na siebie zadania są łączone w jeden pasek zajętości
+    (OCCUPANCY_COLOR, bez etykiety).
+    
+    Args:
+        tasks (list): Zadania wiersza z get_gantt_data()
+        start_date (datetime.date): Pierwszy widoczny dzień
+        end_date (datetime.date): Ostatni widoczny dzień
+        merge (bool): Czy łączyć nachodzące na siebie zadania
+    
+    Returns:
+        list: Lista krotek (pierwszy dzień, ostatni dzień, kolor, etykieta lub None),
+            gdzie dni to liczba dni od start_date
+    """
+    bars = []
+    for task in tasks:
+        # Ogranicz do widocznego zakresu
+        bar_start = max(task["start_date"], start_date)
+        bar_end = min(task["end_date"], end_date)
+        if bar_end < bar_start:
+            continue
+        
+        # Kolor operacji, a jeśli go brak - typu projektu
+        if task.get("operation") in GANTT_COLORS:
+            color = GANTT_COLORS[task["operation"]]
+        elif task["type"] == "Implementation":
+            color = GANTT_COLORS["Implementation"]
+        else:
+            color = GANTT_COLORS["Offer"]
+        
+        bars.append([(bar_start - start_date).days, (bar_end - start_date).days, color, task["label"]])
+    
+    if merge:
+        merged = []
+        for bar in sorted(bars, key=lambda bar: bar[0]):
+            if merged and bar[0] <= merged[-1][1]:
+                # Zadanie nachodzi na poprzednie - jeden pasek zajętości
+                merged[-1][1] = max(merged[-1][1], bar[1])
+                merged[-1][2] = OCCUPANCY_COLOR
+                merged[-1][3] = None
+            else:
+                merged.append(bar)
+        bars = merged
+    
+    return [tuple(bar) for bar in bars]
@@ -0,0 +1,437 @@
+import datetime
+import os
+import zlib
+from xml.sax.saxutils import escape
+from utils.gantt_data import get_gantt_data, task_bars, MONTHS_PL, DAYS_PL
+
+# Liczba użytkowników pobieranych z bazy jednym zapytaniem podczas eksportu.
+# Ogranicza pamięć potrzebną do eksportu niezależnie od liczby wierszy.
+EXPORT_CHUNK_SIZE = 200
+
+# Minimalna szerokość dnia, przy której eksportowane są etykiety dni
+MIN_DAY_LABEL_WIDTH = 16
+
+# Strona PDF: A4 w poziomie (w punktach) i margines
+PDF_PAGE_SIZE = (842, 595)
+PDF_MARGIN = 20
+
+# Polskie litery spoza WinAnsiEncoding - w czcionkach PDF dostępne pod kodami 1-16
+_PDF_GLYPHS = {
+    "Ą": "Aogonek", "Ć": "Cacute", "Ę": "Eogonek", "Ł": "Lslash",
+    "Ń": "Nacute", "Ś": "Sacute", "Ź": "Zacute", "Ż": "Zdotaccent",
+    "ą": "aogonek", "ć": "cacute", "ę": "eogonek", "ł": "lslash",
+    "ń": "nacute", "ś": "sacute", "ź": "zacute", "ż": "zdotaccent",
+}
+_PDF_CODES = {char: code for code, char in enumerate(_PDF_GLYPHS, 1)}
+
+
+class _ChartLayout:
+    """Wymiary eksportowanego wykresu (piksele SVG lub punkty PDF)"""
+    
+    def __init__(self, start_date, end_date, day_width=20, row_height=30, header_height=50, margin_left=150):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.day_width = day_width
+        self.row_height = row_height
+        self.header_height = header_height
+        self.margin_left = margin_left
+        self.days = (end_date - start_date).days + 1
+        self.width = self.day_x(self.days)
+    
+    def day_x(self, day):
+        """Zwraca współrzędną X początku dnia (licząc od start_date)"""
+        return self.margin_left + (day * self.day_width)
+    
+    def row_y(self, row):
+        """Zwraca współrzędną Y początku wiersza"""
+        return self.header_height + (row * self.row_height)
+    
+    def day_lines(self):
+        """Zwraca linie siatki dni: (x, kolor, grubość) - jak w skali miesięcznej panelu"""
+        for day in range(self.days + 1):
+            current_date = self.start_date + datetime.timedelta(days=day)
+            if current_date.day == 1:
+                yield self.day_x(day), "#444444", 2
+            elif current_date.weekday() == 0:
+                yield self.day_x(day), "#888888", 1
+            else:
+                yield self.day_x(day), "#DDDDDD", 1
+    
+    def day_labels(self):
+        """Zwraca etykiety dni: (środek X, dzień miesiąca, skrót dnia tygodnia)"""
+        if self.day_width < MIN_DAY_LABEL_WIDTH:
+            return
+        for day in range(self.days):
+            current_date = self.start_date + datetime.timedelta(days=day)
+            yield self.day_x(day) + self.day_width / 2, str(current_date.day), DAYS_PL[current_date.weekday()]
+    
+    def months(self):
+        """Zwraca nazwy miesięcy zakresu: (środek X, nazwa)"""
+        current_date = self.start_date
+        while current_date <= self.end_date:
+            if current_date.month == 12:
+                next_month = current_date.replace(year=current_date.year + 1, month=1, day=1)
+            else:
+                next_month = current_date.replace(month=current_date.month + 1, day=1)
+            month_end = min(next_month - datetime.timedelta(days=1), self.end_date)
+            
+            x_from = self.day_x((current_date - self.start_date).days)
+            x_to = self.day_x((month_end - self.start_date).days + 1)
+            yield (x_from + x_to) / 2, f"{MONTHS_PL[current_date.month]} {current_date.year}"
+            
+            current_date = month_end + datetime.timedelta(days=1)
+    
+    def today_day(self):
+        """Zwraca numer dzisiejszego dnia lub None, jeśli jest poza zakresem"""
+        today = datetime.date.today()
+        if self.start_date <= today <= self.end_date:
+            return (today - self.start_date).days
+        return None
+
+
+def iter_gantt_rows(users, start_date, end_date, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Zwraca kolejne wiersze wykresu, pobierając dane porcjami użytkowników
+    
+    W pamięci są jednocześnie dane najwyżej chunk_size użytkowników.
+    
+    Args:
+        users (list): Użytkownicy - wiersze wykresu w podanej kolejności
+        start_date (datetime.date): Pierwszy dzień zakresu
+        end_date (datetime.date): Ostatni dzień zakresu
+        chunk_size (int): Liczba użytkowników na jedno zapytanie
+    
+    Yields:
+        dict: Wiersz {label, tasks} jak w get_gantt_data()
+    """
+    for i in range(0, len(users), chunk_size):
+        yield from get_gantt_data(users[i:i + chunk_size], start_date, end_date)
+
+
+def _fit_label(text, width, font_size):
+    """Skraca etykietę do szerokości paska (szacunkowo) lub zwraca None"""
+    max_chars = int((width - 10) / (font_size * 0.55))
+    if len(text) <= max_chars:
+        return text
+    if max_chars < 4:
+        return None
+    return text[:max_chars - 1] + "…"
+
+
+def export_gantt_svg(users, start_date, end_date, file_path, day_width=20, merge=True,
+                     chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Eksportuje wykres Gantta do pliku SVG
+    
+    Plik jest zapisywany strumieniowo, wiersz po wierszu, bez tworzenia
+    widgetów Tk, więc nadaje się do wykresów z tysiącami użytkowników.
+    
+    Args:
+        users (list): Użytkownicy - wiersze wykresu
+        start_date (datetime.date): Pierwszy dzień zakresu
+        end_date (datetime.date): Ostatni dzień zakresu
+        file_path (str): Ścieżka do pliku wynikowego
+        day_width (int): Szerokość dnia w pikselach
+        merge (bool): Czy łączyć nachodzące na siebie zadania w pasek zajętości
+        chunk_size (int): Liczba użytkowników na jedno zapytanie
+    
+    Returns:
+        bool: True jeśli eksport się powiódł, False w przeciwnym przypadku
+    """
+    try:
+        users = [user for user in users if user]
+        layout = _ChartLayout(start_date, end_date, day_width=day_width)
+        height = layout.row_y(len(users))
+        
+        # Upewnij się, że katalog docelowy istnieje
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(
+                f'<svg xmlns="http://www.w3.org/2000/svg" width="{layout.width}" height="{height}" '
+                f'viewBox="0 0 {layout.width} {height}">\n'
+                '<style>text{font-family:Arial,sans-serif;text-anchor:middle;dominant-baseline:central}'
+                '.m{font-size:9px;font-weight:bold}.d{font-size:8px}.w{font-size:7px}'
+                '.u{font-size:9px}.t{font-size:8px}.r{stroke:#DDDDDD}</style>\n'
+                f'<rect width="{layout.width}" height="{height}" fill="white"/>\n'
+            )
+            
+            # Podświetlenie dzisiejszego dnia
+            today = layout.today_day()
+            if today is not None:
+                f.write(f'<rect x="{layout.day_x(today)}" width="{day_width}" height="{height}" fill="#FFFFDD"/>\n')
+            
+            # Siatka dni i nagłówek
+            for x, color, width in layout.day_lines():
+                f.write(f'<line x1="{x}" y1="0" x2="{x}" y2="{height}" stroke="{color}" stroke-width="{width}"/>\n')
+            for x, text in layout.months():
+                f.write(f'<text x="{x}" y="12" class="m">{escape(text)}</text>\n')
+            for x, day, day_name in layout.day_labels():
+                f.write(f'<text x="{x}" y="{layout.header_height - 25}" class="w">{day_name}</text>'
+                        f'<text x="{x}" y="{layout.header_height - 10}" class="d">{day}</text>\n')
+            f.write(
+                f'<text x="{layout.margin_left / 2}" y="{layout.header_height / 2}" class="m">Użytkownik</text>\n'
+                f'<line x1="{layout.margin_left}" y1="0" x2="{layout.margin_left}" y2="{layout.header_height}" stroke="black"/>\n'
+            )
+            
+            # Wiersze użytkowników
+            bar_height = layout.row_height - 6
+            for row, user_data in enumerate(iter_gantt_rows(users, start_date, end_date, chunk_size)):
+                y = layout.row_y(row)
+                parts = [
+                    f'<line x1="0" y1="{y}" x2="{layout.width}" y2="{y}" class="r"/>',
+                    f'<text x="{layout.margin_left / 2}" y="{y + layout.row_height / 2}" class="u">'
+                    f'{escape(user_data["label"])}</text>'
+                ]
+                for first_day, last_day, color, label in task_bars(user_data["tasks"], start_date, end_date, merge):
+                    x = layout.day_x(first_day)
+                    width = (last_day - first_day + 1) * day_width
+                    parts.append(f'<rect x="{x}" y="{y + 3}" width="{width}" height="{bar_height}" '
+                                 f'fill="{color}" stroke="white"/>')
+                    label = _fit_label(label, width, 8) if label else None
+                    if label:
+                        parts.append(f'<text x="{x + width / 2}" y="{y + 3 + bar_height / 2}" class="t">'
+                                     f'{escape(label)}</text>')
+                f.write("\n".join(parts) + "\n")
+            
+            f.write(f'<line x1="0" y1="{height}" x2="{layout.width}" y2="{height}" class="r"/>\n</svg>\n')
+        
+        return True
+    
+    except Exception as e:
+        print(f"Błąd podczas eksportu wykresu Gantta do SVG: {e}")
+        return False
+
+
+def _pdf_text(text):
+    """Koduje tekst dla czcionek PDF jako ciąg szesnastkowy"""
+    data = bytearray()
+    for char in text:
+        if char in _PDF_CODES:
+            data.append(_PDF_CODES[char])
+        else:
+            data += char.encode("cp1252", errors="replace")
+    return f"<{data.hex()}>"
+
+
+def _pdf_color(color):
+    """Zamienia kolor #RRGGBB na składowe RGB dla PDF"""
+    return " ".join(f"{int(color[i:i + 2], 16) / 255:.3f}" for i in (1, 3, 5))
+
+
+class _PdfWriter:
+    """
+    Minimalny zapis dokumentu PDF bez zewnętrznych bibliotek
+    
+    Strony są zapisywane do pliku od razu po dodaniu, w pamięci zostają
+    tylko pozycje obiektów potrzebne do tabeli xref.
+    """
+    
+    CATALOG_ID = 1
+    PAGES_ID = 2
+    FONT_ID = 3
+    BOLD_FONT_ID = 4
+    
+    def __init__(self, file):
+        self.file = file
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 5
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    
+    def _write_object(self, obj_id, body):
+        """Zapisuje obiekt o podanym numerze"""
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(f"{obj_id} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+    
+    def add_page(self, width, height, content):
+        """
+        Dodaje stronę z podanym strumieniem poleceń rysowania
+        
+        Args:
+            width (float): Szerokość strony w punktach
+            height (float): Wysokość strony w punktach
+            content (str): Polecenia rysowania PDF
+        """
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        
+        data = zlib.compress(content.encode("ascii"))
+        self._write_object(
+            content_id,
+            f"<< /Length {len(data)} /Filter /FlateDecode >>\nstream\n".encode("ascii") + data + b"\nendstream"
+        )
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent {self.PAGES_ID} 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /Font << /F1 {self.FONT_ID} 0 R /F2 {self.BOLD_FONT_ID} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>"
+        ).encode("ascii"))
+        self.page_ids.append(page_id)
+    
+    def close(self):
+        """Zapisuje czcionki, drzewo stron i tabelę xref"""
+        differences = " ".join(f"/{name}" for name in _PDF_GLYPHS.values())
+        for font_id, base_font in ((self.FONT_ID, "Helvetica"), (self.BOLD_FONT_ID, "Helvetica-Bold")):
+            self._write_object(font_id, (
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding << /Type /Encoding "
+                f"/BaseEncoding /WinAnsiEncoding /Differences [1 {differences}] >> >>"
+            ).encode("ascii"))
+        
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(self.PAGES_ID, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode("ascii"))
+        self._write_object(self.CATALOG_ID, f"<< /Type /Catalog /Pages {self.PAGES_ID} 0 R >>".encode("ascii"))
+        
+        xref_offset = self.file.tell()
+        size = self.next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            lines.append(f"{self.offsets[obj_id]:010d} 00000 n \n")
+        lines.append(f"trailer\n<< /Size {size} /Root {self.CATALOG_ID} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self.file.write("".join(lines).encode("ascii"))
+
+
+def _pdf_page_content(layout, rows, scale, merge):
+    """
+    Zwraca polecenia rysowania strony PDF z nagłówkiem i podanymi wierszami
+    
+    Args:
+        layout (_ChartLayout): Wymiary wykresu
+        rows (list): Wiersze strony z iter_gantt_rows()
+        scale (float): Skala wykresu na stronie
+        merge (bool): Czy łączyć nachodzące na siebie zadania
+    
+    Returns:
+        str: Polecenia rysowania
+    """
+    page_height = PDF_PAGE_SIZE[1]
+    height = layout.row_y(len(rows))
+    ops = [
+        # Układ współrzędnych wykresu: początek w lewym górnym rogu, oś Y w dół
+        f"q {scale:.4f} 0 0 {-scale:.4f} {PDF_MARGIN} {page_height - PDF_MARGIN} cm"
+    ]
+    
+    def text(x, y, value, size, font="F1"):
+        # Wyśrodkowanie według szacowanej szerokości tekstu
+        x -= len(value) * size * 0.25
+        ops.append(f"BT /{font} {size} Tf 1 0 0 -1 {x:.2f} {y + size * 0.35:.2f} Tm {_pdf_text(value)} Tj ET")
+    
+    # Podświetlenie dzisiejszego dnia
+    today = layout.today_day()
+    if today is not None:
+        ops.append(f"{_pdf_color('#FFFFDD')} rg {layout.day_x(today)} 0 {layout.day_width} {height} re f")
+    
+    # Siatka dni i nagłówek
+    for x, color, width in layout.day_lines():
+        ops.append(f"{_pdf_color(color)} RG {width} w {x} 0 m {x} {height} l S")
+    ops.append("0 g")
+    for x, value in layout.months():
+        text(x, 12, value, 9, "F2")
+    for x, day, day_name in layout.day_labels():
+        text(x, layout.header_height - 25, day_name, 7)
+        text(x, layout.header_height - 10, day, 8)
+    text(layout.margin_left / 2, layout.header_height / 2, "Użytkownik", 10, "F2")
+    ops.append(f"0 G 1 w {layout.margin_left} 0 m {layout.margin_left} {layout.header_height} l S")
+    
+    # Wiersze użytkowników
+    bar_height = layout.row_height - 6
+    for row, user_data in enumerate(rows):
+        y = layout.row_y(row)
+        ops.append(f"{_pdf_color('#DDDDDD')} RG 1 w 0 {y} m {layout.width} {y} l S")
+        ops.append("0 g")
+        text(layout.margin_left / 2, y + layout.row_height / 2, user_data["label"], 9)
+        
+        for first_day, last_day, color, label in task_bars(user_data["tasks"], layout.start_date, layout.end_date, merge):
+            x = layout.day_x(first_day)
+            width = (last_day - first_day + 1) * layout.day_width
+            ops.append(f"{_pdf_color(color)} rg 1 G 1 w {x} {y + 3} {width} {bar_height} re B")
+            label = _fit_label(label, width, 8) if label else None
+            if label:
+                ops.append("0 g")
+                text(x + width / 2, y + 3 + bar_height / 2, label, 8)
+    
+    ops.append(f"{_pdf_color('#DDDDDD')} RG 1 w 0 {height} m {layout.width} {height} l S")
+    ops.append("Q")
+    return "\n".join(ops)
+
+
+def export_gantt_pdf(users, start_date, end_date, file_path, day_width=20, merge=True,
+                     chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Eksportuje wykres Gantta do pliku PDF (A4 w poziomie, nagłówek na każdej stronie)
+    
+    Wykres jest skalowany do szerokości strony i dzielony na strony po tyle
+    wierszy, ile się zmieści. Strony są zapisywane od razu, więc pamięć
+    nie rośnie z liczbą wierszy. PDF jest tworzony bez zewnętrznych bibliotek
+    (standardowe czcionki Helvetica).
+    
+    Args:
+        users (list): Użytkownicy - wiersze wykresu
+        start_date (datetime.date): Pierwszy dzień zakresu
+        end_date (datetime.date): Ostatni dzień zakresu
+        file_path (str): Ścieżka do pliku wynikowego
+        day_width (int): Szerokość dnia w punktach (przed skalowaniem)
+        merge (bool): Czy łączyć nachodzące na siebie zadania w pasek zajętości
+        chunk_size (int): Liczba użytkowników na jedno zapytanie
+    
+    Returns:
+        bool: True jeśli eksport się powiódł, False w przeciwnym przypadku
+    """
+    try:
+        users = [user for user in users if user]
+        layout = _ChartLayout(start_date, end_date, day_width=day_width)
+        
+        # Skala dopasowująca szerokość wykresu do strony i liczba wierszy na stronę
+        page_width, page_height = PDF_PAGE_SIZE
+        scale = min(1, (page_width - 2 * PDF_MARGIN) / layout.width)
+        rows_per_page = max(1, int(((page_height - 2 * PDF_MARGIN) / scale - layout.header_height) // layout.row_height))
+        
+        # Upewnij się, że katalog docelowy istnieje
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        
+        with open(file_path, "wb") as f:
+            writer = _PdfWriter(f)
+            rows = []
+            for user_data in iter_gantt_rows(users, start_date, end_date, chunk_size):
+                rows.append(user_data)
+                if len(rows) == rows_per_page:
+                    writer.add_page(page_width, page_height, _pdf_page_content(layout, rows, scale, merge))
+                    rows = []
+            
+            # Ostatnia strona (lub pusty wykres z nagłówkiem)
+            if rows or not writer.page_ids:
+                writer.add_page(page_width, page_height, _pdf_page_content(layout, rows, scale, merge))
+            writer.close()
+        
+        return True
+    
+    except Exception as e:
+        print(f"Błąd podczas eksportu wykresu Gantta do PDF: {e}")
+        return False
+
+
+# Formaty eksportu: rozszerzenie pliku -> funkcja
+EXPORT_FORMATS = {
+    ".svg": export_gantt_svg,
+    ".pdf": export_gantt_pdf,
+}
+
+
+def export_gantt(users, start_date, end_date, file_path, **options):
+    """
+    Eksportuje wykres Gantta do pliku w formacie wybranym według rozszerzenia
+    
+    Args:
+        users (list): Użytkownicy - wiersze wykresu
+        start_date (datetime.date): Pierwszy dzień zakresu
+        end_date (datetime.date): Ostatni dzień zakresu
+        file_path (str): Ścieżka do pliku wynikowego (.svg lub .pdf)
+        **options: Dodatkowe parametry funkcji eksportu (day_width, merge, chunk_size)
+    
+    Returns:
+        bool: True jeśli eksport się powiódł, False w przeciwnym przypadku
+    """
+    export_function = EXPORT_FORMATS.get(os.path.splitext(file_path)[1].lower())
+    if export_function is None:
+        print(f"Nieobsługiwany format eksportu wykresu Gantta: {file_path}")
+        return False
+    return export_function(users, start_date, end_date, file_path, **options)
@@ -0,0 +1,248 @@
+import os
+import sys
+import csv
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from database.db_manager import DBManager
+from database.models import User, Role
+from database.migrations import migrate
+from utils.encryption import hash_password
+
+# Kolumny pliku z użytkownikami (role rozdzielone przecinkami lub średnikami)
+IMPORT_COLUMNS = ["username", "first_name", "last_name", "password", "is_admin", "roles"]
+EXPORT_COLUMNS = ["username", "first_name", "last_name", "is_admin", "roles"]
+
+# Poniżej tej liczby haseł uruchamianie procesów trwa dłużej niż samo haszowanie
+MIN_PARALLEL_HASHES = 8
+
+
+def _parse_bool(value):
+    """Zamienia wartość z pliku (1/0, tak/nie, true/false) na bool"""
+    return str(value or "").strip().lower() in ("1", "true", "tak", "yes", "x")
+
+
+def _read_rows(file_path):
+    """
+    Odczytuje wiersze pliku CSV lub XLSX jako słowniki kolumna -> wartość
+    
+    Args:
+        file_path (str): Ścieżka do pliku
+    
+    Returns:
+        list: Lista słowników
+    """
+    if file_path.lower().endswith(".xlsx"):
+        import openpyxl
+        
+        wb = openpyxl.load_workbook(file_path, read_only=True)
+        rows = wb.active.iter_rows(values_only=True)
+        headers = [str(header or "").strip() for header in next(rows, [])]
+        result = [
+            {header: "" if value is None else str(value) for header, value in zip(headers, row)}
+            for row in rows
+            if any(value is not None for value in row)
+        ]
+        wb.close()
+        return result
+    
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t") if sample else csv.excel
+        return [
+            {(key or "").strip(): value or "" for key, value in row.items()}
+            for row in csv.DictReader(f, dialect=dialect)
+        ]
+
+
+def _write_rows(file_path, columns, rows):
+    """
+    Zapisuje wiersze do pliku CSV lub XLSX
+    
+    Args:
+        file_path (str): Ścieżka do pliku wynikowego
+        columns (list): Nagłówki kolumn
+        rows (list): Lista krotek wartości
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    
+    if file_path.lower().endswith(".xlsx"):
+        import openpyxl
+        
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Użytkownicy")
+        ws.append(columns)
+        for row in rows:
+            ws.append(list(row))
+        wb.save(file_path)
+        return
+    
+    with open(file_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+
+def hash_passwords(passwords, max_workers=None):
+    """
+    Haszuje hasła równolegle w osobnych procesach
+    
+    PBKDF2 (100 000 iteracji) zajmuje procesor, więc wątki nic by nie dały.
+    
+    Args:
+        passwords (list): Hasła w czystej postaci
+        max_workers (int, optional): Liczba procesów (domyślnie liczba rdzeni)
+    
+    Returns:
+        list: Hashe w tej samej kolejności co hasła
+    """
+    if len(passwords) < MIN_PARALLEL_HASHES or max_workers == 1:
+        return [hash_password(password) for password in passwords]
+    
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(hash_password, passwords, chunksize=chunksize))
+
+
+def import_users(file_path, max_workers=None):
+    """
+    Importuje użytkowników z pliku CSV lub XLSX
+    
+    Wiersze z brakującymi danymi, za krótkim hasłem, nieznaną rolą lub
+    istniejącą nazwą użytkownika są pomijane. Pozostali użytkownicy i ich
+    role są zapisywani w jednej transakcji.
+    
+    Args:
+        file_path (str): Ścieżka do pliku z kolumnami IMPORT_COLUMNS
+        max_workers (int, optional): Liczba procesów haszujących hasła
+    
+    Returns:
+        dict: imported (liczba), errors (lista komunikatów), elapsed (sekundy)
+    """
+    start = time.perf_counter()
+    
+    rows = _read_rows(file_path)
+    role_ids = {role.name.lower(): role.id for role in Role.get_all_roles()}
+    existing = {user.username for user in User.get_all_users()}
+    
+    users = []
+    passwords = []
+    user_role_names = []
+    errors = []
+    for line, row in enumerate(rows, 2):
+        username = row.get("username", "").strip()
+        first_name = row.get("first_name", "").strip()
+        last_name = row.get("last_name", "").strip()
+        password = row.get("password", "")
+        
+        if not (username and first_name and last_name and password):
+            errors.append(f"Wiersz {line}: wszystkie pola muszą być wypełnione")
+            continue
+        if len(password) < 6:
+            errors.append(f"Wiersz {line}: hasło musi mieć co najmniej 6 znaków")
+            continue
+        if username in existing:
+            errors.append(f"Wiersz {line}: użytkownik {username} już istnieje")
+            continue
+        
+        names = [name.strip() for name in row.get("roles", "").replace(";", ",").split(",") if name.strip()]
+        unknown = [name for name in names if name.lower() not in role_ids]
+        if unknown:
+            errors.append(f"Wiersz {line}: nieznane role: {', '.join(unknown)}")
+            continue
+        
+        existing.add(username)
+        users.append(User(
+            username=username,
+            first_name=first_name,
+            last_name=last_name,
+            password_hash=None,
+            is_admin=_parse_bool(row.get("is_admin"))
+        ))
+        passwords.append(password)
+        user_role_names.append(names)
+    
+    # Haszowanie jest najdroższym krokiem - wykonaj je przed otwarciem transakcji
+    for user, password_hash in zip(users, hash_passwords(passwords, max_workers)):
+        user.password_hash = password_hash
+    
+    if users:
+        with DBManager().transaction():
+            User.save_many(users)
+            Role.add_user_roles([
+                (user.id, role_ids[name.lower()])
+                for user, names in zip(users, user_role_names)
+                for name in names
+            ])
+    
+    return {
+        "imported": len(users),
+        "errors": errors,
+        "elapsed": time.perf_counter() - start
+    }
+
+
+def export_users(file_path):
+    """
+    Eksportuje użytkowników (bez haseł) do pliku CSV lub XLSX
+    
+    Args:
+        file_path (str): Ścieżka do pliku wynikowego
+    
+    Returns:
+        int: Liczba wyeksportowanych użytkowników
+    """
+    cursor = DBManager().get_connection().cursor()
+    cursor.execute('''
+    SELECT ur.user_id, r.name
+    FROM user_roles ur
+    JOIN roles r ON r.id = ur.role_id
+    ORDER BY r.name
+    ''')
+    roles_by_user = {}
+    for row in cursor.fetchall():
+        roles_by_user.setdefault(row['user_id'], []).append(row['name'])
+    
+    users = User.get_all_users()
+    _write_rows(file_path, EXPORT_COLUMNS, [
+        (user.username, user.first_name, user.last_name, int(user.is_admin),
+         ", ".join(roles_by_user.get(user.id, [])))
+        for user in users
+    ])
+    return len(users)
+
+
+def main(argv=None):
+    """Import i eksport użytkowników z wiersza poleceń"""
+    parser = argparse.ArgumentParser(description="Import i eksport użytkowników (CSV/XLSX)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    import_parser = subparsers.add_parser("import", help="Importuj użytkowników z pliku")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--workers", type=int, default=None, help="Liczba procesów haszujących")
+    
+    export_parser = subparsers.add_parser("export", help="Eksportuj użytkowników do pliku")
+    export_parser.add_argument("file")
+    
+    args = parser.parse_args(argv)
+    
+    migrate()
+    
+    if args.command == "import":
+        result = import_users(args.file, args.workers)
+        for error in result["errors"]:
+            print(error)
+        rate = result["imported"] / result["elapsed"] if result["elapsed"] else 0
+        print(f"Zaimportowano {result['imported']} użytkowników, pominięto {len(result['errors'])} "
+              f"w {result['elapsed']:.1f} s ({rate:.0f} użytkowników/s)")
+        return 1 if result["errors"] else 0
+    
+    count = export_users(args.file)
+    print(f"Wyeksportowano {count} użytkowników do {args.file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
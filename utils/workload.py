@@ -0,0 +1,316 @@
+import datetime
+
+# Dzień o numerze 1 w drzewach obciążenia (wcześniejsze daty są ignorowane)
+BASE_ORDINAL = datetime.date(1900, 1, 1).toordinal() - 1
+# Liczba obsługiwanych dni (potęga dwójki, ok. 700 lat od BASE_ORDINAL)
+DAY_RANGE = 1 << 18
+
+
+class WorkloadEngine:
+    """
+    Obciążenie użytkowników dniami zadań na potrzeby automatycznego przydzielania
+    
+    Dla każdego użytkownika przechowuje liczbę zadań w danym dniu oraz drzewo
+    Fenwicka (rzadkie, w słowniku) z kosztem dni. Koszt okresu [a, b] jest
+    liczony w O(log n) zamiast przeglądania każdego dnia z osobna.
+    
+    Koszt dnia to liczba zadań, a po osiągnięciu DAILY_LIMIT kara OVERLOAD_PENALTY.
+    """
+    
+    DAILY_LIMIT = 2
+    OVERLOAD_PENALTY = 100
+    
+    # Typ zadania -> umiejętność z user_skills
+    SKILLS = {
+        "implementation": "can_implementation",
+        "offer": "can_offer",
+        "welding": "can_welding",
+        "painting": "can_painting",
+        "gluing": "can_gluing",
+    }
+    
+    def __init__(self, user_ids, daily_limit=None, overload_penalty=None):
+        """
+        Args:
+            user_ids (iterable): ID użytkowników (kolejność rozstrzyga remisy)
+            daily_limit (int, optional): Liczba zadań dziennie, od której naliczana jest kara
+            overload_penalty (int, optional): Koszt dnia z przekroczonym limitem
+        """
+        if daily_limit is not None:
+            self.DAILY_LIMIT = daily_limit
+        if overload_penalty is not None:
+            self.OVERLOAD_PENALTY = overload_penalty
+        
+        self.counts = {}
+        self._days = {}
+        self._trees = {}
+        for user_id in user_ids:
+            self.counts[user_id] = {
+                "implementations_count": 0,
+                "offers_count": 0,
+                "total_projects": 0
+            }
+            self._days[user_id] = {}  # numer dnia -> liczba zadań
+            self._trees[user_id] = {}  # węzeł drzewa Fenwicka -> suma kosztów
+        self._day_cache = {}
+    
+    def _day(self, date_str):
+        """Zamienia datę YYYY-MM-DD na numer dnia (ValueError dla złych dat)"""
+        day = self._day_cache.get(date_str)
+        if day is None:
+            day = datetime.datetime.strptime(date_str, "%Y-%m-%d").date().toordinal() - BASE_ORDINAL
+            if not 0 < day < DAY_RANGE:
+                raise ValueError(f"Data poza obsługiwanym zakresem: {date_str}")
+            self._day_cache[date_str] = day
+        return day
+    
+    def _day_cost(self, tasks):
+        """Zwraca koszt dnia z podaną liczbą zadań"""
+        return tasks if tasks < self.DAILY_LIMIT else self.OVERLOAD_PENALTY
+    
+    def _prefix_cost(self, tree, day):
+        """Suma kosztów dni 1..day"""
+        total = 0
+        while day > 0:
+            total += tree.get(day, 0)
+            day &= day - 1
+        return total
+    
+    def add_days(self, user_id, start_date, end_date, tasks=1):
+        """
+        Dodaje zadanie do każdego dnia okresu (nieprawidłowe daty są ignorowane)
+        
+        Zapis nadal przechodzi okres dzień po dniu - O(długość okresu * log n).
+        Koszt dnia nie jest liniowy względem liczby zadań (kara po osiągnięciu
+        limitu), więc zmiany nie da się zapisać jedną aktualizacją zakresu.
+        Szybkie jest zapytanie period_cost(), wykonywane dla każdego kandydata.
+        
+        Args:
+            user_id (int): ID użytkownika
+            start_date (str): Data rozpoczęcia w formacie YYYY-MM-DD
+            end_date (str): Data zakończenia w formacie YYYY-MM-DD
+            tasks (int): Liczba dodawanych zadań (ujemna usuwa zadanie)
+        """
+        if user_id not in self._days:
+            return
+        
+        try:
+            first = self._day(start_date)
+            last = self._day(end_date)
+        except (TypeError, ValueError):
+            return
+        
+        days = self._days[user_id]
+        tree = self._trees[user_id]
+        for day in range(first, last + 1):
+            old = days.get(day, 0)
+            new = old + tasks
+            days[day] = new
+            delta = self._day_cost(new) - self._day_cost(old)
+            if delta:
+                node = day
+                while node < DAY_RANGE:
+                    tree[node] = tree.get(node, 0) + delta
+                    node += node & -node
+    
+    def period_cost(self, user_id, start_date, end_date):
+        """
+        Zwraca koszt obciążenia użytkownika w okresie
+        
+        Args:
+            user_id (int): ID użytkownika
+            start_date (str): Data rozpoczęcia w formacie YYYY-MM-DD
+            end_date (str): Data zakończenia w formacie YYYY-MM-DD
+        
+        Returns:
+            int: Suma kosztów dni okresu
+        """
+        tree = self._trees[user_id]
+        first = self._day(start_date)
+        last = self._day(end_date)
+        if last < first:
+            return 0
+        return self._prefix_cost(tree, last) - self._prefix_cost(tree, first - 1)
+    
+    def period_days(self, start_date, end_date):
+        """Zwraca liczbę dni okresu (0 dla nieprawidłowych dat)"""
+        try:
+            return max(self._day(end_date) - self._day(start_date) + 1, 0)
+        except (TypeError, ValueError):
+            return 0
+    
+    def free_days(self, user_id, start_date, end_date):
+        """
+        Zwraca liczbę dni okresu, w których dwa kolejne zadania przekroczą dzienny limit
+        
+        Args:
+            user_id (int): ID użytkownika
+            start_date (str): Data rozpoczęcia w formacie YYYY-MM-DD
+            end_date (str): Data zakończenia w formacie YYYY-MM-DD
+        
+        Returns:
+            int: Liczba dni z mniej niż DAILY_LIMIT - 1 zadaniami
+        """
+        days = self._days[user_id]
+        first = self._day(start_date)
+        last = self._day(end_date)
+        return sum(1 for day in range(first, last + 1) if days.get(day, 0) < self.DAILY_LIMIT - 1)
+    
+    def total_cost(self):
+        """Zwraca łączny koszt dni wszystkich użytkowników (miara jakości planu)"""
+        return sum(self._prefix_cost(tree, DAY_RANGE - 1) for tree in self._trees.values())
+    
+    def overloaded_days(self):
+        """Zwraca liczbę dni użytkowników z co najmniej DAILY_LIMIT zadaniami"""
+        return sum(
+            1 for days in self._days.values() for tasks in days.values() if tasks >= self.DAILY_LIMIT
+        )
+    
+    def tasks_on(self, user_id, date_str):
+        """Zwraca liczbę zadań użytkownika w danym dniu"""
+        return self._days.get(user_id, {}).get(self._day(date_str), 0)
+    
+    def add_assignment(self, user_id, task_type, start_date, end_date):
+        """
+        Rejestruje przypisanie zadania (liczniki projektów i obciążenie dzienne)
+        
+        Args:
+            user_id (int): ID użytkownika
+            task_type (str): Typ zadania ("implementation", "offer", "specialist")
+            start_date (str): Data rozpoczęcia w formacie YYYY-MM-DD
+            end_date (str): Data zakończenia w formacie YYYY-MM-DD
+        """
+        self._count_assignment(user_id, task_type, start_date, end_date, 1)
+    
+    def remove_assignment(self, user_id, task_type, start_date, end_date):
+        """Wycofuje przypisanie zarejestrowane wcześniej przez add_assignment()"""
+        self._count_assignment(user_id, task_type, start_date, end_date, -1)
+    
+    def _count_assignment(self, user_id, task_type, start_date, end_date, tasks):
+        """Zmienia liczniki projektów i obciążenie dzienne o podaną liczbę zadań"""
+        if user_id not in self.counts:
+            return
+        
+        if task_type == "implementation":
+            self.counts[user_id]["implementations_count"] += tasks
+            self.counts[user_id]["total_projects"] += tasks
+        elif task_type == "offer":
+            self.counts[user_id]["offers_count"] += tasks
+            self.counts[user_id]["total_projects"] += tasks
+        
+        self.add_days(user_id, start_date, end_date, tasks)
+    
+    def add_projects(self, implementations, offers):
+        """
+        Dodaje obciążenie z istniejących przypisań wdrożeń i ofert
+        
+        Args:
+            implementations (list): Lista wdrożeń
+            offers (list): Lista ofert
+        """
+        for projects, task_type in ((implementations, "implementation"), (offers, "offer")):
+            for project in projects:
+                for operation_name, op_data in project.operations.items():
+                    user_id = op_data.get("user_id")
+                    start_date = op_data.get("start_date")
+                    end_date = op_data.get("end_date")
+                    
+                    if user_id and start_date and end_date:
+                        # Główna operacja liczy się jako projekt, pozostałe tylko jako dni pracy
+                        self.add_assignment(
+                            user_id,
+                            task_type if operation_name == "Wdrożenie" else "specialist",
+                            start_date,
+                            end_date
+                        )
+    
+    def is_eligible(self, user_id, task_type, user_skills, workload_limits):
+        """
+        Sprawdza, czy użytkownik może dostać zadanie (umiejętności i limity projektów)
+        
+        Args:
+            user_id (int): ID użytkownika
+            task_type (str): Typ zadania lub umiejętności ("implementation", "offer", "welding", itp.)
+            user_skills (dict): Słownik z umiejętnościami użytkowników
+            workload_limits (WorkloadLimits): Limity obciążenia
+        
+        Returns:
+            bool: True jeśli użytkownik może dostać zadanie
+        """
+        skill = self.SKILLS.get(task_type)
+        if skill and not user_skills[user_id][skill]:
+            return False
+        
+        counts = self.counts[user_id]
+        if task_type == "implementation":
+            if counts["implementations_count"] >= workload_limits.max_implementations:
+                return False
+            if counts["total_projects"] >= workload_limits.max_total_projects:
+                return False
+        elif task_type == "offer":
+            if counts["offers_count"] >= workload_limits.max_offers:
+                return False
+            if counts["total_projects"] >= workload_limits.max_total_projects:
+                return False
+        
+        return True
+    
+    def candidate_costs(self, task_type, start_date, end_date, user_skills, workload_limits):
+        """
+        Zwraca koszt okresu zadania dla każdego użytkownika, który może je dostać
+        
+        Args:
+            task_type (str): Typ zadania lub umiejętności ("implementation", "offer", "welding", itp.)
+            start_date (str): Data rozpoczęcia w formacie YYYY-MM-DD
+            end_date (str): Data zakończenia w formacie YYYY-MM-DD
+            user_skills (dict): Słownik z umiejętnościami użytkowników
+            workload_limits (WorkloadLimits): Limity obciążenia
+        
+        Returns:
+            list: Lista krotek (ID użytkownika, koszt) w kolejności użytkowników;
+                pusta dla nieprawidłowych dat
+        """
+        try:
+            first = self._day(start_date)
+            last = self._day(end_date)
+        except (TypeError, ValueError):
+            return []
+        
+        costs = []
+        for user_id in self.counts:
+            if not self.is_eligible(user_id, task_type, user_skills, workload_limits):
+                continue
+            
+            if last < first:
+                costs.append((user_id, 0))
+            else:
+                tree = self._trees[user_id]
+                costs.append((user_id, self._prefix_cost(tree, last) - self._prefix_cost(tree, first - 1)))
+        
+        return costs
+    
+    def find_best_user(self, task_type, start_date, end_date, user_skills, workload_limits):
+        """
+        Znajduje użytkownika z najmniejszym obciążeniem w okresie zadania
+        
+        Args:
+            task_type (str): Typ zadania lub umiejętności ("implementation", "offer", "welding", itp.)
+            start_date (str): Data rozpoczęcia w formacie YYYY-MM-DD
+            end_date (str): Data zakończenia w formacie YYYY-MM-DD
+            user_skills (dict): Słownik z umiejętnościami użytkowników
+            workload_limits (WorkloadLimits): Limity obciążenia
+        
+        Returns:
+            int: ID najlepszego użytkownika lub None jeśli nie znaleziono
+        """
+        best_user_id = None
+        best_load = float("inf")
+        
+        for user_id, user_period_load in self.candidate_costs(
+            task_type, start_date, end_date, user_skills, workload_limits
+        ):
+            if user_period_load < best_load:
+                best_load = user_period_load
+                best_user_id = user_id
+        
+        return best_user_id